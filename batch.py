@@ -0,0 +1,38 @@
+import argparse
+import os
+from main import DEFAULT_CONFIG
+from src.batch import list_videos, run_batch
+
+def main():
+    parser = argparse.ArgumentParser(description="Football Match Analysis - batch of videos")
+    parser.add_argument('--videos', required=True, help="Directory of videos, or manifest file with one video path per line.")
+    parser.add_argument('--output', default='output', help="Directory receiving one results folder per video.")
+    parser.add_argument('--model', default='models/yolov8n.pt', help="Path to the YOLO model: PyTorch weights, an .onnx file or an OpenVINO model directory.")
+    parser.add_argument('--workers', type=int, default=2, help="Number of worker processes.")
+    parser.add_argument('--threads-per-worker', type=int, default=None, help="Torch/OpenCV thread cap per worker (default: CPU count / workers).")
+    parser.add_argument('--llm', action='store_true', help="Enable tactical report generation using an LLM (requires OPENAI_API_KEY).")
+    parser.add_argument('--no-cache', action='store_true', help="Always run detection, ignoring and not writing the detection cache.")
+
+    args = parser.parse_args()
+
+    # --- Validate paths ---
+    if not os.path.exists(args.videos):
+        print(f"Error: Videos directory or manifest not found at '{args.videos}'")
+        return
+    if not os.path.exists(args.model):
+        print(f"Error: Model file not found at '{args.model}'")
+        return
+    videos = list_videos(args.videos)
+    if not videos:
+        print(f"Error: No videos found in '{args.videos}'")
+        return
+
+    config = dict(DEFAULT_CONFIG)
+    if args.no_cache:
+        config['detection_cache_dir'] = None
+
+    run_batch(videos, args.output, args.model, config, workers=args.workers,
+              threads_per_worker=args.threads_per_worker, generate_llm_report=args.llm)
+
+if __name__ == '__main__':
+    main()
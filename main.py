@@ -1,33 +1,109 @@
 import argparse
 import os
-from src.main import run_analysis
+from src.main import redetect_events, run_analysis
+from src.live import run_live
 
 # --- Default Configuration ---
 # This replaces the old config.json file
 DEFAULT_CONFIG = {
     "frame_skip": 10,
+    "inference_mode": "sampled",  # 'sampled', 'batched' or 'full'
+    "imgsz": None,  # Inference input size (must match the export size of ONNX/OpenVINO models; None = 640)
+    "ball_roi": False,  # Track players only and search the ball in a native-resolution crop around its predicted position
+    "ball_crop_size": 320,  # Side of the ball search crop, in video pixels
+    "ball_full_imgsz": 1280,  # Input size of the full-frame ball search used when the ball is lost
+    "ball_roi_max_misses": 3,  # Consecutive crop misses before searching the full frame
+    "ball_search_interval": 1,  # While the ball is lost, search the full frame every N analysed frames
+    "batch_size": 8,  # Frames per inference call in 'batched' mode
+    "pipelined": True,  # Run decode, inference, analysis and encode on separate threads
+    "pipeline_queue_size": 8,  # Max frames buffered between two pipeline stages
+    "profile": False,  # Record per-frame stage timings and write profile.json / profile_trace.csv (--profile)
+    "chunks": 1,  # Track a long video as this many parallel chunks (1 processes it sequentially)
+    "chunk_overlap_seconds": 4.0,  # Overlap between chunks, used to stitch track IDs across boundaries
+    "stitch_min_iou": 0.3,  # Minimum mean box IoU over the overlap for two tracks to be stitched
+    "detection_cache_dir": "cache",  # Replay cached detections when the video, model and tracker are unchanged, skipping inference (frames are still decoded for the video, camera motion and jersey teams until they are stored with the detections; None disables)
+    "ball_tracking": True,  # Fuse ball detections with a Kalman filter and fill short gaps (ball_track.csv)
+    "ball_max_gap_seconds": 1.0,  # Longer gaps without a ball are left empty
+    "ball_accel_std_px": 2.0,  # Kalman process noise, px/frame²
+    "ball_measurement_std_px": 5.0,  # Kalman measurement noise, px
     "inactive_game_frame_limit": 50,
     "min_player_positions": 15,
-    "pixels_to_meters": 0.1,  # Example value, should be calibrated
-    "team_clustering_sample_frames": 20,
+    "pixels_to_meters": 0.1,  # Uniform scale used when no pitch_keypoints are given (wrong on perspective views)
+    "pitch_keypoints": None,  # {landmark name: [u, v]} located on the first analysed frame, e.g. {"centre": [960, 540], ...}; see src.pitch.PITCH_KEYPOINTS (4 or more)
+    "homography_refresh_seconds": 1.0,  # Follow camera pans by re-estimating the camera motion this often, on top of pitch_keypoints (None: static camera)
+    "camera_motion_without_keypoints": False,  # Also follow camera pans with the uniform pixels_to_meters scale (drifts over long videos)
+    "max_possession_distance_m": 3.0,  # Max distance between the ball and a player's feet for the player to own it
+    "event_min_frames": 2,  # Analysed frames an owner (or a loose ball) must be seen for before it counts
+    "dribble_min_distance_m": 5.0,  # Owner displacement over one possession reported as a dribble
+    "team_stats_staleness_frames": 10,  # Players unseen for longer are left out of team stats
+    "team_classification": "appearance",  # 'appearance' (jersey colours) or 'position' (legacy, also used when replaying detections)
+    "team_clustering_sample_frames": 20,  # Analysed frames sampled before the team clusters are fitted
+    "team_outlier_quantile": 0.9,  # Tracks further from their team colour than this quantile of distances...
+    "team_outlier_scale": 1.5,  # ...times this factor are left without a team (referees, goalkeepers)
     "team_names": {
         "0": "Team A",
         "1": "Team B"
     },
-    "ocr_interval": 25
+    "llm_model": "gpt-3.5-turbo",  # Chat model writing the tactical report (--llm)
+    "llm_base_url": None,  # OpenAI-compatible endpoint, e.g. a local server (None: OpenAI API or OPENAI_BASE_URL)
+    "llm_temperature": 0.7,
+    "llm_max_tokens": 500,
+    "llm_timeout_seconds": 60,  # Timeout of one request
+    "llm_max_retries": 3,  # Retries after network, rate-limit or server errors, with exponential backoff
+    "llm_max_concurrency": 4,  # Reports requested at once (batch runs)
+    "llm_cache_dir": "cache/llm",  # Reports cached by prompt and model settings (None disables)
+    "output_formats": ["csv"],  # Any of "csv" and "parquet"
+    "parquet_dataset_dir": None,  # Parquet dataset shared by all matches (default: <output>/parquet)
+    "match_id": None,  # Partition name of the match in the Parquet dataset (default: the video file name; batch runs use the output folder name)
+    "ocr_interval": 25,
+    "smoothing_window_seconds": 2.0,  # Savitzky-Golay window applied to trajectories before computing speeds (at least polyorder + 3 analysed samples)
+    "speed_zones_kmh": [7.0, 15.0, 20.0, 25.0],  # walking / jogging / running / high speed / sprinting
+    "sprint_speed_kmh": 25.0,
+    "sprint_min_seconds": 1.0,
+    "figures": True,  # Render team/player heatmaps and pass networks from the trajectories (figures/)
+    "player_heatmaps": 22,  # Per-player heatmaps for this many most observed tracks (0: none, None: every stable track)
+    "heatmap_cell_m": 1.0,  # Heatmap bin size, in metres
+    "figure_px_per_m": 8,  # Resolution of the figures
+    "video_codec": "mp4v",  # Annotated video: 'mjpg' (.avi, large), 'mp4v' (.mp4), 'h264' (.mp4 via ffmpeg, smallest) or None for no video (--no-video)
+    "video_scale": 1.0,  # Annotated video scale, e.g. 0.5 for a half-resolution preview
+    "video_queue_size": 16,  # Frames buffered for the encoder thread
+    "ffmpeg_path": "ffmpeg",  # ffmpeg executable used by the 'h264' codec
+    "video_crf": 23,  # h264 quality (lower: better quality, larger file)
+    "video_preset": "veryfast",  # h264 speed preset
+    "trail_seconds": 10,  # Length of the drawn trajectories (None keeps the whole trajectory)
+    "trail_fade": True,  # Fade trajectories out instead of cutting them
+    "live_max_latency_seconds": 2.0,  # Live mode (--live): frames older than this when analysis is ready for them are dropped
+    "live_stats_interval_seconds": 1.0,  # Seconds between two incremental stats lines
+    "live_stats_path": None,  # JSON lines output (default: <output>/live_stats.jsonl; '-' prints them)
+    "live_follow": False,  # Wait for a growing video file instead of stopping at its end
+    "live_idle_timeout_seconds": 10.0  # A followed file that stops growing for this long ends the analysis
 }
 
 def main():
     parser = argparse.ArgumentParser(description="Football Match Analysis")
-    parser.add_argument('--video', required=True, help="Path to the input video file.")
+    parser.add_argument('--video', help="Path to the input video file (or a stream URL with --live).")
     parser.add_argument('--output', default='output', help="Directory to save the results.")
-    parser.add_argument('--model', default='models/yolov8n.pt', help="Path to the YOLO model file.")
+    parser.add_argument('--model', default='models/yolov8n.pt', help="Path to the YOLO model: PyTorch weights, an .onnx file or an OpenVINO model directory.")
     parser.add_argument('--llm', action='store_true', help="Enable tactical report generation using an LLM (requires OPENAI_API_KEY).")
+    parser.add_argument('--chunks', type=int, help="Process the video as this many parallel chunks (overrides the configuration).")
+    parser.add_argument('--no-cache', action='store_true', help="Always run detection, ignoring and not writing the detection cache.")
+    parser.add_argument('--no-video', action='store_true', help="Do not write the annotated video (frames are not annotated either).")
+    parser.add_argument('--profile', action='store_true', help="Record per-frame stage timings (profile_trace.csv) and a p50/p95 summary (profile.json).")
+    parser.add_argument('--live', action='store_true', help="Analyse a stream URL or a growing file as it arrives, dropping frames to stay within the latency budget and writing incremental stats (live_stats.jsonl).")
+    parser.add_argument('--loop', action='store_true', help="With --live, play a video file in a loop as a stand-in for a stream.")
+    parser.add_argument('--duration', type=float, help="With --live, stop after this many seconds.")
+    parser.add_argument('--redetect-events', action='store_true', help="Recompute the events of the analysis in --output from its ball ownership series (ownership.csv) with the current event settings, without the video.")
 
     args = parser.parse_args()
 
+    if args.redetect_events:
+        redetect_events(args.output, dict(DEFAULT_CONFIG))
+        return
+    if args.video is None:
+        parser.error("--video is required")
+
     # --- Validate paths ---
-    if not os.path.exists(args.video):
+    if not os.path.exists(args.video) and not (args.live and '://' in args.video):
         print(f"Error: Video file not found at '{args.video}'")
         return
     if not os.path.exists(args.model):
@@ -41,12 +117,25 @@ def main():
     if args.llm:
         print("LLM tactical report generation is ENABLED.")
 
+    config = dict(DEFAULT_CONFIG)
+    if args.chunks:
+        config['chunks'] = args.chunks
+    if args.no_cache:
+        config['detection_cache_dir'] = None
+    if args.profile:
+        config['profile'] = True
+    if args.no_video:
+        config['video_codec'] = None
+
     try:
+        if args.live:
+            run_live(args.video, args.output, args.model, config, args.llm, loop=args.loop, duration_s=args.duration)
+            return
         run_analysis(
             video_path=args.video,
             output_dir=args.output,
             model_path=args.model,
-            config=DEFAULT_CONFIG,
+            config=config,
             generate_llm_report=args.llm
         )
     except Exception as e:
@@ -0,0 +1,70 @@
+# Compare la latence par frame et l'accord des détections entre plusieurs modèles
+# (PyTorch, ONNX, OpenVINO FP32/FP16/INT8) sur les mêmes frames d'un extrait fixe.
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from src.detector import Detector, TRACK_CONF
+from src.utils import box_iou
+from src.video_io import SampledFrameSource
+
+def detections(detector, frames):
+    latencies, dets = [], []
+    for i, frame in enumerate(frames):
+        t0 = time.perf_counter()
+        res = detector.model.predict(source=frame, conf=TRACK_CONF, verbose=False, **detector._inference_args())[0]
+        if i >= 3:  # warm-up
+            latencies.append(time.perf_counter() - t0)
+        boxes = res.boxes
+        dets.append((boxes.xyxy.cpu().numpy(), boxes.cls.cpu().numpy().astype(int), boxes.conf.cpu().numpy()))
+    return np.array(latencies), dets
+
+def agreement(reference, dets, min_iou=0.5, min_conf=0.25):
+    """
+    F1 score of the detections against the reference (same class, IoU >= min_iou).
+    """
+    matched, n_ref, n_det = 0, 0, 0
+    for (ref_boxes, ref_cls, ref_conf), (boxes, cls, conf) in zip(reference, dets):
+        ref_boxes, ref_cls = ref_boxes[ref_conf >= min_conf], ref_cls[ref_conf >= min_conf]
+        boxes, cls = boxes[conf >= min_conf], cls[conf >= min_conf]
+        n_ref += len(ref_boxes)
+        n_det += len(boxes)
+        if len(ref_boxes) and len(boxes):
+            iou = box_iou(ref_boxes, boxes) * (ref_cls[:, None] == cls[None, :])
+            # Greedy one-to-one matching, best pairs first
+            used_ref, used_det = set(), set()
+            for r, d in zip(*np.unravel_index(np.argsort(-iou, axis=None), iou.shape)):
+                if iou[r, d] < min_iou:
+                    break
+                if r not in used_ref and d not in used_det:
+                    matched += 1
+                    used_ref.add(r)
+                    used_det.add(d)
+    return 2 * matched / max(n_ref + n_det, 1)
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark inference backends on a fixed clip")
+    parser.add_argument('--video', required=True, help="Path to the input video file.")
+    parser.add_argument('--models', nargs='+', required=True, help="Models to compare; the first one is the reference.")
+    parser.add_argument('--imgsz', type=int, default=640)
+    parser.add_argument('--frame-skip', type=int, default=10)
+    parser.add_argument('--frames', type=int, default=100, help="Number of sampled frames to run.")
+    args = parser.parse_args()
+
+    frames = [frame for _, frame in zip(range(args.frames), (f for _, f in SampledFrameSource(args.video, args.frame_skip)))]
+    reference = None
+    for model in args.models:
+        detector = Detector(model_name=model, imgsz=args.imgsz)
+        latencies, dets = detections(detector, frames)
+        reference = reference or dets
+        print(f"{os.path.basename(model.rstrip('/')):<32} {detector.backend:<9}: "
+              f"p50 {1000 * np.median(latencies):6.1f} ms, p95 {1000 * np.percentile(latencies, 95):6.1f} ms, "
+              f"agreement F1 {agreement(reference, dets):.3f}")
+
+if __name__ == '__main__':
+    main()
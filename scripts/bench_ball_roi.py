@@ -0,0 +1,68 @@
+# Compare la recherche du ballon par fenêtre haute résolution (BallLocator) à l'inférence plein cadre
+# à basse et haute résolution : coût par frame et rappel du ballon, la référence étant la
+# détection plein cadre haute résolution.
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from src.ball_roi import BallLocator
+from src.detector import Detector
+from src.tracker import BALL_CLASS_NAMES
+from src.video_io import SampledFrameSource
+
+def full_frame_balls(detector, frames, imgsz):
+    ball_classes = detector.class_ids(BALL_CLASS_NAMES)
+    centers, t0 = [], time.perf_counter()
+    for _, frame in frames:
+        res = detector.model.predict(source=frame, imgsz=imgsz, conf=0.1, classes=ball_classes,
+                                     device=detector.device, verbose=False)[0]
+        if len(res.boxes):
+            box = res.boxes.xyxy.cpu().numpy()[int(np.argmax(res.boxes.conf.cpu().numpy()))]
+            centers.append((box[:2] + box[2:]) / 2)
+        else:
+            centers.append(None)
+    return centers, (time.perf_counter() - t0) / len(frames)
+
+def roi_balls(detector, frames, crop_size, full_imgsz):
+    locator = BallLocator(detector, crop_size=crop_size, full_imgsz=full_imgsz)
+    centers, t0 = [], time.perf_counter()
+    for frame_idx, frame in frames:
+        balls = locator.locate(frame_idx, frame)
+        centers.append((np.array(balls[0]['box'][:2]) + balls[0]['box'][2:]) / 2 if balls else None)
+    return centers, (time.perf_counter() - t0) / len(frames), locator
+
+def recall(reference, centers, tolerance=20):
+    hits = [c is not None and np.hypot(*(c - r)) <= tolerance for r, c in zip(reference, centers) if r is not None]
+    return np.mean(hits) if hits else float('nan')
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark ROI ball search against full-frame inference")
+    parser.add_argument('--video', required=True, help="Path to the input video file.")
+    parser.add_argument('--model', default='models/yolov8n.pt', help="Path to the YOLO model file.")
+    parser.add_argument('--frame-skip', type=int, default=10)
+    parser.add_argument('--frames', type=int, default=200)
+    parser.add_argument('--low-imgsz', type=int, default=640)
+    parser.add_argument('--high-imgsz', type=int, default=1280)
+    parser.add_argument('--crop-size', type=int, default=320)
+    args = parser.parse_args()
+
+    frames = list(zip(range(args.frames), SampledFrameSource(args.video, args.frame_skip)))
+    frames = [item for _, item in frames]
+    detector = Detector(model_name=args.model)
+
+    reference, high_t = full_frame_balls(detector, frames, args.high_imgsz)
+    low, low_t = full_frame_balls(detector, frames, args.low_imgsz)
+    roi, roi_t, locator = roi_balls(detector, frames, args.crop_size, args.high_imgsz)
+    print(f"full frame {args.high_imgsz:<5}: {1000 * high_t:6.1f} ms/frame (reference, ball in "
+          f"{sum(r is not None for r in reference)}/{len(frames)} frames)")
+    print(f"full frame {args.low_imgsz:<5}: {1000 * low_t:6.1f} ms/frame, recall {recall(reference, low):.2f}")
+    print(f"roi crop {args.crop_size:<7}: {1000 * roi_t:6.1f} ms/frame, recall {recall(reference, roi):.2f} "
+          f"({locator.roi_searches} crop / {locator.full_searches} full-frame searches)")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,51 @@
+# Mesure le débit (frames/s) de la détection par lots pour plusieurs tailles de lot
+# et vérifie que les pistes produites sont identiques au chemin de suivi frame par frame.
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from src.detector import Detector
+from src.tracker import parse_frame_results
+from src.video_io import SampledFrameSource
+
+def collect_tracks(results_iter, detector):
+    tracks = []
+    for frame_idx, res in results_iter:
+        persons, balls = parse_frame_results(res, detector)
+        for item in persons + balls:
+            tracks.append((frame_idx, int(item['id']), *item['box']))
+    return np.array(tracks, dtype=np.float64).reshape(-1, 6)
+
+def tracks_match(a, b, atol=1e-3):
+    return a.shape == b.shape and np.array_equal(a[:, :2], b[:, :2]) and np.allclose(a[:, 2:], b[:, 2:], atol=atol)
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark batched detection against the streaming tracker")
+    parser.add_argument('--video', required=True, help="Path to the input video file.")
+    parser.add_argument('--model', default='models/yolov8n.pt', help="Path to the YOLO model file.")
+    parser.add_argument('--frame-skip', type=int, default=1)
+    parser.add_argument('--batch-sizes', type=int, nargs='+', default=[1, 4, 8, 16])
+    args = parser.parse_args()
+
+    n_frames = len(SampledFrameSource(args.video, args.frame_skip))
+    detector = Detector(model_name=args.model)
+    t0 = time.perf_counter()
+    reference = collect_tracks(detector.detect_sampled(SampledFrameSource(args.video, args.frame_skip), frame_skip=args.frame_skip), detector)
+    elapsed = time.perf_counter() - t0
+    print(f"streaming     : {n_frames / elapsed:7.1f} frames/s")
+
+    for batch_size in args.batch_sizes:
+        detector = Detector(model_name=args.model)
+        t0 = time.perf_counter()
+        tracks = collect_tracks(detector.detect_batched(SampledFrameSource(args.video, args.frame_skip), frame_skip=args.frame_skip, batch_size=batch_size), detector)
+        elapsed = time.perf_counter() - t0
+        status = "identical" if tracks_match(reference, tracks) else "MISMATCH"
+        print(f"batch_size={batch_size:<3}: {n_frames / elapsed:7.1f} frames/s, tracks {status}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,54 @@
+# Compare le traitement par tronçons parallèles au traitement séquentiel d'une même vidéo :
+# temps total, nombre de pistes et distance totale parcourue après raccordement des pistes.
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from main import DEFAULT_CONFIG
+from src.chunked import run_chunked_detection
+from src.detection_cache import DetectionRecorder
+from src.detector import Detector
+from src.main import MatchAnalyzer, detection_stream, parse_detections, filter_players
+from src.kinematics import player_kinematics
+from src.video_io import SampledFrameSource
+
+def summarise(detections, fps, cfg):
+    analyzer = MatchAnalyzer(cfg, fps)
+    for _ in analyzer.process(detections.replay()):
+        pass
+    players = filter_players(analyzer.players, analyzer.track_store, cfg.get('min_player_positions', 2))
+    kinematics = player_kinematics(analyzer.track_store, fps, cfg, calibration=analyzer.calibration)
+    return len(players), kinematics['distance_m'].sum()
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark chunked detection against the sequential run")
+    parser.add_argument('--video', required=True, help="Path to the input video file.")
+    parser.add_argument('--model', default='models/yolov8n.pt', help="Path to the YOLO model file.")
+    parser.add_argument('--chunks', type=int, nargs='+', default=[2, 4])
+    args = parser.parse_args()
+
+    cfg = dict(DEFAULT_CONFIG)
+    frames = SampledFrameSource(args.video, cfg['frame_skip'])
+    detector = Detector(model_name=args.model)
+    t0 = time.perf_counter()
+    recorder = DetectionRecorder()
+    for _ in recorder.wrap(parse_detections(detector, detection_stream(detector, frames, cfg))):
+        pass
+    elapsed = time.perf_counter() - t0
+    n_players, distance = summarise(recorder.detections(), frames.fps, cfg)
+    print(f"sequential: {elapsed:7.1f}s, {n_players} players, {distance:9.0f} m")
+
+    for n_chunks in args.chunks:
+        chunk_cfg = dict(cfg, chunks=n_chunks)
+        t0 = time.perf_counter()
+        detections = run_chunked_detection(args.video, args.model, chunk_cfg)
+        chunk_elapsed = time.perf_counter() - t0
+        n, d = summarise(detections, frames.fps, chunk_cfg)
+        print(f"chunks={n_chunks:<3}: {chunk_elapsed:7.1f}s (x{elapsed / chunk_elapsed:.2f}), {n} players, "
+              f"{d:9.0f} m ({100 * (d - distance) / max(distance, 1e-9):+.1f}%)")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,76 @@
+# Mesure le temps de génération des heatmaps (équipes, joueurs) et des réseaux de passes
+# d'un match complet à partir des trajectoires stockées, sans relire la vidéo. Les trajectoires
+# viennent du match synthétique (scripts/synthetic_match.py), avec ses changements d'identifiants
+# de pistes : le nombre de pistes stables croît avec la durée du match, comme avec un vrai tracker.
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.insert(0, ROOT)
+
+from main import DEFAULT_CONFIG
+from src.main import export_figures, filter_players
+from src.pitch import PitchCalibration
+from src.track_store import NO_TEAM, TrackStore
+from synthetic_match import SyntheticMatch
+
+def synthetic_tracks(match, frame_skip):
+    store = TrackStore()
+    teams = np.where(match.kinds < 2, match.kinds, NO_TEAM).astype(np.int8)
+    for frame_idx in range(0, match.n_frames, frame_skip):
+        s = match.state(frame_idx)
+        visible = s['visible']
+        boxes = s['boxes'][visible]
+        store.append(frame_idx, s['ids'][visible], (boxes[:, 0] + boxes[:, 2]) / 2, (boxes[:, 1] + boxes[:, 3]) / 2,
+                     teams=teams[visible], foot_ys=boxes[:, 3])
+    return store
+
+def synthetic_passes(players, n_passes, rng):
+    events = []
+    for team in ('0', '1'):
+        ids = np.array([pid for pid, data in players.items() if data['team'] == team])
+        if len(ids) < 2:
+            continue
+        for s, r in rng.choice(ids, (n_passes // 2, 2)):
+            if s != r:
+                events.append({'type': 'pass', 'team_id': team, 'from_player_id': int(s), 'to_player_id': int(r)})
+    return events
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark heatmap and pass network rendering")
+    parser.add_argument('--minutes', type=float, nargs='+', default=[1, 5, 90])
+    parser.add_argument('--fps', type=float, default=25.0)
+    parser.add_argument('--frame-skip', type=int, default=10)
+    parser.add_argument('--id-switch-seconds', type=float, default=45.0, help="Lifetime of a track ID (0: IDs never change)")
+    parser.add_argument('--passes-per-minute', type=float, default=9)
+    parser.add_argument('--player-heatmaps', type=int, nargs='+', default=[DEFAULT_CONFIG['player_heatmaps'], -1],
+                        help="Values of player_heatmaps to compare (-1: every stable track)")
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    print(f"{'minutes':>7} {'tracks':>6} {'stable':>6} {'obs':>8} {'passes':>6} {'heatmaps':>8} {'figures':>7} {'time':>8}")
+    for minutes in args.minutes:
+        match = SyntheticMatch(minutes * 60, args.fps, 1920, 1080, seed=args.seed, id_switch_seconds=args.id_switch_seconds or None)
+        store = synthetic_tracks(match, args.frame_skip)
+        stable_ids = filter_players({pid: None for pid in store.counts()[0].tolist()}, store,
+                                    min_positions=DEFAULT_CONFIG['min_player_positions'])
+        players = {pid: {'team': match.team_of(pid)} for pid in stable_ids}
+        events = synthetic_passes(players, int(args.passes_per_minute * minutes), np.random.default_rng(args.seed))
+        for n_heatmaps in args.player_heatmaps:
+            cfg = dict(DEFAULT_CONFIG, frame_skip=args.frame_skip, pitch_keypoints=match.keypoints(),
+                       player_heatmaps=None if n_heatmaps < 0 else n_heatmaps)
+            calibration = PitchCalibration.from_config(cfg, args.fps)
+            with tempfile.TemporaryDirectory() as output_dir:
+                t0 = time.perf_counter()
+                written = export_figures(output_dir, store, calibration, players, events, cfg, (match.width, match.height))
+                elapsed = time.perf_counter() - t0
+            print(f"{minutes:>7g} {len(store.counts()[0]):>6} {len(players):>6} {len(store):>8} {len(events):>6} "
+                  f"{'all' if n_heatmaps < 0 else n_heatmaps:>8} {len(written):>7} {1e3 * elapsed:>6.0f}ms")
+
+if __name__ == '__main__':
+    main()
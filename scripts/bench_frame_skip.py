@@ -0,0 +1,49 @@
+# Compare le temps de détection+suivi entre l'inférence sur toutes les frames
+# (chemin historique) et l'inférence échantillonnée (seules les frames analysées).
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from src.detector import Detector
+from src.tracker import parse_frame_results
+from src.video_io import SampledFrameSource
+
+def run_full(detector, video, frame_skip):
+    analysed = 0
+    for frame_idx, res in enumerate(detector.detect(video)):
+        if frame_idx % frame_skip != 0: continue
+        parse_frame_results(res, detector)
+        analysed += 1
+    return analysed
+
+def run_sampled(detector, video, frame_skip):
+    analysed = 0
+    for frame_idx, res in detector.detect_sampled(SampledFrameSource(video, frame_skip), frame_skip=frame_skip):
+        parse_frame_results(res, detector)
+        analysed += 1
+    return analysed
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark full vs sampled inference")
+    parser.add_argument('--video', required=True, help="Path to the input video file.")
+    parser.add_argument('--model', default='models/yolov8n.pt', help="Path to the YOLO model file.")
+    parser.add_argument('--frame-skip', type=int, default=10)
+    args = parser.parse_args()
+
+    results = {}
+    for name, fn in (('full', run_full), ('sampled', run_sampled)):
+        # A fresh detector per mode so tracker state does not leak between runs
+        detector = Detector(model_name=args.model)
+        t0 = time.perf_counter()
+        analysed = fn(detector, args.video, args.frame_skip)
+        elapsed = time.perf_counter() - t0
+        results[name] = elapsed
+        print(f"{name:>8}: {elapsed:.2f}s for {analysed} analysed frames ({analysed / elapsed:.1f} frames/s)")
+
+    print(f"Speedup (full / sampled): {results['full'] / results['sampled']:.2f}x at frame_skip={args.frame_skip}")
+
+if __name__ == '__main__':
+    main()
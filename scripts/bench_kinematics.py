@@ -0,0 +1,72 @@
+# Compare l'ancien calcul incrémental distance/vitesse par image (update_player_movement,
+# conservé ici comme référence) au calcul cinématique complet en lot sur les trajectoires (kinematics).
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from src.kinematics import speed_series, player_kinematics
+from src.track_store import TrackStore
+from src.utils import pixel_distance, speed_kmh
+
+def legacy_update_player_movement(player_data, player_obj, frame_idx, fps, cfg):
+    # The per-frame distance and max speed update formerly run by MatchAnalyzer
+    cx, cy = player_obj['center']
+    frame_skip = cfg.get('frame_skip', 1)
+    if player_data.get('last_pos') is not None and player_data.get('last_frame') is not None:
+        if (frame_idx - player_data['last_frame']) < (frame_skip * 5):
+            dd = pixel_distance(player_data['last_pos'], (cx, cy))
+            player_data['dist_pixels'] += dd
+            dt = (frame_idx - player_data['last_frame']) / fps
+            if dt > 0:
+                sp = speed_kmh(dd, dt, cfg.get('pixels_to_meters', 0.1))
+                if sp > player_data['max_speed_kmh']:
+                    player_data['max_speed_kmh'] = sp
+    player_data['last_pos'] = (cx, cy)
+    player_data['last_frame'] = frame_idx
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark incremental vs batch player kinematics")
+    parser.add_argument('--minutes', type=float, default=90)
+    parser.add_argument('--players', type=int, default=22)
+    parser.add_argument('--fps', type=float, default=25.0)
+    parser.add_argument('--frame-skip', type=int, default=10)
+    args = parser.parse_args()
+    cfg = {'frame_skip': args.frame_skip, 'pixels_to_meters': 0.1}
+
+    rng = np.random.default_rng(0)
+    frames = np.arange(0, int(args.minutes * 60 * args.fps), args.frame_skip)
+    ids = np.arange(1, args.players + 1)
+    walk = np.cumsum(rng.normal(0, 3, (len(frames), args.players, 2)), axis=0) + 500
+
+    store = TrackStore()
+    for i, frame_idx in enumerate(frames):
+        store.append(frame_idx, ids, walk[i, :, 0], walk[i, :, 1])
+
+    players = {pid: {'dist_pixels': 0.0, 'last_pos': None, 'last_frame': None, 'max_speed_kmh': 0.0} for pid in ids.tolist()}
+    t0 = time.perf_counter()
+    for i, frame_idx in enumerate(frames.tolist()):
+        for j, pid in enumerate(ids.tolist()):
+            legacy_update_player_movement(players[pid], {'center': (walk[i, j, 0], walk[i, j, 1])}, frame_idx, args.fps, cfg)
+    incremental = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    series = speed_series(store, args.fps, cfg)
+    player_kinematics(store, args.fps, cfg, series)
+    batch = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    player_kinematics(store, args.fps, dict(cfg, sprint_speed_kmh=22.0), series)
+    rerun = time.perf_counter() - t0
+
+    print(f"{len(store)} observations ({args.minutes:g} min, {args.players} players)")
+    print(f"incremental update_player_movement: {1000 * incremental:8.1f} ms (distance + max speed only)")
+    print(f"batch kinematics                  : {1000 * batch:8.1f} ms (smoothed speeds, accel, sprints, zones)")
+    print(f"re-run with new thresholds        : {1000 * rerun:8.1f} ms")
+
+if __name__ == '__main__':
+    main()
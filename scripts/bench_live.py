@@ -0,0 +1,72 @@
+# Mesure le mode direct (--live) sur une vidéo synthétique lue en boucle au rythme de sa
+# fréquence d'images, les détections synthétiques remplaçant l'inférence avec un délai simulé :
+# images analysées ou abandonnées, latence capture -> émission (p50/p95) et lignes émises,
+# selon la durée de l'inférence.
+import argparse
+import contextlib
+import io
+import json
+import os
+import sys
+import tempfile
+import time
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.insert(0, ROOT)
+
+from main import DEFAULT_CONFIG
+from src.live import run_live
+from synthetic_match import SyntheticMatch
+
+def stand_in_inference(match, inference_s):
+    def stage(frames):
+        for frame_idx, frame in frames:
+            time.sleep(inference_s)
+            # The looped video restarts, and so do its detections
+            yield (frame_idx, *match.detections(frame_idx % match.n_frames), frame)
+    return stage
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark live analysis latency on a looping synthetic video")
+    parser.add_argument('--video-seconds', type=float, default=20)
+    parser.add_argument('--duration', type=float, default=20, help="Seconds of live analysis per run")
+    parser.add_argument('--fps', type=float, default=25.0)
+    parser.add_argument('--width', type=int, default=1280)
+    parser.add_argument('--height', type=int, default=720)
+    parser.add_argument('--frame-skip', type=int, default=5)
+    parser.add_argument('--inference-ms', type=float, nargs='+', default=[20, 150, 400],
+                        help="Simulated inference time per frame")
+    parser.add_argument('--max-latency', type=float, default=1.0, help="Latency budget, seconds")
+    args = parser.parse_args()
+
+    match = SyntheticMatch(args.video_seconds, args.fps, args.width, args.height)
+    with tempfile.TemporaryDirectory() as tmp:
+        video_path = os.path.join(tmp, 'synthetic.mp4')
+        match.write_video(video_path)
+        cfg = dict(DEFAULT_CONFIG, frame_skip=args.frame_skip, pitch_keypoints=match.keypoints(),
+                   live_max_latency_seconds=args.max_latency, detection_cache_dir=None, figures=False)
+        print(f"{args.duration:g}s of a looping {args.width}x{args.height} {args.fps:g} fps video, one frame in "
+              f"{args.frame_skip} offered ({args.fps / args.frame_skip:g}/s), latency budget {args.max_latency:g}s")
+        print(f"{'inference':>9} {'analysed':>8} {'overrun':>8} {'stale':>6} {'late':>5} {'updates':>7} "
+              f"{'frame p50':>9} {'emit p50':>8} {'emit p95':>8} {'emit max':>8}")
+        runs = {}
+        for inference_ms in args.inference_ms:
+            output_dir = os.path.join(tmp, f'live_{inference_ms:g}')
+            with contextlib.redirect_stdout(io.StringIO()):
+                summary = run_live(video_path, output_dir, None, cfg, loop=True, duration_s=args.duration,
+                                   inference_stage=stand_in_inference(match, inference_ms / 1e3))
+            with open(os.path.join(output_dir, 'live_stats.jsonl')) as f:
+                lines = runs[inference_ms] = [json.loads(line) for line in f]
+            frames, emit = summary['frames'], summary['emit_latency']
+            ms = lambda s: f"{s * 1e3:.0f}ms"
+            print(f"{inference_ms:>7g}ms {frames['analysed']:>8} {frames['dropped_overrun']:>8} {frames['dropped_stale']:>6} "
+                  f"{frames['dropped_late']:>5} {len(lines):>7} {ms(summary['frame_latency']['p50_s']):>9} {ms(emit['p50_s']):>8} "
+                  f"{ms(emit['p95_s']):>8} {ms(emit['max_s']):>8}")
+        inference_ms = min(runs)
+        lines = runs[inference_ms]
+        final = lines[-1]
+        print(f"\n{inference_ms:g}ms run, final line: possession {json.dumps(final['possession'])}, "
+              f"{len(final['team_stats'])} teams in team_stats, {sum(len(l['events']) for l in lines)} events emitted")
+
+if __name__ == '__main__':
+    main()
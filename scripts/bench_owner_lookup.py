@@ -0,0 +1,81 @@
+# Compare la recherche du porteur du ballon : ancienne boucle Python sur les joueurs et
+# index spatial (KD-tree) par image, pour des images typiques (22 joueurs) et chargées
+# (44 détections), ainsi qu'une recherche groupée sur tout un extrait (alternative définie ici, non utilisée par l'analyse).
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from src.main import find_ball_owner
+from scipy.spatial import cKDTree
+
+from src.spatial import PlayerIndex, foot_points
+from src.utils import box_center, pixel_distance
+
+def legacy_find_ball_owner(ball, persons):
+    # Reference: the previous implementation, a linear scan over box centres
+    owner = None
+    if not ball or not persons: return None
+    bx, by = box_center(ball['box'])
+    min_dist = float('inf')
+    for p in persons:
+        cx, cy = box_center(p['box'])
+        d = pixel_distance((cx, cy), (bx, by))
+        if d < min_dist:
+            min_dist, owner = d, p
+    return owner
+
+def nearest_per_frame(frames, points, query_frames, query_points, max_distance):
+    # Batched alternative: all frames in a single KD-tree, the frame index as a third
+    # coordinate spread further apart than max_distance so no query reaches another frame
+    spacing = 2.0 * max_distance + 1.0
+    tree = cKDTree(np.column_stack((np.asarray(frames) * spacing, points)))
+    dist, rows = tree.query(np.column_stack((np.asarray(query_frames) * spacing, query_points)),
+                            distance_upper_bound=max_distance)
+    return np.where(np.isfinite(dist), rows, -1), dist
+
+def synthetic_frames(n_frames, n_persons, rng):
+    frames = []
+    for _ in range(n_frames):
+        cx, cy = rng.uniform(0, 1920, n_persons), rng.uniform(0, 1080, n_persons)
+        persons = [{'id': i + 1, 'box': [x - 15, y - 40, x + 15, y + 40], 'conf': 0.9} for i, (x, y) in enumerate(zip(cx, cy))]
+        bx, by = rng.uniform(0, 1920), rng.uniform(0, 1080)
+        frames.append((persons, {'id': 0, 'box': [bx - 4, by - 4, bx + 4, by + 4], 'conf': 0.5}))
+    return frames
+
+def time_per_frame(fn, frames):
+    t0 = time.perf_counter()
+    for persons, ball in frames:
+        fn(ball, persons)
+    return (time.perf_counter() - t0) / len(frames) * 1e6
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark ball-owner lookup")
+    parser.add_argument('--frames', type=int, default=5000)
+    parser.add_argument('--max-distance', type=float, default=30.0, help="Max possession distance in pixels.")
+    args = parser.parse_args()
+    rng = np.random.default_rng(0)
+
+    for n_persons in (22, 44):
+        frames = synthetic_frames(args.frames, n_persons, rng)
+        legacy = time_per_frame(legacy_find_ball_owner, frames)
+        indexed = time_per_frame(lambda ball, persons: find_ball_owner(ball, persons, args.max_distance), frames)
+        print(f"{n_persons} detections: legacy {legacy:6.1f} us/frame, indexed {indexed:6.1f} us/frame")
+
+        # Whole clip: one batched query for every frame
+        frame_ids = np.repeat(np.arange(len(frames)), n_persons)
+        points = foot_points([p['box'] for persons, _ in frames for p in persons])
+        balls = np.array([box_center(ball['box']) for _, ball in frames])
+        t0 = time.perf_counter()
+        rows, _ = nearest_per_frame(frame_ids, points, np.arange(len(frames)), balls, args.max_distance)
+        batched = (time.perf_counter() - t0) / len(frames) * 1e6
+        expected = [PlayerIndex(points[i * n_persons:(i + 1) * n_persons]).nearest(balls[i], args.max_distance)[0] for i in range(len(frames))]
+        same = all((r - i * n_persons if r >= 0 else None) == e for i, (r, e) in enumerate(zip(rows, expected)))
+        print(f"{n_persons} detections: batched clip query {batched:6.1f} us/frame, owners {'identical' if same else 'MISMATCH'}")
+
+if __name__ == '__main__':
+    main()
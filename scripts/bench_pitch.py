@@ -0,0 +1,82 @@
+# Mesure la calibration du terrain : suivi du mouvement de caméra sur un terrain synthétique
+# filmé en perspective avec un panoramique, et coût de la projection en masse des trajectoires.
+import argparse
+import os
+import sys
+import time
+
+import cv2
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from src.pitch import PITCH_KEYPOINTS, PitchCalibration, homography_from_keypoints, project
+
+SCALE = 20  # pixels per metre of the top-view pitch texture
+
+def pitch_texture(rng):
+    # Top view with mowing stripes, grass noise and the main lines
+    h, w = int(68 * SCALE), int(105 * SCALE)
+    texture = np.zeros((h, w, 3), dtype=np.uint8)
+    stripes = (np.arange(w) // (5 * SCALE)) % 2
+    texture[:] = np.where(stripes[None, :, None], (40, 140, 40), (50, 160, 50)).astype(np.uint8)
+    texture = cv2.add(texture, rng.integers(0, 25, texture.shape, dtype=np.uint8))
+    white = (255, 255, 255)
+    cv2.rectangle(texture, (0, 0), (w - 1, h - 1), white, 3)
+    cv2.line(texture, (w // 2, 0), (w // 2, h), white, 3)
+    cv2.circle(texture, (w // 2, h // 2), int(9.15 * SCALE), white, 3)
+    for x0, x1 in ((0, 16.5), (105, 88.5)):
+        cv2.rectangle(texture, (int(x0 * SCALE), int(13.84 * SCALE)), (int(x1 * SCALE), int(54.16 * SCALE)), white, 3)
+    return texture
+
+def camera(pan_m):
+    # Broadcast-like view: pitch metres -> image pixels, panning along the length
+    src = np.float32([[30 + pan_m, 10], [75 + pan_m, 10], [80 + pan_m, 68], [25 + pan_m, 68]])
+    dst = np.float32([[300, 200], [1620, 200], [1900, 1060], [20, 1060]])
+    return cv2.getPerspectiveTransform(src, dst)
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark pitch calibration and bulk projection")
+    parser.add_argument('--frames', type=int, default=250)
+    parser.add_argument('--pan-m-per-frame', type=float, default=0.04)
+    parser.add_argument('--rows', type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    texture = pitch_texture(rng)
+    to_texture = np.diag([1.0 / SCALE, 1.0 / SCALE, 1.0])  # texture pixels -> metres
+
+    first = camera(0.0)
+    names = ['left_box_top', 'left_box_bottom', 'halfway_top', 'centre', 'centre_circle_bottom', 'halfway_bottom']
+    keypoints = {}
+    for name in names:
+        u, v = project(first, [PITCH_KEYPOINTS[name][0]], [PITCH_KEYPOINTS[name][1]])
+        keypoints[name] = [float(u[0]), float(v[0])]
+    calibration = PitchCalibration(homography_from_keypoints(keypoints), refresh_interval=5)
+
+    update_time, errors = 0.0, []
+    probe_m = np.array([[40.0, 30.0], [52.5, 60.0], [60.0, 20.0]])
+    for frame_idx in range(args.frames):
+        view = camera(frame_idx * args.pan_m_per_frame)
+        frame = cv2.warpPerspective(texture, view @ to_texture, (1920, 1080))
+        t0 = time.perf_counter()
+        calibration.update(frame_idx, frame)
+        update_time += time.perf_counter() - t0
+        u, v = project(view, probe_m[:, 0], probe_m[:, 1])
+        px, py = calibration.to_pitch(np.full(len(u), frame_idx), u, v)
+        errors.append(np.hypot(px - probe_m[:, 0], py - probe_m[:, 1]).max())
+
+    frames = np.sort(rng.integers(0, args.frames, args.rows))
+    xs, ys = rng.uniform(0, 1920, args.rows), rng.uniform(200, 1080, args.rows)
+    t0 = time.perf_counter()
+    calibration.to_pitch(frames, xs, ys)
+    bulk_time = time.perf_counter() - t0
+
+    pan = args.frames * args.pan_m_per_frame
+    print(f"{args.frames} frames, camera pan {pan:.1f} m, {len(calibration.starts)} camera segments")
+    print(f"update      : {1e3 * update_time / args.frames:6.2f} ms/frame (motion estimated every 5 frames)")
+    print(f"error       : median {np.median(errors):.2f} m, max {np.max(errors):.2f} m (vs {pan:.1f} m without tracking)")
+    print(f"bulk project: {1e3 * bulk_time:6.1f} ms for {args.rows} rows ({1e9 * bulk_time / args.rows:.1f} ns/row)")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,83 @@
+# Compare le coût de rendu par image des trajectoires (redessin complet vs rendu
+# incrémental) à la minute 1 et à la minute 5 d'un match synthétique.
+import argparse
+import os
+import sys
+import time
+
+import cv2
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from src.visualization import draw_annotations, TrailRenderer, PLAYER_COLORS
+
+def draw_full_trails(frame, players):
+    # Reference: the previous renderer, redrawing every trajectory on every frame
+    for pid, player_data in players.items():
+        positions = np.array(player_data['positions'], dtype=np.int32).reshape((-1, 3))
+        if len(positions) > 2:
+            color = PLAYER_COLORS[pid % len(PLAYER_COLORS)][0].tolist()
+            points = np.ascontiguousarray(positions[:, 1:]).reshape((-1, 1, 2))
+            cv2.polylines(frame, [points], isClosed=False, color=color, thickness=2)
+    return frame
+
+def synthetic_players(n_players, frame_idx, rng_offsets):
+    t = frame_idx / 25.0
+    ids = np.arange(1, n_players + 1)
+    xs = 960 + 700 * np.sin(0.05 * t + rng_offsets)
+    ys = 540 + 400 * np.cos(0.07 * t + 2 * rng_offsets)
+    return ids, xs, ys
+
+def bench(minutes_marks, n_players, fps, frame_skip, width, height, trails_factory):
+    rng_offsets = np.random.default_rng(0).uniform(0, 2 * np.pi, n_players)
+    players = {}
+    trails = trails_factory()
+    frame = np.zeros((height, width, 3), dtype=np.uint8)
+    timings = {}
+    last_minute = max(minutes_marks)
+    marks = {int(m * 60 * fps) // frame_skip * frame_skip: m for m in minutes_marks}
+    window = []
+    for frame_idx in range(0, int(last_minute * 60 * fps) + 1, frame_skip):
+        ids, xs, ys = synthetic_players(n_players, frame_idx, rng_offsets)
+        for pid, x, y in zip(ids, xs, ys):
+            p = players.setdefault(int(pid), {'positions': [], 'last_pos': None, 'last_frame': None})
+            p['positions'].append((frame_idx, x, y))
+            p['last_pos'] = (x, y)
+            p['last_frame'] = frame_idx
+        t0 = time.perf_counter()
+        out = frame.copy()
+        if trails is None:
+            draw_full_trails(out, players)
+        draw_annotations(out, players, None, {}, trails)
+        window.append(time.perf_counter() - t0)
+        window = window[-20:]
+        if frame_idx in marks:
+            timings[marks[frame_idx]] = 1000 * float(np.median(window))
+    return timings
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark trajectory rendering over the length of a clip")
+    parser.add_argument('--players', type=int, default=22)
+    parser.add_argument('--fps', type=float, default=25.0)
+    parser.add_argument('--frame-skip', type=int, default=1)
+    parser.add_argument('--width', type=int, default=1920)
+    parser.add_argument('--height', type=int, default=1080)
+    parser.add_argument('--trail-seconds', type=float, default=10.0)
+    args = parser.parse_args()
+
+    max_trail_frames = round(args.trail_seconds * args.fps / args.frame_skip)
+    shape = (args.height, args.width)
+    renderers = {
+        'full redraw': lambda: None,
+        'incremental': lambda: TrailRenderer(shape),
+        'incremental+fade': lambda: TrailRenderer(shape, max_trail_frames, fade=True),
+        'incremental+cut': lambda: TrailRenderer(shape, max_trail_frames, fade=False),
+    }
+    print(f"{'renderer':<18} {'minute 1 (ms)':>14} {'minute 5 (ms)':>14}")
+    for name, factory in renderers.items():
+        timings = bench([1, 5], args.players, args.fps, args.frame_skip, args.width, args.height, factory)
+        print(f"{name:<18} {timings[1]:>14.2f} {timings[5]:>14.2f}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,100 @@
+# Mesure la génération des rapports tactiques contre un serveur local compatible OpenAI
+# (latence et erreurs simulées) : requêtes séquentielles puis concurrentes pour un lot de
+# matchs, reprises après erreurs transitoires, et second passage servi par le cache.
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from src.tactical_analysis import ReportGenerator
+
+class StandInServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, latency_s, failure_rate, seed=0):
+        super().__init__(('127.0.0.1', 0), StandInHandler)
+        self.latency_s = latency_s
+        self.failure_rate = failure_rate
+        self.rng = random.Random(seed)
+        self.lock = threading.Lock()
+        self.requests = self.failures = 0
+
+    @property
+    def url(self):
+        return f"http://127.0.0.1:{self.server_address[1]}/v1"
+
+class StandInHandler(BaseHTTPRequestHandler):
+    # Answers /v1/chat/completions after a fixed latency, failing with a 503 at the given rate
+    def do_POST(self):
+        server = self.server
+        body = json.loads(self.rfile.read(int(self.headers['Content-Length'])))
+        with server.lock:
+            server.requests += 1
+            fail = server.rng.random() < server.failure_rate
+            server.failures += fail
+        time.sleep(server.latency_s)
+        if fail:
+            self._reply(503, {'error': {'message': 'overloaded', 'type': 'server_error'}})
+            return
+        prompt = body['messages'][-1]['content']
+        self._reply(200, {
+            'id': 'chatcmpl-standin', 'object': 'chat.completion', 'created': int(time.time()), 'model': body['model'],
+            'choices': [{'index': 0, 'finish_reason': 'stop',
+                         'message': {'role': 'assistant', 'content': f"Report for a prompt of {len(prompt)} characters."}}],
+            'usage': {'prompt_tokens': 0, 'completion_tokens': 0, 'total_tokens': 0}
+        })
+
+    def _reply(self, status, payload):
+        data = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, *args):
+        pass
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark tactical report generation against a local stand-in server")
+    parser.add_argument('--matches', type=int, default=16)
+    parser.add_argument('--latency', type=float, default=0.5, help="Seconds per request")
+    parser.add_argument('--failure-rate', type=float, default=0.2)
+    parser.add_argument('--concurrency', type=int, default=4)
+    args = parser.parse_args()
+
+    server = StandInServer(args.latency, args.failure_rate)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    prompts = [f"# Team Statistics\nmatch {i}\n" + "x" * 2000 for i in range(args.matches)]
+
+    with tempfile.TemporaryDirectory() as cache_dir:
+        runs = [
+            ('sequential', dict(max_concurrency=1, cache_dir=None), False),
+            (f'{args.concurrency} concurrent', dict(max_concurrency=args.concurrency, cache_dir=cache_dir), True),
+            ('cached', dict(max_concurrency=args.concurrency, cache_dir=cache_dir), True),
+        ]
+        print(f"{args.matches} reports, {args.latency:.2f}s per request, {args.failure_rate:.0%} transient failures")
+        for name, settings, concurrent in runs:
+            generator = ReportGenerator(base_url=server.url, backoff_seconds=0.05, **settings)
+            requests0, failures0 = server.requests, server.failures
+            t0 = time.perf_counter()
+            if concurrent:
+                reports = generator.generate_many(prompts)
+            else:
+                reports = [generator.generate(prompt) for prompt in prompts]
+            elapsed = time.perf_counter() - t0
+            generator.close()
+            errors = sum(r.startswith("ERROR:") for r in reports)
+            print(f"  {name:<14} {elapsed:6.2f}s  requests={server.requests - requests0:<3} "
+                  f"retried failures={server.failures - failures0:<3} failed reports={errors}")
+    server.shutdown()
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,254 @@
+# Suite de benchmarks reproductible, sans modèle ni vidéo réelle : un match synthétique
+# (scripts/synthetic_match.py) de 1, 5 et 90 minutes est analysé par le vrai MatchAnalyzer
+# à partir de détections synthétiques, puis exporté ; une courte vidéo synthétique est aussi
+# décodée, analysée (équipes par couleur de maillot, calibration, annotation) et encodée.
+# Les temps par étape sont enregistrés en JSON (avec le commit et les versions) et peuvent
+# être comparés à un run précédent avec --baseline.
+import argparse
+import contextlib
+import io
+import itertools
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+
+import cv2
+import numpy as np
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.insert(0, ROOT)
+
+from main import DEFAULT_CONFIG
+from src.ball_track import BallTracker
+from src.kinematics import player_kinematics
+from src.main import MatchAnalyzer, export_results, export_figures, filter_players, write_frames
+from src.pipeline import Pipeline
+from src.profiling import Profiler
+from src.video_io import AnnotatedVideoWriter, SampledFrameSource
+from synthetic_match import SyntheticMatch
+
+# Stages reported in the tables, with the code they time
+STAGES = {
+    'analysis.movement': 'TrackStore.append',
+    'analysis.stats': 'stats.calculate_team_stats',
+    'analysis.owner': 'find_ball_owner',
+    'analysis.events': 'EventManager.update',
+    'analysis.annotate': 'draw_annotations',
+    'teams': '(ground truth, not timed code)',
+    'post.kinematics': 'player_kinematics',
+    'post.export': 'export_results',
+    'post.figures': 'export_figures',
+}
+
+def git_revision():
+    def git(*args):
+        return subprocess.run(['git', *args], cwd=ROOT, capture_output=True, text=True, check=True).stdout.strip()
+    try:
+        return {'commit': git('rev-parse', 'HEAD'), 'dirty': bool(git('status', '--porcelain', '--untracked-files=no'))}
+    except (OSError, subprocess.CalledProcessError):
+        return {'commit': None, 'dirty': None}
+
+def environment():
+    return {
+        **git_revision(),
+        'date': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'opencv': cv2.__version__,
+        'platform': platform.platform(),
+        'processor': platform.processor() or platform.machine(),
+        'cpu_count': os.cpu_count()
+    }
+
+def summarize(profiler, wall_s, frames, late_from):
+    # Whole-run percentiles, plus the median over the last frames (the cost at this match length)
+    summary = profiler.summary(wall_s, frames)
+    for name, stage in summary['stages'].items():
+        late = [s for n, f, s in profiler.records if n == name and f is not None and f >= late_from]
+        stage['late_p50_ms'] = round(1e3 * float(np.median(late)), 3) if late else None
+    del summary['errors_by_type']
+    return summary
+
+def post_process(profiler, analyzer, ball_tracker, output_dir, cfg, fps, frame_size, label):
+    # The post-run steps of run_analysis, timed
+    timer = profiler.frame_timer(None)
+    players = filter_players(analyzer.players, analyzer.track_store, min_positions=cfg.get('min_player_positions', 2))
+    kinematics = player_kinematics(analyzer.track_store, fps, cfg, calibration=analyzer.calibration)
+    ball_track = ball_tracker.track()
+    timer.lap('post.kinematics')
+    with contextlib.redirect_stdout(io.StringIO()):
+        export_results(output_dir, players, analyzer.events, f'{label}.mp4', cfg, analyzer.team_possession_seconds,
+                       analyzer.last_frame_idx / fps, analyzer.team_stats_history, False, kinematics,
+                       analyzer.track_store, ball_track, analyzer.calibration)
+        timer.lap('post.export')
+        export_figures(output_dir, analyzer.track_store, analyzer.calibration, players, analyzer.events, cfg, frame_size)
+        timer.lap('post.figures')
+    return players
+
+def checks(analyzer, players):
+    # Output counters, so that a faster commit which changes the results is noticed
+    events = {}
+    for e in analyzer.events:
+        events[e['type']] = events.get(e['type'], 0) + 1
+    return {
+        'track_ids': len(analyzer.players),
+        'stable_players': len(players),
+        'observations': len(analyzer.track_store),
+        'events': dict(sorted(events.items())),
+        'possession_s': {team: round(s, 1) for team, s in sorted(analyzer.team_possession_seconds.items())},
+        'frame_errors': analyzer.profiler.n_errors
+    }
+
+def bench_detections(minutes, args):
+    """
+    Analyses a synthetic match from its detection stream, as when replaying cached detections,
+    annotating a blank pitch on the last `args.annotate_frames` analysed frames.
+
+    Without images, the team of each new track is taken from the ground truth right
+    after its first frame, as the jersey-colour classifier would report it.
+    """
+    match = SyntheticMatch(minutes * 60, args.fps, args.width, args.height, seed=args.seed)
+    cfg = dict(DEFAULT_CONFIG, frame_skip=args.frame_skip, team_classification='position',
+               pitch_keypoints=match.keypoints(), homography_refresh_seconds=None)
+    profiler = Profiler()
+    analyzer = MatchAnalyzer(cfg, args.fps, profiler)
+    analyzer.teams_identified = True
+    analyzer.team_possession_seconds = {'0': 0, '1': 0}
+    analysed = range(0, match.n_frames, args.frame_skip)
+    late_from = analysed[max(0, len(analysed) - args.annotate_frames)]
+
+    def source():
+        background = match.background()
+        for frame_idx, persons, balls, _ in match.stream(args.frame_skip):
+            yield frame_idx, persons, balls, background.copy() if frame_idx >= late_from else None
+
+    pipeline = Pipeline(source(), 'synthetic', threaded=False, profiler=profiler)
+    ball_tracker = BallTracker(args.fps, cfg)
+    pipeline.add_stage('ball', ball_tracker.process)
+    pipeline.add_stage('analysis', analyzer.process)
+
+    def ground_truth_teams(annotated):
+        known = 0
+        for item in annotated:
+            new = list(itertools.islice(analyzer.players, known, None))
+            known += len(new)
+            analyzer.update_teams({pid: match.team_of(pid) for pid in new})
+            yield item
+
+    pipeline.add_stage('teams', ground_truth_teams)
+    t0 = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        pipeline.run()
+    analyzer.finish()
+    with tempfile.TemporaryDirectory() as output_dir:
+        players = post_process(profiler, analyzer, ball_tracker, output_dir, cfg, args.fps, (args.width, args.height), f'synthetic_{minutes:g}min')
+    return {**summarize(profiler, time.perf_counter() - t0, len(analysed), late_from), 'checks': checks(analyzer, players)}
+
+def bench_video(args):
+    """
+    Writes a short synthetic video, then decodes, analyses (teams from jersey colours,
+    camera calibration, annotation) and encodes it, with the synthetic detections
+    standing in for inference.
+    """
+    match = SyntheticMatch(args.video_seconds, args.fps, args.width, args.height, seed=args.seed)
+    cfg = dict(DEFAULT_CONFIG, frame_skip=args.frame_skip, team_classification='appearance', pitch_keypoints=match.keypoints(),
+               video_codec=args.video_codec or None)
+    with tempfile.TemporaryDirectory() as output_dir:
+        video_path = os.path.join(output_dir, 'synthetic.mp4')
+        t0 = time.perf_counter()
+        match.write_video(video_path)
+        write_s = time.perf_counter() - t0
+
+        profiler = Profiler()
+        analyzer = MatchAnalyzer(cfg, args.fps, profiler)
+        frame_source = SampledFrameSource(video_path, args.frame_skip)
+        writer = AnnotatedVideoWriter.from_config(cfg, os.path.join(output_dir, 'synthetic_annotated'), args.fps / args.frame_skip,
+                                                  (args.width, args.height), background=False)
+        pipeline = Pipeline(frame_source, 'decode', threaded=False, profiler=profiler)
+        pipeline.add_stage('inference', lambda frames: ((i, *match.detections(i), frame) for i, frame in frames))
+        ball_tracker = BallTracker(args.fps, cfg)
+        pipeline.add_stage('ball', ball_tracker.process)
+        pipeline.add_stage('analysis', analyzer.process)
+        if writer is not None:
+            pipeline.add_stage('encode', lambda frames: write_frames(writer, frames))
+        t0 = time.perf_counter()
+        try:
+            with contextlib.redirect_stdout(io.StringIO()):
+                pipeline.run()
+        finally:
+            if writer is not None:
+                writer.close()
+        analyzer.finish()
+        players = post_process(profiler, analyzer, ball_tracker, output_dir, cfg, args.fps, (args.width, args.height), 'synthetic_video')
+        summary = summarize(profiler, time.perf_counter() - t0, len(frame_source), 0)
+        if writer is not None:
+            summary['video_output'] = writer.stats()
+    teams = analyzer.team_classifier.teams if analyzer.team_classifier is not None else {}
+    correct = sum(team == match.team_of(pid) for pid, team in teams.items())
+    return {**summary, 'video_write_s': round(write_s, 3),
+            'checks': {**checks(analyzer, players), 'team_accuracy': round(correct / max(1, len(teams)), 3)}}
+
+def print_run(label, result):
+    print(f"{label}: {result['frames']} analysed frames in {result['wall_s']:.2f}s ({result['fps']:.1f} frames/s), "
+          f"peak RSS {result['peak_rss_mb']} MiB")
+    for name, s in result['stages'].items():
+        late = f"{s['late_p50_ms']:8.3f}" if s.get('late_p50_ms') is not None else f"{'-':>8}"
+        print(f"  {name:<20} {STAGES.get(name, ''):<30} mean={s['mean_ms']:8.3f}ms p95={s['p95_ms']:8.3f}ms "
+              f"late p50={late}ms total={s['total_s']:7.2f}s")
+    print(f"  checks: {json.dumps(result['checks'])}")
+
+def print_comparison(results, baseline):
+    print(f"\nComparison with {baseline['meta'].get('commit') or 'baseline'} (mean ms per item, new / old):")
+    for label, run in results['runs'].items():
+        old = baseline['runs'].get(label)
+        if old is None:
+            continue
+        print(f"  {label}")
+        for name, s in run['stages'].items():
+            before = old['stages'].get(name)
+            if before is None or not before['mean_ms']:
+                continue
+            print(f"    {name:<20} {before['mean_ms']:9.3f} -> {s['mean_ms']:9.3f}  x{s['mean_ms'] / before['mean_ms']:.2f}")
+        if run['checks'] != old['checks']:
+            print(f"    checks changed: {json.dumps(old['checks'])} -> {json.dumps(run['checks'])}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Reproducible benchmark suite on synthetic matches")
+    parser.add_argument('--minutes', type=float, nargs='+', default=[1, 5, 90], help="Match lengths analysed from detections")
+    parser.add_argument('--video-seconds', type=float, default=20, help="Length of the synthetic video (0 skips the video run)")
+    parser.add_argument('--video-codec', default=DEFAULT_CONFIG['video_codec'], help="Codec of the annotated video ('' for none)")
+    parser.add_argument('--frame-skip', type=int, default=DEFAULT_CONFIG['frame_skip'])
+    parser.add_argument('--fps', type=float, default=25.0)
+    parser.add_argument('--width', type=int, default=1920)
+    parser.add_argument('--height', type=int, default=1080)
+    parser.add_argument('--annotate-frames', type=int, default=50, help="Analysed frames annotated at the end of each match")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', help="Results JSON (default: bench_results/<commit>.json)")
+    parser.add_argument('--baseline', help="A previous results JSON to compare with")
+    args = parser.parse_args()
+
+    results = {'meta': {**environment(), 'args': vars(args)}, 'runs': {}}
+    for minutes in args.minutes:
+        label = f'{minutes:g}min'
+        results['runs'][label] = bench_detections(minutes, args)
+        print_run(f"{label} from detections", results['runs'][label])
+    if args.video_seconds > 0:
+        label = f'video_{args.video_seconds:g}s'
+        results['runs'][label] = bench_video(args)
+        print_run(f"{label} decode+analysis+encode", results['runs'][label])
+
+    output = args.output or os.path.join(ROOT, 'bench_results', f"{(results['meta']['commit'] or 'unknown')[:10]}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, 'w') as f:
+        json.dump(results, f, indent=2)
+    print(f"\nResults saved to {output}")
+    if args.baseline:
+        with open(args.baseline) as f:
+            print_comparison(results, json.load(f))
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,78 @@
+# Mesure le coût par image de la classification d'équipe par couleur de maillot et sa
+# précision sur des images synthétiques (deux équipes, un arbitre, joueurs remplacés en cours de match).
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from src.team_classifier import TeamClassifier, torso_features
+
+# BGR jersey colours: team 0, team 1, referee
+JERSEYS = np.array([[40, 40, 200], [230, 230, 230], [20, 20, 20]], dtype=np.float64)
+PITCH = np.array([40, 140, 40], dtype=np.float64)
+
+def synthetic_frames(n_frames, players_per_team, replace_every, rng, width=1920, height=1080, box=(40, 90)):
+    # Each team keeps players_per_team tracks on screen; one track of each team is replaced
+    # by a new ID every `replace_every` frames, so late tracks keep appearing
+    n_slots = 2 * players_per_team + 1
+    slot_ids = np.arange(1, n_slots + 1)
+    slot_kind = np.array([0] * players_per_team + [1] * players_per_team + [2])
+    next_id = n_slots + 1
+    for step in range(n_frames):
+        if step and step % replace_every == 0:
+            for team in (0, 1):
+                slot = rng.choice(np.flatnonzero(slot_kind == team))
+                slot_ids[slot], next_id = next_id, next_id + 1
+        frame = (PITCH + rng.normal(0, 8, (height, width, 3))).clip(0, 255).astype(np.uint8)
+        persons = []
+        for pid, kind in zip(slot_ids.tolist(), slot_kind.tolist()):
+            x = int(rng.uniform(0, width - box[0]))
+            y = int(rng.uniform(0, height - box[1]))
+            # Jersey with shading noise, shorts/legs below, head above
+            torso = JERSEYS[kind] * rng.uniform(0.7, 1.1) + rng.normal(0, 12, (box[1] // 2, box[0], 3))
+            frame[y + box[1] // 6:y + box[1] // 6 + box[1] // 2, x:x + box[0]] = torso.clip(0, 255)
+            frame[y:y + box[1] // 6, x + box[0] // 3:x + 2 * box[0] // 3] = (120, 160, 210)
+            persons.append({'id': pid, 'box': [x, y, x + box[0], y + box[1]], 'conf': 0.9, 'kind': kind})
+        yield frame, persons
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark jersey-colour team classification")
+    parser.add_argument('--frames', type=int, default=300)
+    parser.add_argument('--players-per-team', type=int, default=11)
+    parser.add_argument('--replace-every', type=int, default=15)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    classifier = TeamClassifier(sample_frames=20)
+    kinds = {}
+    feature_time = update_time = 0.0
+    for frame, persons in synthetic_frames(args.frames, args.players_per_team, args.replace_every, rng):
+        for p in persons:
+            kinds[p['id']] = p['kind']
+        t0 = time.perf_counter()
+        torso_features(frame, [p['box'] for p in persons])
+        feature_time += time.perf_counter() - t0
+        t0 = time.perf_counter()
+        classifier.update(frame, persons)
+        update_time += time.perf_counter() - t0
+
+    # Cluster labels are arbitrary: map each to its most frequent true team
+    pairs = np.array([(kinds[pid], -1 if team is None else int(team)) for pid, team in classifier.teams.items()])
+    players = pairs[pairs[:, 0] < 2]
+    mapping = {label: np.bincount(players[players[:, 1] == label, 0]).argmax() for label in (0, 1)
+               if (players[:, 1] == label).any()}
+    correct = sum(mapping.get(label, -2) == kind for kind, label in players)
+    referees = pairs[pairs[:, 0] == 2]
+
+    print(f"{args.frames} frames, {len(kinds)} distinct tracks, {2 * args.players_per_team + 1} on screen")
+    print(f"torso features : {1e6 * feature_time / args.frames:8.1f} us/frame")
+    print(f"update (total) : {1e6 * update_time / args.frames:8.1f} us/frame (incl. features, fit amortised, votes)")
+    print(f"players correctly assigned: {correct}/{len(players)}; referee tracks without team: "
+          f"{int((referees[:, 1] == -1).sum())}/{len(referees)}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,81 @@
+# Compare le calcul des statistiques d'équipe par image : ancienne version (boucle sur
+# tous les joueurs jamais suivis) et version vectorisée (joueurs visibles uniquement).
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+from scipy.spatial.distance import pdist
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from src import stats
+from src.track_store import TrackStore
+
+def legacy_team_compactness(player_positions):
+    # Reference: mean pairwise distance between the players, as previously in src/stats.py
+    if len(player_positions) < 2:
+        return 0
+    return np.mean(pdist(np.array(player_positions)))
+
+def legacy_team_stats(players, team_assignments, pixels_to_meters=0.1):
+    # Reference: the previous implementation, iterating every player ever tracked
+    team_stats = {}
+    for team_id in set(team_assignments.values()):
+        if team_id is None: continue
+        team_stats[team_id] = {'player_count': 0, 'positions': [], 'compactness': 0}
+    for pid, p_data in players.items():
+        team_id = p_data.get('team')
+        if team_id in team_stats and p_data.get('last_pos'):
+            team_stats[team_id]['positions'].append(p_data['last_pos'])
+            team_stats[team_id]['player_count'] += 1
+    for team_id, s in team_stats.items():
+        if s['player_count'] > 1:
+            s['compactness'] = round(legacy_team_compactness(s['positions']) * pixels_to_meters, 2)
+    return team_stats
+
+def synthetic_match(n_frames, n_tracks, on_screen, frame_skip):
+    # Track IDs are recycled over the match so that n_tracks distinct IDs appear in total
+    rng = np.random.default_rng(0)
+    lifetime = max(1, n_frames * on_screen // n_tracks)
+    for step in range(n_frames):
+        first = step * on_screen // lifetime
+        ids = (np.arange(first, first + on_screen) % n_tracks) + 1
+        xs = rng.uniform(0, 1920, on_screen)
+        ys = rng.uniform(0, 1080, on_screen)
+        yield step * frame_skip, ids, xs, ys
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark per-frame team statistics")
+    parser.add_argument('--frames', type=int, default=3000)
+    parser.add_argument('--tracks', type=int, default=2000)
+    parser.add_argument('--on-screen', type=int, default=22)
+    parser.add_argument('--frame-skip', type=int, default=10)
+    args = parser.parse_args()
+
+    players, team_assignments = {}, {}
+    store = TrackStore()
+    legacy_time = vector_time = 0.0
+    for frame_idx, ids, xs, ys in synthetic_match(args.frames, args.tracks, args.on_screen, args.frame_skip):
+        teams = ids % 2
+        for pid, x, y, team in zip(ids.tolist(), xs, ys, teams.tolist()):
+            team_assignments[pid] = str(team)
+            players[pid] = {'team': str(team), 'last_pos': (x, y)}
+        store.append(frame_idx, ids, xs, ys, teams=teams)
+
+        t0 = time.perf_counter()
+        legacy_team_stats(players, team_assignments)
+        legacy_time += time.perf_counter() - t0
+
+        t0 = time.perf_counter()
+        rows = store.active_at(frame_idx, args.frame_skip)
+        stats.calculate_team_stats(store.column('x')[rows], store.column('y')[rows], store.column('team')[rows])
+        vector_time += time.perf_counter() - t0
+
+    print(f"{args.frames} frames, {len(players)} distinct tracks, {args.on_screen} on screen")
+    print(f"legacy    : {1e6 * legacy_time / args.frames:8.1f} us/frame")
+    print(f"vectorised: {1e6 * vector_time / args.frames:8.1f} us/frame (incl. active-track lookup, hull, width/depth)")
+
+if __name__ == '__main__':
+    main()
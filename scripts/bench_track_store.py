@@ -0,0 +1,72 @@
+# Compare la mémoire par observation et le coût des requêtes entre les listes de
+# tuples (frame, x, y) par joueur et le TrackStore colonnaire.
+import argparse
+import os
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from src.track_store import TrackStore
+
+def synthetic_frames(n_frames, n_players):
+    rng = np.random.default_rng(0)
+    ids = np.arange(1, n_players + 1)
+    for frame_idx in range(n_frames):
+        yield frame_idx, ids, rng.uniform(0, 1920, n_players), rng.uniform(0, 1080, n_players), rng.uniform(0.3, 1.0, n_players)
+
+def fill_dicts(n_frames, n_players):
+    players = {}
+    for frame_idx, ids, xs, ys, confs in synthetic_frames(n_frames, n_players):
+        for pid, x, y in zip(ids.tolist(), xs.tolist(), ys.tolist()):
+            players.setdefault(pid, {'positions': []})['positions'].append((frame_idx, x, y))
+    return players
+
+def fill_store(n_frames, n_players):
+    store = TrackStore()
+    for frame_idx, ids, xs, ys, confs in synthetic_frames(n_frames, n_players):
+        store.append(frame_idx, ids, xs, ys, confs)
+    return store
+
+def measure(fn, *args):
+    tracemalloc.start()
+    t0 = time.perf_counter()
+    obj = fn(*args)
+    elapsed = time.perf_counter() - t0
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return obj, current, elapsed
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark per-player tuple lists against TrackStore")
+    parser.add_argument('--frames', type=int, default=7500)
+    parser.add_argument('--players', type=int, default=22)
+    args = parser.parse_args()
+    n_obs = args.frames * args.players
+
+    players, dict_bytes, dict_time = measure(fill_dicts, args.frames, args.players)
+    store, store_bytes, store_time = measure(fill_store, args.frames, args.players)
+    print(f"{n_obs} observations")
+    print(f"dict of tuples: {dict_bytes / n_obs:6.1f} bytes/obs, fill {dict_time:.2f}s")
+    print(f"TrackStore    : {store_bytes / n_obs:6.1f} bytes/obs ({store.nbytes / n_obs:.1f} used), fill {store_time:.2f}s")
+
+    t0 = time.perf_counter()
+    last = {pid: d['positions'][-1] for pid, d in players.items()}
+    dist = {pid: sum(np.hypot(b[1] - a[1], b[2] - a[2]) for a, b in zip(d['positions'], d['positions'][1:])) for pid, d in players.items()}
+    dict_query = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    store.last_positions()
+    order, ids, starts, ends = store.trajectories()
+    xs, ys = store.column('x')[order], store.column('y')[order]
+    steps = np.hypot(np.diff(xs), np.diff(ys))
+    steps[ends[:-1] - 1] = 0  # no step between two different tracks
+    np.add.reduceat(np.append(steps, 0), starts)
+    store_query = time.perf_counter() - t0
+    print(f"last position + total distance per track: dicts {1000 * dict_query:.1f}ms, TrackStore {1000 * store_query:.1f}ms")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,72 @@
+# Compare l'écriture de la vidéo annotée selon le codec (MJPG, MPEG-4, H.264 via ffmpeg)
+# et l'échelle de sortie : temps d'encodage par image, temps bloqué de l'analyse et taille
+# du fichier, sur des images synthétiques annotées ; puis encodage en ligne vs en arrière-plan.
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from src.video_io import AnnotatedVideoWriter, VIDEO_CODECS
+from src.visualization import draw_annotations
+from synthetic_match import SyntheticMatch
+
+def annotated_frames(match, n_frames):
+    players = {}
+    for frame_idx in range(n_frames):
+        s = match.state(frame_idx)
+        frame = match.render(frame_idx, s)
+        boxes = s['boxes']
+        for pid, x, y in zip(s['ids'].tolist(), ((boxes[:, 0] + boxes[:, 2]) / 2).tolist(), boxes[:, 3].tolist()):
+            players[pid] = {'last_pos': (x, y), 'last_frame': frame_idx}
+        yield draw_annotations(frame, players, tuple(s['ball_px'].tolist()), {})
+
+def run(match, n_frames, output_dir, codec, scale, background, ffmpeg):
+    writer = AnnotatedVideoWriter(os.path.join(output_dir, f'{codec}_{scale:g}{VIDEO_CODECS[codec][0]}'), match.fps,
+                                  (match.width, match.height), codec, scale=scale, background=background, ffmpeg=ffmpeg)
+    t0 = time.perf_counter()
+    for frame in annotated_frames(match, n_frames):
+        writer.write(frame)
+    writer.close()
+    return time.perf_counter() - t0, writer.stats()
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark annotated video output per codec and scale")
+    parser.add_argument('--seconds', type=float, default=10)
+    parser.add_argument('--fps', type=float, default=25.0)
+    parser.add_argument('--width', type=int, default=1920)
+    parser.add_argument('--height', type=int, default=1080)
+    parser.add_argument('--ffmpeg', default=shutil.which('ffmpeg') or 'ffmpeg')
+    args = parser.parse_args()
+
+    match = SyntheticMatch(args.seconds, args.fps, args.width, args.height)
+    n_frames = match.n_frames
+    codecs = ['mjpg', 'mp4v'] + (['h264'] if shutil.which(args.ffmpeg) else [])
+    if 'h264' not in codecs:
+        print(f"ffmpeg not found ('{args.ffmpeg}'), h264 skipped")
+
+    with tempfile.TemporaryDirectory() as output_dir:
+        # Rendering and annotating the frames alone, the floor of every run below
+        t0 = time.perf_counter()
+        for _ in annotated_frames(match, n_frames):
+            pass
+        produce_s = time.perf_counter() - t0
+        print(f"{n_frames} annotated {args.width}x{args.height} frames; producing them alone: {produce_s:.2f}s")
+        print(f"{'codec':<6} {'scale':>5} {'encode ms/frame':>16} {'MB':>8} {'MB/min':>8}")
+        for codec in codecs:
+            for scale in (1.0, 0.5):
+                _, stats = run(match, n_frames, output_dir, codec, scale, False, args.ffmpeg)
+                mb = stats['bytes'] / 1e6
+                print(f"{codec:<6} {scale:>5g} {1e3 * stats['encode_s'] / n_frames:>16.2f} {mb:>8.2f} {mb * 60 / args.seconds:>8.1f}")
+
+        codec = codecs[-1]
+        print(f"\n{codec} at full scale, wall time including frame production:")
+        for background in (False, True):
+            wall, stats = run(match, n_frames, output_dir, codec, 1.0, background, args.ffmpeg)
+            print(f"  {'background' if background else 'inline':<10} {wall:6.2f}s (blocked on the queue {stats['blocked_s']:.2f}s)")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,19 @@
+# Exporte un modèle YOLOv8 vers ONNX ou OpenVINO pour l'inférence CPU (voir Detector).
+# Le modèle exporté s'utilise directement avec --model, avec "imgsz" réglé sur la même taille.
+from ultralytics import YOLO
+import argparse
+
+parser = argparse.ArgumentParser()
+parser.add_argument('--model', default='models/yolov8n.pt', help='Poids PyTorch à exporter')
+parser.add_argument('--format', default='openvino', choices=['onnx', 'openvino'], help="Format d'export")
+parser.add_argument('--imgsz', type=int, default=640, help="Taille d'entrée du modèle exporté")
+parser.add_argument('--half', action='store_true', help='Poids FP16')
+parser.add_argument('--int8', action='store_true', help='Quantification INT8 (OpenVINO, calibrée sur --data)')
+parser.add_argument('--data', default='coco8.yaml', help='Jeu de calibration pour --int8')
+args = parser.parse_args()
+
+print('Export de', args.model, 'vers', args.format, f'(imgsz={args.imgsz}, half={args.half}, int8={args.int8})')
+model = YOLO(args.model)
+path = model.export(format=args.format, imgsz=args.imgsz, half=args.half, int8=args.int8,
+                    data=args.data if args.int8 else None)
+print('Modèle exporté :', path)
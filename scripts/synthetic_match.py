@@ -0,0 +1,262 @@
+# Match synthétique reproductible : joueurs (deux équipes et un arbitre) qui se déplacent
+# autour d'une formation, ballon qui passe de joueur en joueur, détections au format de
+# `parse_frame_results` et images rendues (pelouse, maillots, ballon). Sert de source aux
+# benchmarks sans modèle ni vidéo réelle ; en ligne de commande, écrit la vidéo synthétique.
+import argparse
+import os
+import sys
+
+import cv2
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from src.pitch import PITCH_LENGTH, PITCH_WIDTH
+
+# BGR jersey colours: team 0, team 1, referee
+JERSEYS = np.array([(40, 40, 200), (235, 235, 235), (20, 20, 20)], dtype=np.uint8)
+GRASS = ((50, 150, 50), (40, 135, 40))
+
+class SyntheticMatch:
+    def __init__(self, duration_s, fps=25.0, width=1920, height=1080, players_per_team=11, seed=0,
+                 id_switch_seconds=45.0, person_miss_rate=0.03, ball_miss_rate=0.1):
+        """
+        A deterministic match seen by a static camera showing the whole pitch.
+
+        Positions are a pure function of time (formation, team shift towards the
+        ball, smooth individual wander), so any frame can be generated on its own
+        and two runs with the same seed produce the same detections. Each track is
+        given a new ID every `id_switch_seconds` (staggered), like tracker ID
+        switches; the number of IDs thus grows with the match length.
+
+        Args:
+            duration_s (float): Length of the match; the ball schedule covers it.
+            fps (float): Frame rate of the video.
+            width, height (int): Image size; the pitch fills the image.
+            players_per_team (int): Players of each team (one referee is added).
+            seed (int): Seed of every random draw.
+            id_switch_seconds (float): Lifetime of a track ID (None: IDs never change).
+            person_miss_rate (float): Probability that a player is not detected in a frame.
+            ball_miss_rate (float): Probability that the ball is not detected in a frame.
+        """
+        self.duration_s = duration_s
+        self.fps = fps
+        self.width, self.height = width, height
+        self.seed = seed
+        self.id_switch_seconds = id_switch_seconds
+        self.person_miss_rate = person_miss_rate
+        self.ball_miss_rate = ball_miss_rate
+        # Pixels per metre along each axis
+        self.scale = np.array([width / PITCH_LENGTH, height / PITCH_WIDTH])
+
+        rng = np.random.default_rng(seed)
+        self.kinds = np.array([0] * players_per_team + [1] * players_per_team + [2])
+        self.n_slots = len(self.kinds)
+        # Formation in metres: team 0 defends the left goal, team 1 the right one
+        lines = np.linspace(8, 45, 4)
+        home = []
+        for team in (0, 1):
+            for i in range(players_per_team):
+                x = lines[min(3, (i + 2) // 3)] if i else 3.0
+                home.append((x if team == 0 else PITCH_LENGTH - x, PITCH_WIDTH * ((i % 4) + 0.5) / 4))
+        home.append((PITCH_LENGTH / 2, PITCH_WIDTH / 2))
+        self.home = np.array(home)
+        self.wander_amp = rng.uniform(3, 9, (self.n_slots, 2))
+        self.wander_freq = rng.uniform(0.02, 0.12, (self.n_slots, 2))
+        self.wander_phase = rng.uniform(0, 2 * np.pi, (self.n_slots, 2))
+        self.switch_phase = rng.uniform(0, id_switch_seconds or 1.0, self.n_slots)
+
+        # Ball schedule: holds of 1.5-5 s at an owner's feet, then a 0.6 s transfer,
+        # to a team mate three times out of four
+        starts, owners = [0.0], [int(rng.integers(0, 2 * players_per_team))]
+        while starts[-1] < duration_s:
+            owner = owners[-1]
+            team = self.kinds[owner] if rng.random() < 0.75 else 1 - self.kinds[owner]
+            mates = np.flatnonzero((self.kinds == team) & (np.arange(self.n_slots) != owner))
+            starts.append(starts[-1] + rng.uniform(1.5, 5.0))
+            owners.append(int(rng.choice(mates)))
+        self.ball_starts = np.array(starts)
+        self.ball_owners = np.array(owners)
+        self.transfer_s = 0.6
+        self._background = None
+
+    @property
+    def n_frames(self):
+        return int(self.duration_s * self.fps)
+
+    @property
+    def pixels_to_meters(self):
+        return float(PITCH_LENGTH / self.width)
+
+    def keypoints(self):
+        """
+        Returns:
+            dict: Pitch corner keypoints (see `src.pitch.PITCH_KEYPOINTS`) for `cfg['pitch_keypoints']`.
+        """
+        w, h = self.width, self.height
+        return {'left_corner_top': [0, 0], 'right_corner_top': [w, 0], 'left_corner_bottom': [0, h], 'right_corner_bottom': [w, h]}
+
+    def positions(self, t):
+        """
+        Returns:
+            np.array: Feet positions of every slot at time `t`, in metres, shape (n_slots, 2).
+        """
+        owner = self.ball_owners[np.searchsorted(self.ball_starts, t, side='right') - 1]
+        # Both teams shift along the pitch with the ball
+        shift = 0.4 * (self.home[owner, 0] - PITCH_LENGTH / 2)
+        pos = self.home + self.wander_amp * np.sin(2 * np.pi * self.wander_freq * t + self.wander_phase)
+        pos[:, 0] += np.where(self.kinds == 2, 0.8 * shift, shift)
+        return np.clip(pos, 1.0, (PITCH_LENGTH - 1.0, PITCH_WIDTH - 1.0))
+
+    def ball_position(self, t, positions):
+        i = np.searchsorted(self.ball_starts, t, side='right') - 1
+        owner_pos = positions[self.ball_owners[i]] + (0.5, 0.0)
+        elapsed = t - self.ball_starts[i]
+        if i == 0 or elapsed >= self.transfer_s:
+            return owner_pos
+        # Transfer from the previous owner, whose position is taken at the start of the transfer
+        start = self.positions(self.ball_starts[i])[self.ball_owners[i - 1]]
+        return start + (owner_pos - start) * elapsed / self.transfer_s
+
+    def track_ids(self, t):
+        if not self.id_switch_seconds:
+            return np.arange(1, self.n_slots + 1)
+        generation = np.floor((t + self.switch_phase) / self.id_switch_seconds).astype(np.int64)
+        return 1 + np.arange(self.n_slots) + self.n_slots * generation
+
+    def team_of(self, track_id):
+        """
+        Returns:
+            str or None: The true team ('0', '1') of a track ID, None for the referee.
+        """
+        kind = self.kinds[(int(track_id) - 1) % self.n_slots]
+        return str(kind) if kind < 2 else None
+
+    def state(self, frame_idx):
+        """
+        Returns:
+            dict: 'ids', 'kinds', 'boxes' (pixels, exact), 'visible' (detected players),
+            'ball_px' (pixel centre) and 'ball' (the same, or None when the ball is not
+            detected) at `frame_idx`.
+        """
+        t = frame_idx / self.fps
+        rng = np.random.default_rng((self.seed, frame_idx))
+        positions = self.positions(t)
+        feet = positions * self.scale
+        # Players further up the image (further from the camera) look smaller
+        box_h = 0.055 * self.height * (0.7 + 0.6 * feet[:, 1] / self.height)
+        box_w = 0.42 * box_h
+        boxes = np.stack([feet[:, 0] - box_w / 2, feet[:, 1] - box_h, feet[:, 0] + box_w / 2, feet[:, 1]], axis=1)
+        ball = self.ball_position(t, positions) * self.scale
+        return {
+            'ids': self.track_ids(t),
+            'kinds': self.kinds,
+            'boxes': boxes,
+            'visible': rng.random(self.n_slots) >= self.person_miss_rate,
+            'ball_px': ball,
+            'ball': ball if rng.random() >= self.ball_miss_rate else None,
+            'jitter': rng.normal(0, 1.5, boxes.shape),
+            'confs': rng.uniform(0.5, 0.95, self.n_slots + 1).astype(np.float32)
+        }
+
+    def detections(self, frame_idx, state=None):
+        """
+        Returns:
+            tuple: (persons, balls) as returned by `parse_frame_results`: dicts with a
+            numpy 'id', a 'box' list [x1, y1, x2, y2] with detector noise and a numpy 'conf'.
+        """
+        s = state if state is not None else self.state(frame_idx)
+        track_ids = s['ids'].astype(np.int32)
+        boxes = s['boxes'] + s['jitter']
+        confs = s['confs']
+        persons = [{'id': track_ids[i], 'box': boxes[i].tolist(), 'conf': confs[i]} for i in np.flatnonzero(s['visible'])]
+        balls = []
+        if s['ball'] is not None:
+            bx, by = s['ball'].tolist()
+            balls.append({'id': np.int32(0), 'box': [bx - 5, by - 5, bx + 5, by + 5], 'conf': confs[-1]})
+        return persons, balls
+
+    def background(self):
+        """
+        Returns:
+            np.array: The empty pitch (mowing stripes and lines), shared by every frame.
+        """
+        if self._background is None:
+            w, h = self.width, self.height
+            frame = np.empty((h, w, 3), dtype=np.uint8)
+            stripes = (np.arange(w) * 18 // w) % 2
+            frame[:] = np.where(stripes[None, :, None], GRASS[0], GRASS[1]).astype(np.uint8)
+            noise = np.random.default_rng(self.seed).integers(0, 20, frame.shape, dtype=np.uint8)
+            frame = cv2.add(frame, noise)
+            white, thickness = (255, 255, 255), max(2, w // 640)
+            sx, sy = self.scale
+            cv2.rectangle(frame, (thickness, thickness), (w - thickness, h - thickness), white, thickness)
+            cv2.line(frame, (w // 2, 0), (w // 2, h), white, thickness)
+            cv2.circle(frame, (w // 2, h // 2), int(9.15 * sx), white, thickness)
+            for x0, x1 in ((0, 16.5), (PITCH_LENGTH, PITCH_LENGTH - 16.5)):
+                cv2.rectangle(frame, (int(x0 * sx), int(13.84 * sy)), (int(x1 * sx), int(54.16 * sy)), white, thickness)
+            self._background = frame
+        return self._background
+
+    def render(self, frame_idx, state=None):
+        """
+        Returns:
+            np.array: The BGR image of `frame_idx`: players as jersey/shorts/head blobs, and the ball.
+        """
+        s = state if state is not None else self.state(frame_idx)
+        frame = self.background().copy()
+        for (x1, y1, x2, y2), kind in zip(s['boxes'].astype(np.int64), s['kinds']):
+            h = y2 - y1
+            jersey = JERSEYS[kind].tolist()
+            cv2.rectangle(frame, (x1, y1 + h // 5), (x2, y1 + 3 * h // 5), jersey, -1)
+            cv2.rectangle(frame, (x1 + 1, y1 + 3 * h // 5), (x2 - 1, y2), (30, 30, 30) if kind != 2 else (230, 230, 230), -1)
+            cv2.circle(frame, ((x1 + x2) // 2, y1 + h // 10), max(2, h // 10), (120, 160, 210), -1)
+        ball = s['ball_px']
+        cv2.circle(frame, (int(ball[0]), int(ball[1])), max(3, self.width // 400), (255, 255, 255), -1)
+        return frame
+
+    def stream(self, frame_skip=1, render=False, start_frame=0):
+        """
+        Yields:
+            tuple: (frame_idx, persons, balls, frame) for the analysed frames, the items of
+            `parse_detections`; `frame` is None unless `render` (a callable taking the
+            frame index, or True for every frame).
+        """
+        for frame_idx in range(start_frame, self.n_frames, frame_skip):
+            s = self.state(frame_idx)
+            persons, balls = self.detections(frame_idx, s)
+            wanted = render(frame_idx) if callable(render) else render
+            yield frame_idx, persons, balls, self.render(frame_idx, s) if wanted else None
+
+    def write_video(self, path, fourcc='mp4v'):
+        """
+        Writes every frame of the match to `path`.
+
+        Returns:
+            int: The number of frames written.
+        """
+        writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*fourcc), self.fps, (self.width, self.height))
+        if not writer.isOpened():
+            raise RuntimeError(f"Could not open a '{fourcc}' video writer for {path}")
+        try:
+            for frame_idx in range(self.n_frames):
+                writer.write(self.render(frame_idx))
+        finally:
+            writer.release()
+        return self.n_frames
+
+def main():
+    parser = argparse.ArgumentParser(description="Write a synthetic match video")
+    parser.add_argument('--output', default='synthetic_match.mp4')
+    parser.add_argument('--seconds', type=float, default=30)
+    parser.add_argument('--fps', type=float, default=25.0)
+    parser.add_argument('--width', type=int, default=1920)
+    parser.add_argument('--height', type=int, default=1080)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+    match = SyntheticMatch(args.seconds, args.fps, args.width, args.height, seed=args.seed)
+    n = match.write_video(args.output)
+    print(f"{n} frames ({args.seconds:.0f} s, {args.width}x{args.height}) written to {args.output}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,126 @@
+import numpy as np
+
+from .tracker import BALL_CLASS_NAMES
+
+# Ball detections of the locator are not tracked by ByteTrack; they all share this ID
+BALL_TRACK_ID = 0
+
+class BallLocator:
+    def __init__(self, detector, crop_size=320, full_imgsz=1280, conf=0.1, max_roi_misses=3, search_interval=1):
+        """
+        Detects the ball in a high-resolution crop around its predicted position.
+
+        The crop is taken at the native resolution of the video, so the ball
+        is much larger for the model than in a downscaled full frame, while
+        the crop costs a fraction of a full-frame inference. The position is
+        predicted from the last detection and the velocity between the last
+        two. When the ball has been missed `max_roi_misses` times in a row, the
+        whole frame is searched at `full_imgsz` instead.
+
+        Args:
+            detector (Detector): The detector whose model is used.
+            crop_size (int): Side of the square crop, in video pixels.
+            full_imgsz (int): Input size of the full-frame search.
+            conf (float): Minimum confidence of a ball detection.
+            max_roi_misses (int): Consecutive misses before falling back to a full-frame search.
+            search_interval (int): While the ball is lost, search the full frame only
+                every `search_interval` calls.
+        """
+        self.detector = detector
+        self.crop_size = crop_size
+        self.full_imgsz = full_imgsz
+        self.conf = conf
+        self.max_roi_misses = max_roi_misses
+        self.search_interval = max(1, search_interval)
+        self.ball_classes = detector.class_ids(BALL_CLASS_NAMES)
+        self.reset()
+
+    @classmethod
+    def from_config(cls, detector, cfg):
+        """
+        Returns:
+            BallLocator or None: A locator configured from `cfg`, or None when `cfg['ball_roi']` is off.
+        """
+        if not cfg.get('ball_roi', False):
+            return None
+        return cls(detector, crop_size=cfg.get('ball_crop_size', 320), full_imgsz=cfg.get('ball_full_imgsz', 1280),
+                   max_roi_misses=cfg.get('ball_roi_max_misses', 3), search_interval=cfg.get('ball_search_interval', 1))
+
+    def reset(self):
+        self.last_pos = None
+        self.last_frame = None
+        self.velocity = np.zeros(2)
+        self.misses = 0
+        self.lost_calls = 0
+        self.full_searches = 0
+        self.roi_searches = 0
+
+    def predicted_position(self, frame_idx):
+        if self.last_pos is None:
+            return None
+        return self.last_pos + self.velocity * (frame_idx - self.last_frame)
+
+    def _predict(self, image, imgsz):
+        res = self.detector.model.predict(
+            source=image,
+            imgsz=imgsz,
+            conf=self.conf,
+            classes=self.ball_classes,
+            device=self.detector.device,
+            verbose=False
+        )[0]
+        if res.boxes is None or len(res.boxes) == 0:
+            return np.empty((0, 4)), np.empty(0)
+        return res.boxes.xyxy.cpu().numpy(), res.boxes.conf.cpu().numpy()
+
+    def _search_roi(self, frame, center):
+        height, width = frame.shape[:2]
+        # The window grows while the ball keeps being missed
+        side = int(self.crop_size * (1 + 0.5 * self.misses))
+        side = min(side, width, height)
+        x0 = int(np.clip(center[0] - side / 2, 0, width - side))
+        y0 = int(np.clip(center[1] - side / 2, 0, height - side))
+        boxes, confs = self._predict(frame[y0:y0 + side, x0:x0 + side], -(-side // 32) * 32)
+        self.roi_searches += 1
+        return boxes + [x0, y0, x0, y0], confs
+
+    def locate(self, frame_idx, frame):
+        """
+        Detects the ball in one frame.
+
+        Args:
+            frame_idx (int): Index of the frame in the video.
+            frame (np.array): The BGR image.
+
+        Returns:
+            list: Zero or one ball dictionary shaped like `parse_frame_results` output.
+        """
+        predicted = self.predicted_position(frame_idx)
+        if predicted is not None and self.misses < self.max_roi_misses:
+            boxes, confs = self._search_roi(frame, predicted)
+        elif self.lost_calls % self.search_interval == 0:
+            boxes, confs = self._predict(frame, self.full_imgsz)
+            self.full_searches += 1
+            self.lost_calls += 1
+        else:
+            boxes, confs = np.empty((0, 4)), np.empty(0)
+            self.lost_calls += 1
+
+        if len(boxes) == 0:
+            self.misses += 1
+            return []
+
+        centers = (boxes[:, :2] + boxes[:, 2:]) / 2
+        if predicted is not None:
+            # Several candidates (heads, spare balls...): keep the one closest to the prediction
+            best = int(np.argmin(np.hypot(*(centers - predicted).T)))
+        else:
+            best = int(np.argmax(confs))
+        center = centers[best]
+        if self.last_pos is not None and frame_idx > self.last_frame and self.misses < self.max_roi_misses:
+            self.velocity = (center - self.last_pos) / (frame_idx - self.last_frame)
+        else:
+            self.velocity = np.zeros(2)
+        self.last_pos, self.last_frame = center, frame_idx
+        self.misses, self.lost_calls = 0, 0
+        return [{'id': BALL_TRACK_ID, 'box': boxes[best].tolist(), 'conf': confs[best]}]
@@ -0,0 +1,288 @@
+import numpy as np
+import pandas as pd
+
+from .detection_cache import KIND_BALL
+from .utils import box_center
+
+BALL_DETECTED, BALL_INTERPOLATED, BALL_MISSING = 0, 1, -1
+
+# Chi-square 99% quantile with 2 degrees of freedom: gate on the Mahalanobis distance
+GATE_CHI2 = 9.21
+
+class BallKalman:
+    def __init__(self, accel_std=2.0, measurement_std=5.0, max_gap=25):
+        """
+        Constant-velocity Kalman filter of the ball centre, in pixels and video frames.
+
+        Args:
+            accel_std (float): Standard deviation of the unmodelled acceleration (px/frame²).
+            measurement_std (float): Standard deviation of a detected centre (px).
+            max_gap (int): Frames without an accepted detection after which the
+                track is considered lost and restarts from the next detection.
+        """
+        self.accel_std = accel_std
+        self.R = np.eye(2) * measurement_std ** 2
+        self.H = np.eye(2, 4)
+        self.max_gap = max_gap
+        self.x = None
+        self.P = None
+        self.frame = None
+
+    def _predicted(self, frame_idx):
+        dt = frame_idx - self.frame
+        F = np.eye(4)
+        F[0, 2] = F[1, 3] = dt
+        # Discrete white-noise acceleration model
+        q = self.accel_std ** 2
+        Q = np.zeros((4, 4))
+        Q[[0, 1], [0, 1]] = q * dt ** 4 / 4
+        Q[[0, 1], [2, 3]] = Q[[2, 3], [0, 1]] = q * dt ** 3 / 2
+        Q[[2, 3], [2, 3]] = q * dt ** 2
+        return F @ self.x, F @ self.P @ F.T + Q
+
+    def _start(self, frame_idx, center):
+        self.x = np.array([center[0], center[1], 0.0, 0.0])
+        self.P = np.diag([self.R[0, 0], self.R[1, 1], 100.0, 100.0])
+        self.frame = frame_idx
+
+    @property
+    def position(self):
+        """
+        np.array: The filtered ball centre after the last accepted detection.
+        """
+        return self.x[:2]
+
+    def select(self, frame_idx, centers):
+        """
+        Picks the detection that continues the track and updates the filter with it.
+
+        Args:
+            frame_idx (int): Index of the frame in the video.
+            centers (np.array): Candidate ball centres, shape (n, 2), most confident first.
+
+        Returns:
+            int or None: Index of the accepted candidate, or None when every candidate
+            falls outside the gate (outliers such as heads or a second ball).
+        """
+        if len(centers) == 0:
+            return None
+        if self.x is None or frame_idx - self.frame > self.max_gap:
+            self._start(frame_idx, centers[0])
+            return 0
+        x, P = self._predicted(frame_idx)
+        S = self.H @ P @ self.H.T + self.R
+        residuals = centers - x[:2]
+        d2 = np.einsum('ni,ij,nj->n', residuals, np.linalg.inv(S), residuals)
+        best = int(np.argmin(d2))
+        if d2[best] > GATE_CHI2:
+            return None
+        K = P @ self.H.T @ np.linalg.inv(S)
+        self.x = x + K @ residuals[best]
+        self.P = (np.eye(4) - K @ self.H) @ P
+        self.frame = frame_idx
+        return best
+
+def fill_gaps(frames, xy, max_gap):
+    """
+    Linearly interpolates missing ball positions between two detections.
+
+    Args:
+        frames (np.array): Frame indices, increasing.
+        xy (np.array): Ball centres, shape (n, 2), NaN where the ball is missing.
+        max_gap (int): Gaps spanning more frames are left missing.
+
+    Returns:
+        tuple: (xy, source) with the filled centres and, per frame, BALL_DETECTED,
+        BALL_INTERPOLATED or BALL_MISSING.
+    """
+    frames = np.asarray(frames)
+    detected = ~np.isnan(xy[:, 0])
+    source = np.where(detected, BALL_DETECTED, BALL_MISSING)
+    xy = xy.copy()
+    known = np.flatnonzero(detected)
+    if len(known) < 2:
+        return xy, source
+    prev = np.searchsorted(known, np.arange(len(frames)), side='right') - 1
+    fill = np.flatnonzero(~detected & (prev >= 0) & (prev + 1 < len(known)))
+    p, q = known[prev[fill]], known[prev[fill] + 1]
+    short = frames[q] - frames[p] <= max_gap
+    fill, p, q = fill[short], p[short], q[short]
+    t = ((frames[fill] - frames[p]) / (frames[q] - frames[p]))[:, None]
+    xy[fill] = xy[p] + t * (xy[q] - xy[p])
+    source[fill] = BALL_INTERPOLATED
+    return xy, source
+
+def _moved_to(ball, center):
+    # The detected ball, its box centred on the filtered position
+    x1, y1, x2, y2 = ball['box']
+    dx, dy = center[0] - (x1 + x2) / 2, center[1] - (y1 + y2) / 2
+    return dict(ball, box=[x1 + dx, y1 + dy, x2 + dx, y2 + dy])
+
+def _interpolated(ball_id, center):
+    x, y = center
+    return {'id': ball_id, 'box': [x - 3, y - 3, x + 3, y + 3], 'conf': 0.0, 'interpolated': True}
+
+class BallTracker:
+    def __init__(self, fps, cfg):
+        """
+        Turns the raw ball detections of each frame into one consistent ball per frame.
+
+        Detections are fused with a `BallKalman`: outliers outside its gate are
+        dropped and the ball is placed at the filtered centre. Gaps of up to
+        `cfg['ball_max_gap_seconds']` are filled by interpolation between filtered
+        centres, so possession and events keep working on frames where the
+        detector missed the ball. As a pipeline stage it holds back at most the
+        frames of one gap; the dense per-frame track is available from `track()`.
+        `from_detections` computes the whole track of recorded detections upfront.
+
+        Args:
+            fps (float): Frame rate of the source video.
+            cfg (dict): The application configuration dictionary.
+        """
+        self.max_gap = int(round(cfg.get('ball_max_gap_seconds', 1.0) * fps))
+        self.kalman = BallKalman(cfg.get('ball_accel_std_px', 2.0), cfg.get('ball_measurement_std_px', 5.0), self.max_gap)
+        self.frames, self.xy, self.source = [], [], []
+        self._balls = None
+        self._track = None
+
+    @classmethod
+    def from_detections(cls, detections, fps, cfg):
+        """
+        A tracker for replayed detections, whose dense track is computed in one
+        pass over the recorded arrays (see `dense_ball_track`); as a pipeline
+        stage it then only swaps in the tracked ball, without holding frames back.
+
+        Args:
+            detections (DetectionArrays): The recorded detections of the clip.
+        """
+        tracker = cls(fps, cfg)
+        tracker._track, tracker._balls = _dense_track(detections, tracker.max_gap, tracker.kalman)
+        return tracker
+
+    def process(self, detections):
+        """
+        Pipeline stage over (frame_idx, persons, balls, frame) items.
+
+        Yields:
+            tuple: The same items, in order, with `balls` holding the tracked ball
+            (interpolated balls have `conf` 0 and `interpolated` set) or nothing.
+        """
+        if self._balls is not None:
+            for frame_idx, persons, _, frame in detections:
+                ball = self._balls.get(frame_idx)
+                yield frame_idx, persons, [ball] if ball is not None else [], frame
+            return
+        pending, last = [], None
+        for frame_idx, persons, balls, frame in detections:
+            ball = None
+            if balls:
+                order = sorted(range(len(balls)), key=lambda i: -balls[i]['conf'])
+                centers = np.array([box_center(balls[i]['box']) for i in order])
+                best = self.kalman.select(frame_idx, centers)
+                if best is not None:
+                    ball = _moved_to(balls[order[best]], self.kalman.position)
+            if ball is None:
+                pending.append((frame_idx, persons, frame))
+                if last is None or frame_idx - last[0] > self.max_gap:
+                    yield from self._flush(pending, None, None)
+                    pending = []
+                continue
+            yield from self._flush(pending, last, (frame_idx, ball))
+            pending, last = [], (frame_idx, ball)
+            self._record([frame_idx], [box_center(ball['box'])], [BALL_DETECTED])
+            yield frame_idx, persons, [ball], frame
+        yield from self._flush(pending, None, None)
+
+    def _flush(self, pending, last, current):
+        if not pending:
+            return
+        frames = [f for f, _, _ in pending]
+        if last is None or current is None:
+            xy, source = np.full((len(frames), 2), np.nan), np.full(len(frames), BALL_MISSING)
+        else:
+            xy = np.full((len(frames) + 2, 2), np.nan)
+            xy[0], xy[-1] = box_center(last[1]['box']), box_center(current[1]['box'])
+            xy, source = fill_gaps([last[0], *frames, current[0]], xy, self.max_gap)
+            xy, source = xy[1:-1], source[1:-1]
+        self._record(frames, xy, source)
+        for (frame_idx, persons, frame), (x, y), src in zip(pending, xy, source):
+            balls = [_interpolated(last[1]['id'], (x, y))] if src == BALL_INTERPOLATED else []
+            yield frame_idx, persons, balls, frame
+
+    def _record(self, frames, xy, source):
+        self.frames.extend(frames)
+        self.xy.extend(np.asarray(xy, dtype=float).reshape(-1, 2))
+        self.source.extend(source)
+
+    def track(self):
+        """
+        Returns:
+            pd.DataFrame: The dense ball track, one row per analysed frame with
+            frame, x, y (NaN when missing) and source (BALL_DETECTED, BALL_INTERPOLATED
+            or BALL_MISSING).
+        """
+        if self._track is not None:
+            return self._track
+        return _track_frame(self.frames, self.xy, self.source)
+
+def _track_frame(frames, xy, source):
+    xy = np.array(xy, dtype=np.float32).reshape(-1, 2)
+    return pd.DataFrame({
+        'frame': np.array(frames, dtype=np.int32),
+        'x': xy[:, 0],
+        'y': xy[:, 1],
+        'source': np.array(source, dtype=np.int8)
+    })
+
+def _dense_track(detections, max_gap, kalman):
+    frame_index = detections.frame_index
+    is_ball = np.flatnonzero(detections.kinds == KIND_BALL)
+    # Ball candidates grouped by frame, most confident first (as BallTracker.process sorts them)
+    rows = is_ball[np.lexsort((-detections.confs[is_ball], detections.frames[is_ball]))]
+    frames = detections.frames[rows]
+    boxes = detections.boxes[rows].astype(np.float64)
+    centers = (boxes[:, :2] + boxes[:, 2:]) / 2
+    starts = np.flatnonzero(np.r_[True, frames[1:] != frames[:-1]]) if len(rows) else np.zeros(0, dtype=np.int64)
+    ends = np.r_[starts[1:], len(rows)]
+
+    # The filter itself is sequential, over the frames with candidates only
+    xy = np.full((len(frame_index), 2), np.nan)
+    chosen = np.full(len(frame_index), -1, dtype=np.int64)
+    positions = np.searchsorted(frame_index, frames[starts])
+    for pos, start, end in zip(positions.tolist(), starts.tolist(), ends.tolist()):
+        best = kalman.select(int(frame_index[pos]), centers[start:end])
+        if best is not None:
+            xy[pos] = kalman.position
+            chosen[pos] = start + best
+    xy, source = fill_gaps(frame_index, xy, max_gap)
+
+    # The balls handed to the analysis: detections moved to the filtered centre, and
+    # interpolated balls carrying the ID of the previous detected ball
+    detected = np.flatnonzero(chosen >= 0)
+    balls = {}
+    for pos in detected.tolist():
+        i = chosen[pos]
+        balls[int(frame_index[pos])] = _moved_to({'id': detections.track_ids[rows[i]], 'box': boxes[i].tolist(),
+                                                  'conf': detections.confs[rows[i]]}, xy[pos])
+    interpolated = np.flatnonzero(source == BALL_INTERPOLATED)
+    previous = detected[np.searchsorted(detected, interpolated) - 1] if len(interpolated) else interpolated
+    for pos, prev in zip(interpolated.tolist(), previous.tolist()):
+        balls[int(frame_index[pos])] = _interpolated(detections.track_ids[rows[chosen[prev]]], xy[pos])
+    return _track_frame(frame_index, xy, source), balls
+
+def dense_ball_track(detections, fps, cfg):
+    """
+    Builds the dense ball track of a whole recorded clip in one pass over its
+    detection arrays: the candidates are sorted once, the Kalman filter runs over
+    the frames with candidates only and every gap is filled by a single
+    `fill_gaps` call. Gives the same track as `BallTracker.process`.
+
+    Args:
+        detections (DetectionArrays): The recorded detections of the clip.
+        fps (float): Frame rate of the source video.
+        cfg (dict): The application configuration dictionary.
+
+    Returns:
+        pd.DataFrame: See `BallTracker.track`.
+    """
+    return BallTracker.from_detections(detections, fps, cfg).track()
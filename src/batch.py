@@ -0,0 +1,191 @@
+import hashlib
+import json
+import multiprocessing
+import os
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from .tactical_analysis import ReportGenerator, prompt_from_outputs, save_report
+
+VIDEO_EXTENSIONS = ('.mp4', '.avi', '.mov', '.mkv', '.mpg', '.mpeg', '.m4v')
+
+# Per-process state, set up once by `_init_worker`
+_worker = {}
+
+def list_videos(source):
+    """
+    Lists the videos of a batch.
+
+    Args:
+        source (str): A directory (every video file in it, sorted by name) or a
+            manifest text file with one video path per line (blank lines and
+            lines starting with '#' are ignored; relative paths are resolved
+            against the manifest's directory).
+
+    Returns:
+        list: Video paths.
+    """
+    if os.path.isdir(source):
+        return sorted(os.path.join(source, name) for name in os.listdir(source)
+                      if name.lower().endswith(VIDEO_EXTENSIONS))
+    base = os.path.dirname(os.path.abspath(source))
+    videos = []
+    with open(source) as f:
+        for line in f:
+            line = line.strip()
+            if line and not line.startswith('#'):
+                videos.append(line if os.path.isabs(line) else os.path.join(base, line))
+    return videos
+
+def output_names(videos):
+    """
+    Names the output directory of each video of a batch after its file name.
+
+    Videos sharing a file name (from different folders) get a short hash of their
+    full path appended, and a manifest listing the same video twice an index, so
+    that no two videos write to the same directory.
+
+    Returns:
+        list: One name per video, in order.
+    """
+    stems = [os.path.splitext(os.path.basename(video))[0] for video in videos]
+    counts = Counter(stems)
+    names, used = [], set()
+    for i, (video, stem) in enumerate(zip(videos, stems)):
+        name = stem
+        if counts[stem] > 1:
+            name = f"{stem}-{hashlib.sha1(os.path.abspath(video).encode()).hexdigest()[:8]}"
+        if name in used:
+            name = f"{name}-{i}"
+        used.add(name)
+        names.append(name)
+    return names
+
+def limit_threads(n_threads):
+    """
+    Caps the threads used by the numeric libraries of the current process, so that
+    several workers on one node do not oversubscribe the cores.
+    """
+    for var in ('OMP_NUM_THREADS', 'MKL_NUM_THREADS', 'OPENBLAS_NUM_THREADS', 'NUMEXPR_NUM_THREADS'):
+        os.environ[var] = str(n_threads)
+    import cv2
+    import torch
+    torch.set_num_threads(n_threads)
+    cv2.setNumThreads(n_threads)
+
+def _init_worker(model_path, n_threads, imgsz=None):
+    # Thread caps must be set before torch spins up its pools
+    limit_threads(n_threads)
+    from .detector import Detector
+    _worker['detector'] = Detector(model_name=model_path, imgsz=imgsz)
+
+def _analyse_video(video_path, output_dir, model_path, config, generate_llm_report):
+    from .main import run_analysis
+
+    t0 = time.perf_counter()
+    try:
+        result = run_analysis(video_path, output_dir, model_path, config, generate_llm_report,
+                              detector=_worker.get('detector'))
+        status, error = 'ok', None
+    except Exception as e:
+        result, status, error = {}, 'error', str(e)
+    wall_time = time.perf_counter() - t0
+    frames = result.get('frames', 0)
+    return {
+        'video': video_path,
+        'output_dir': output_dir,
+        'status': status,
+        'error': error,
+        'wall_time_s': round(wall_time, 2),
+        'frames': frames,
+        'frames_per_s': round(frames / wall_time, 2) if wall_time > 0 else 0.0,
+        'worker_pid': os.getpid(),
+        **{k: v for k, v in result.items() if k != 'frames'}
+    }
+
+def run_batch(videos, output_root, model_path, config, workers=2, threads_per_worker=None, generate_llm_report=False):
+    """
+    Analyses many videos on a pool of worker processes.
+
+    Each worker loads the Detector once and reuses it for every video it
+    receives. Outputs go to `<output_root>/<video name>/` (see `output_names`) and a run summary
+    with per-video wall time and frames/s is written to
+    `<output_root>/batch_summary.json`.
+
+    Tactical reports are requested by this process as each video completes,
+    from its exported stats, while the other videos are still being analysed;
+    at most `cfg['llm_max_concurrency']` requests are in flight.
+
+    Args:
+        videos (list): Video paths.
+        output_root (str): Directory receiving one output directory per video.
+        model_path (str): Path to the YOLO model file.
+        config (dict): The application configuration dictionary.
+        workers (int): Number of worker processes.
+        threads_per_worker (int): Thread cap for torch/OpenCV in each worker
+            (defaults to the CPU count divided by `workers`).
+        generate_llm_report (bool): Whether to generate the tactical report of each video.
+
+    Returns:
+        dict: The run summary.
+    """
+    os.makedirs(output_root, exist_ok=True)
+    if config.get('chunks', 1) > 1:
+        # The workers already run in parallel; chunked detection would nest a process pool in each
+        print(f"Ignoring chunks={config['chunks']} in batch mode: each video is detected by a single worker")
+        config = dict(config, chunks=1)
+    workers = max(1, min(workers, len(videos))) if videos else 1
+    if threads_per_worker is None:
+        threads_per_worker = max(1, (os.cpu_count() or 1) // workers)
+    print(f"Analysing {len(videos)} videos on {workers} workers ({threads_per_worker} threads each)")
+
+    t0 = time.perf_counter()
+    results = []
+    generator = ReportGenerator.from_config(config) if generate_llm_report else None
+    pending_reports = {}
+    # 'spawn' gives every worker a clean torch/OpenCV state
+    with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('spawn'),
+                             initializer=_init_worker, initargs=(model_path, threads_per_worker, config.get('imgsz'))) as pool:
+        futures = []
+        for video_path, name in zip(videos, output_names(videos)):
+            # The output name also identifies the match in a shared Parquet dataset
+            futures.append(pool.submit(_analyse_video, video_path, os.path.join(output_root, name), model_path,
+                                       dict(config, match_id=name), False))
+        for future in as_completed(futures):
+            result = future.result()
+            results.append(result)
+            print(f"[{len(results)}/{len(videos)}] {os.path.basename(result['video'])}: {result['status']} "
+                  f"in {result['wall_time_s']:.1f}s ({result['frames_per_s']:.1f} frames/s)")
+            if generator is not None and result['status'] == 'ok':
+                try:
+                    pending_reports[result['output_dir']] = generator.submit(prompt_from_outputs(result['output_dir']))
+                except (OSError, KeyError, ValueError) as e:
+                    print(f"Skipping the tactical report of {os.path.basename(result['video'])}: {e}")
+
+    for result in results:
+        pending = pending_reports.get(result['output_dir'])
+        if pending is not None:
+            report = pending.result()
+            result['tactical_report'] = save_report(result['output_dir'], report)
+            result['tactical_report_error'] = report.startswith("ERROR:")
+    if generator is not None:
+        generator.close()
+
+    wall_time = time.perf_counter() - t0
+    total_frames = sum(r['frames'] for r in results)
+    summary = {
+        'workers': workers,
+        'threads_per_worker': threads_per_worker,
+        'n_videos': len(videos),
+        'n_failed': sum(r['status'] != 'ok' for r in results),
+        'wall_time_s': round(wall_time, 2),
+        'frames': total_frames,
+        'frames_per_s': round(total_frames / wall_time, 2) if wall_time > 0 else 0.0,
+        'videos': sorted(results, key=lambda r: r['video'])
+    }
+    with open(os.path.join(output_root, 'batch_summary.json'), 'w') as f:
+        json.dump(summary, f, indent=2)
+    print(f"Batch done in {wall_time:.1f}s ({summary['frames_per_s']:.1f} frames/s overall), "
+          f"{summary['n_failed']} failed. Summary saved to {os.path.join(output_root, 'batch_summary.json')}")
+    return summary
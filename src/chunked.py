@@ -0,0 +1,170 @@
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+from scipy.optimize import linear_sum_assignment
+
+from .ball_roi import BallLocator
+from .batch import _init_worker, _worker
+from .detection_cache import DetectionArrays, DetectionRecorder
+from .utils import box_iou
+from .video_io import SampledFrameSource
+
+def plan_chunks(frame_count, n_chunks, frame_skip, overlap_frames):
+    """
+    Splits a video into contiguous chunks, each read with a warm-up overlap on the previous one.
+
+    Chunk bounds fall on sampled frames, so every chunk analyses exactly the
+    frames the sequential run would have analysed.
+
+    Args:
+        frame_count (int): Number of frames of the video (0 if unknown).
+        n_chunks (int): Requested number of chunks.
+        frame_skip (int): Keep one frame out of every `frame_skip` frames.
+        overlap_frames (int): Frames read before the start of each chunk (except the first).
+
+    Returns:
+        list: (read_start, core_start, end) frame bounds of each chunk. Detections of
+        frames [read_start, core_start) only serve to stitch the chunk to the previous one.
+    """
+    if frame_count <= 0 or n_chunks <= 1:
+        return [(0, 0, None)]
+    step = -(-frame_count // (n_chunks * frame_skip)) * frame_skip
+    overlap_frames = -(-overlap_frames // frame_skip) * frame_skip
+    chunks = []
+    for core_start in range(0, frame_count, step):
+        end = min(core_start + step, frame_count)
+        chunks.append((max(0, core_start - overlap_frames), core_start, end))
+    return chunks
+
+def match_tracks(prev, nxt, start_frame, end_frame, min_iou=0.3):
+    """
+    Matches the track IDs of two runs over the frames they both analysed.
+
+    Every pair of tracks is scored by the IoU of their boxes summed over the
+    shared frames and divided by the number of frames the longer of the two was
+    seen in, so a pair only scores high when the tracks coincide for the whole
+    overlap. Pairs are then assigned one-to-one (Hungarian algorithm).
+
+    Args:
+        prev, nxt (DetectionArrays): The two runs.
+        start_frame, end_frame (int): The shared frames [start_frame, end_frame).
+        min_iou (float): Minimum score for two tracks to be considered the same.
+
+    Returns:
+        dict: Track ID in `nxt` to the matching track ID in `prev`.
+    """
+    prev_rows = slice(*np.searchsorted(prev.frames, [start_frame, end_frame]))
+    next_rows = slice(*np.searchsorted(nxt.frames, [start_frame, end_frame]))
+    prev_ids, prev_idx = np.unique(prev.track_ids[prev_rows], return_inverse=True)
+    next_ids, next_idx = np.unique(nxt.track_ids[next_rows], return_inverse=True)
+    if len(prev_ids) == 0 or len(next_ids) == 0:
+        return {}
+
+    prev_frames, next_frames = prev.frames[prev_rows], nxt.frames[next_rows]
+    prev_boxes, next_boxes = prev.boxes[prev_rows], nxt.boxes[next_rows]
+    prev_kinds, next_kinds = prev.kinds[prev_rows], nxt.kinds[next_rows]
+    score = np.zeros((len(prev_ids), len(next_ids)))
+    for frame_idx in np.intersect1d(prev_frames, next_frames):
+        a = np.flatnonzero(prev_frames == frame_idx)
+        b = np.flatnonzero(next_frames == frame_idx)
+        iou = box_iou(prev_boxes[a], next_boxes[b]) * (prev_kinds[a][:, None] == next_kinds[b][None, :])
+        np.add.at(score, (prev_idx[a][:, None], next_idx[b][None, :]), iou)
+    seen = np.maximum(np.bincount(prev_idx, minlength=len(prev_ids))[:, None],
+                      np.bincount(next_idx, minlength=len(next_ids))[None, :])
+    score /= seen
+
+    rows, cols = linear_sum_assignment(-score)
+    keep = score[rows, cols] >= min_iou
+    return dict(zip(next_ids[cols[keep]].tolist(), prev_ids[rows[keep]].tolist()))
+
+def stitch_chunks(chunks, plan, min_iou=0.3):
+    """
+    Merges the detections of consecutive chunks into one run with consistent track IDs.
+
+    Tracks of a chunk that match a track of the previous chunk over the overlap
+    keep its global ID; the others get new IDs. Each chunk then contributes the
+    frames of its own [core_start, end) range.
+
+    Args:
+        chunks (list): DetectionArrays of each chunk, in order, with chunk-local track IDs.
+        plan (list): The matching (read_start, core_start, end) bounds from `plan_chunks`.
+        min_iou (float): See `match_tracks`.
+
+    Returns:
+        DetectionArrays: The merged detections.
+    """
+    merged, next_id = None, 1
+    for det, (read_start, core_start, _) in zip(chunks, plan):
+        mapping = match_tracks(merged, det, read_start, core_start, min_iou) if merged is not None else {}
+        local_ids, inverse = np.unique(det.track_ids, return_inverse=True)
+        global_ids = np.empty(len(local_ids), dtype=np.int32)
+        for i, tid in enumerate(local_ids.tolist()):
+            if tid in mapping:
+                global_ids[i] = mapping[tid]
+            else:
+                global_ids[i] = next_id
+                next_id += 1
+        det = DetectionArrays(det.frame_index, det.frames, global_ids[inverse.reshape(-1)],
+                              det.boxes, det.confs, det.kinds)
+
+        rows = slice(int(np.searchsorted(det.frames, core_start)), len(det.frames))
+        frame_index = det.frame_index[det.frame_index >= core_start]
+        if merged is None:
+            merged = DetectionArrays(frame_index, det.frames[rows], det.track_ids[rows],
+                                     det.boxes[rows], det.confs[rows], det.kinds[rows])
+        else:
+            merged = DetectionArrays(
+                np.concatenate([merged.frame_index, frame_index]),
+                np.concatenate([merged.frames, det.frames[rows]]),
+                np.concatenate([merged.track_ids, det.track_ids[rows]]),
+                np.concatenate([merged.boxes, det.boxes[rows]]),
+                np.concatenate([merged.confs, det.confs[rows]]),
+                np.concatenate([merged.kinds, det.kinds[rows]])
+            )
+    return merged
+
+def _detect_chunk(video_path, start_frame, end_frame, cfg):
+    from .main import detection_stream, parse_detections
+
+    detector = _worker['detector']
+    ball_locator = BallLocator.from_config(detector, cfg)
+    frames = SampledFrameSource(video_path, cfg.get('frame_skip', 1), start_frame, end_frame)
+    recorder = DetectionRecorder()
+    for _ in recorder.wrap(parse_detections(detector, detection_stream(detector, frames, cfg), ball_locator)):
+        pass
+    return recorder.detections()
+
+def run_chunked_detection(video_path, model_path, cfg):
+    """
+    Runs detection and tracking of one video as parallel chunks and stitches the tracks.
+
+    The video is split into `cfg['chunks']` time chunks, each overlapping the
+    previous one by `cfg['chunk_overlap_seconds']`. Every chunk is tracked from
+    scratch in a worker process; the overlap lets its tracker settle and is
+    used to carry the track IDs over the chunk boundary.
+
+    Args:
+        video_path (str): Path to the input video file.
+        model_path (str): Path to the YOLO model file.
+        cfg (dict): The application configuration dictionary.
+
+    Returns:
+        DetectionArrays: The detections of the whole video, as a sequential run would record them.
+    """
+    frame_skip = cfg.get('frame_skip', 1)
+    source = SampledFrameSource(video_path, frame_skip)
+    overlap_frames = int(round(cfg.get('chunk_overlap_seconds', 4.0) * source.fps))
+    plan = plan_chunks(source.frame_count, cfg.get('chunks', 1), frame_skip, overlap_frames)
+    workers = max(1, min(len(plan), cfg.get('chunk_workers') or len(plan)))
+    threads_per_worker = max(1, (os.cpu_count() or 1) // workers)
+    print(f"Detecting {len(plan)} chunks of {os.path.basename(video_path)} on {workers} workers ({threads_per_worker} threads each)")
+
+    with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('spawn'),
+                             initializer=_init_worker, initargs=(model_path, threads_per_worker, cfg.get('imgsz'))) as pool:
+        chunks = list(pool.map(_detect_chunk, [video_path] * len(plan),
+                               [read_start for read_start, _, _ in plan],
+                               [end for _, _, end in plan],
+                               [cfg] * len(plan)))
+    return stitch_chunks(chunks, plan, cfg.get('stitch_min_iou', 0.3))
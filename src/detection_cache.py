@@ -0,0 +1,237 @@
+import hashlib
+import json
+import os
+
+import numpy as np
+
+CACHE_VERSION = 1
+KIND_PERSON, KIND_BALL = 0, 1
+
+def file_digest(path, chunk_size=1 << 20):
+    """
+    Returns the SHA-256 hex digest of a file's content, or of every file of a
+    directory (names and contents, e.g. an OpenVINO model export).
+    """
+    h = hashlib.sha256()
+    if os.path.isdir(path):
+        for root, dirs, files in os.walk(path):
+            dirs.sort()
+            for name in sorted(files):
+                file_path = os.path.join(root, name)
+                h.update(os.path.relpath(file_path, path).encode())
+                h.update(file_digest(file_path, chunk_size).encode())
+        return h.hexdigest()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            h.update(chunk)
+    return h.hexdigest()
+
+def cache_key(video_path, model_path, tracker_cfg, cfg):
+    """
+    Builds the cache key of a detection run.
+
+    The key covers everything that changes the per-frame detections: the video
+    content, the model weights and input size, the tracker configuration, the sampling
+    settings and, for chunked runs, how the chunks are stitched. Analysis-only settings (team names, pixels_to_meters, event
+    thresholds...) are deliberately left out so changing them reuses the cache.
+
+    Returns:
+        str: A hex digest identifying the run.
+    """
+    inference_mode = cfg.get('inference_mode', 'sampled')
+    # Full-video inference ignores chunking; chunked runs depend on how the chunks are stitched
+    chunks = cfg.get('chunks', 1) if inference_mode != 'full' else 1
+    inputs = {
+        'version': CACHE_VERSION,
+        'video': file_digest(video_path),
+        'model': file_digest(model_path),
+        'tracker': file_digest(tracker_cfg),
+        'frame_skip': cfg.get('frame_skip', 1),
+        'inference_mode': inference_mode,
+        'chunks': {'chunks': chunks, 'chunk_overlap_seconds': cfg.get('chunk_overlap_seconds', 4.0),
+                   'stitch_min_iou': cfg.get('stitch_min_iou', 0.3)} if chunks > 1 else 1,
+        'imgsz': cfg.get('imgsz'),
+        'ball_roi': {k: cfg.get(k) for k in ('ball_roi', 'ball_crop_size', 'ball_full_imgsz',
+                                             'ball_roi_max_misses', 'ball_search_interval')} if cfg.get('ball_roi') else False,
+    }
+    return hashlib.sha256(json.dumps(inputs, sort_keys=True).encode()).hexdigest()
+
+class DetectionArrays:
+    def __init__(self, frame_index, frames, track_ids, boxes, confs, kinds):
+        """
+        Parsed per-frame detections of a run, stored as flat arrays in frame order.
+
+        Args:
+            frame_index (np.array): Every analysed frame, including frames without detections.
+            frames, track_ids, confs, kinds (np.array): One entry per detection.
+            boxes (np.array): Detection boxes, shape (n, 4) as [x1, y1, x2, y2].
+        """
+        self.frame_index = frame_index
+        self.frames = frames
+        self.track_ids = track_ids
+        self.boxes = boxes
+        self.confs = confs
+        self.kinds = kinds
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path) as data:
+            return cls(data['frame_index'], data['frame'], data['track_id'], data['box'], data['conf'], data['kind'])
+
+    def save(self, path):
+        """
+        Writes the detections to a compressed .npz file, atomically.
+        """
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        tmp_path = path + '.tmp.npz'
+        np.savez_compressed(
+            tmp_path,
+            frame_index=self.frame_index.astype(np.int32),
+            frame=self.frames.astype(np.int32),
+            track_id=self.track_ids.astype(np.int32),
+            box=self.boxes.astype(np.float32),
+            conf=self.confs.astype(np.float32),
+            kind=self.kinds.astype(np.int8)
+        )
+        os.replace(tmp_path, path)
+
+    def __len__(self):
+        return len(self.frame_index)
+
+    def replay(self, images=None):
+        """
+        Args:
+            images (iterable): (frame_idx, frame) tuples in frame order, e.g. a
+                `SampledFrameSource` over the same video, whose images are attached
+                to the replayed frames. None replays the detections alone.
+
+        Yields:
+            tuple: (frame_idx, persons, balls, frame) for every analysed frame, with the
+            same person/ball dictionaries as `parse_frame_results`; `frame` is None
+            without `images` (or when the video has no such frame).
+        """
+        images = iter(images) if images is not None else None
+        image_idx, image = -1, None
+        bounds = np.searchsorted(self.frames, self.frame_index, side='left')
+        ends = np.searchsorted(self.frames, self.frame_index, side='right')
+        for frame_idx, start, end in zip(self.frame_index.tolist(), bounds, ends):
+            persons, balls = [], []
+            for i in range(start, end):
+                item = {'id': self.track_ids[i], 'box': self.boxes[i].tolist(), 'conf': self.confs[i]}
+                (balls if self.kinds[i] == KIND_BALL else persons).append(item)
+            if images is not None:
+                while image_idx < frame_idx:
+                    image_idx, image = next(images, (np.inf, None))
+            yield frame_idx, persons, balls, image if image_idx == frame_idx else None
+
+class DetectionRecorder:
+    def __init__(self, path=None):
+        """
+        Collects the parsed detections of a run so they can be saved to the cache.
+
+        Args:
+            path (str): Destination .npz path used by `save`.
+        """
+        self.path = path
+        self.frame_index = []
+        self.rows = []
+
+    def wrap(self, detections):
+        """
+        Passes (frame_idx, persons, balls, frame) items through while recording them.
+        """
+        for item in detections:
+            frame_idx, persons, balls, _ = item
+            self.frame_index.append(frame_idx)
+            for kind, objs in ((KIND_PERSON, persons), (KIND_BALL, balls)):
+                for o in objs:
+                    self.rows.append((frame_idx, o['id'], *o['box'], o['conf'], kind))
+            yield item
+
+    def detections(self):
+        """
+        Returns:
+            DetectionArrays: Everything recorded so far.
+        """
+        rows = np.array(self.rows, dtype=np.float64).reshape(-1, 8)
+        return DetectionArrays(
+            np.array(self.frame_index, dtype=np.int32),
+            rows[:, 0].astype(np.int32),
+            rows[:, 1].astype(np.int32),
+            rows[:, 2:6].astype(np.float32),
+            rows[:, 6].astype(np.float32),
+            rows[:, 7].astype(np.int8)
+        )
+
+    def save(self):
+        """
+        Writes the recorded detections. Only call this once the run has completed,
+        so that an interrupted run never leaves a partial cache behind.
+        """
+        self.detections().save(self.path)
+
+class DetectionCache:
+    def __init__(self, cache_dir):
+        """
+        On-disk cache of per-frame detections, one compressed .npz file per cache key.
+
+        Args:
+            cache_dir (str): Directory holding the cache files.
+        """
+        self.cache_dir = cache_dir
+
+    def path_for(self, key):
+        return os.path.join(self.cache_dir, f"{key}.npz")
+
+    def load(self, key):
+        """
+        Returns:
+            DetectionArrays or None: The cached detections, or None on a cache miss.
+        """
+        path = self.path_for(key)
+        if not os.path.isfile(path):
+            return None
+        try:
+            return DetectionArrays.load(path)
+        except Exception as e:
+            print(f"Ignoring unreadable detection cache {path} ({e})")
+            return None
+
+    def recorder(self, key):
+        return DetectionRecorder(self.path_for(key))
+
+    def _teams_path(self, key):
+        return os.path.join(self.cache_dir, f"{key}.teams.json")
+
+    def save_teams(self, key, teams, cfg):
+        """
+        Stores the team of every track of a cached run, as classified from the jersey
+        colours, so that a replay without images can reuse it.
+
+        Args:
+            teams (dict): Track ID to team ('0', '1'... or None for outliers).
+            cfg (dict): The configuration of the classification (kept to check reuse).
+        """
+        path = self._teams_path(key)
+        os.makedirs(self.cache_dir, exist_ok=True)
+        with open(path + '.tmp', 'w') as f:
+            json.dump({'settings': team_settings(cfg), 'teams': {str(pid): team for pid, team in teams.items()}}, f)
+        os.replace(path + '.tmp', path)
+
+    def load_teams(self, key, cfg):
+        """
+        Returns:
+            dict or None: Track ID to team, or None when no teams were stored for this
+            run or they were classified with other settings.
+        """
+        try:
+            with open(self._teams_path(key)) as f:
+                stored = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if stored.get('settings') != team_settings(cfg):
+            return None
+        return {int(pid): team for pid, team in stored['teams'].items()}
+
+def team_settings(cfg):
+    return {k: cfg.get(k) for k in ('team_clustering_sample_frames', 'team_outlier_quantile', 'team_outlier_scale')}
@@ -1,28 +1,81 @@
 import os
 from ultralytics import YOLO
 import torch
+from .tracker import TRACKER_CONFIG, scaled_tracker_config, create_tracker, update_tracks
+
+TRACK_CONF = 0.1
+
+def model_backend(model_name):
+    """
+    Infers the inference backend from the model path.
+
+    Returns:
+        str: 'openvino' for an OpenVINO export directory (or its .xml file), 'onnx'
+        for an .onnx file and 'torch' for PyTorch weights.
+    """
+    path = model_name.rstrip('/\\')
+    if os.path.isdir(path) or path.endswith('.xml'):
+        return 'openvino'
+    if path.endswith('.onnx'):
+        return 'onnx'
+    return 'torch'
 
 class Detector:
-    def __init__(self, model_name):
+    def __init__(self, model_name, imgsz=None):
         """
         Initializes the detector with a specific YOLO model.
 
+        Exported models (ONNX file or OpenVINO directory, see `scripts/export_model.py`)
+        run on the CPU through ultralytics' own backends, so results are parsed
+        exactly like those of the PyTorch weights.
+
         Args:
-            model_name (str): The path to the YOLO model file (e.g., 'models/yolov8n.pt').
+            model_name (str): The path to the YOLO model (e.g., 'models/yolov8n.pt',
+                'models/yolov8n.onnx' or 'models/yolov8n_openvino_model/').
+            imgsz (int): Inference input size. Must match the export size of a static
+                exported model; ultralytics' default when None.
         """
         self.model_name = model_name
-        self.device = 'cuda' if torch.cuda.is_available() else 'cpu'
-        print(f"Initializing YOLO model: {self.model_name} on device: {self.device}")
+        self.backend = model_backend(model_name)
+        self.imgsz = imgsz
+        self.device = 'cuda' if self.backend == 'torch' and torch.cuda.is_available() else 'cpu'
+        print(f"Initializing YOLO model: {self.model_name} ({self.backend}) on device: {self.device}")
 
-        # Check if the model file exists
-        if not os.path.isfile(self.model_name):
+        # Check if the model exists (OpenVINO exports are directories)
+        if not os.path.exists(self.model_name):
              raise FileNotFoundError(f"Model file not found at {self.model_name}")
 
-        self.model = YOLO(self.model_name)
-        self.model.to(self.device)
+        if self.backend == 'torch':
+            self.model = YOLO(self.model_name)
+            self.model.to(self.device)
+        else:
+            # Exported models cannot be moved and need their task spelled out
+            self.model = YOLO(self.model_name, task='detect')
         # Updated to access class names directly from the model object as per recent ultralytics versions
         self.names = self.model.names
 
+    def _inference_args(self):
+        args = {'device': self.device}
+        if self.imgsz:
+            args['imgsz'] = self.imgsz
+        return args
+
+    def class_ids(self, class_names):
+        """
+        Returns:
+            list: The model class IDs whose name is in `class_names`.
+        """
+        return [int(i) for i, name in self.names.items() if name in class_names]
+
+    def reset_tracking(self):
+        """
+        Drops the tracker state kept by `model.track(persist=True)`, so the next video
+        starts with fresh track IDs when the same Detector is reused.
+        """
+        predictor = getattr(self.model, 'predictor', None)
+        for tracker in getattr(predictor, 'trackers', None) or []:
+            tracker.reset()
+
     def detect(self, source, show=False, classes=None):
         """
         Runs the object detection and tracking on a video source.
@@ -36,12 +89,84 @@ class Detector:
             An iterator for the tracking results.
         """
         # Using a custom tracker configuration optimized for football
+        self.reset_tracking()
         return self.model.track(
             source=source,
-            tracker='football-tracker.yaml',
+            tracker=TRACKER_CONFIG,
             persist=True,
-            device=self.device,
             show=show,
             stream=True,
-            classes=classes
-        )
\ No newline at end of file
+            classes=classes,
+            **self._inference_args()
+        )
+
+    def detect_sampled(self, frames, frame_skip=1, classes=None):
+        """
+        Runs detection and tracking only on the frames produced by a sampled source.
+
+        Unlike `detect`, skipped frames never reach the model, so inference cost
+        scales with the number of analysed frames. The tracker buffer is scaled to
+        the sampling step of the source.
+
+        Args:
+            frames (iterable): (frame_idx, frame) tuples, e.g. from a `SampledFrameSource`.
+            frame_skip (int): The sampling step between two frames, used to scale the tracker buffer.
+            classes (list): A list of class IDs to filter for (e.g., [0] for persons).
+
+        Yields:
+            tuple: (frame_idx, result) with the tracking result for that frame.
+        """
+        # The scaled config is removed once the stream ends (or is closed)
+        with scaled_tracker_config(TRACKER_CONFIG, frame_skip) as tracker_cfg:
+            self.reset_tracking()
+            for frame_idx, frame in frames:
+                res = self.model.track(
+                    source=frame,
+                    tracker=tracker_cfg,
+                    persist=True,
+                    classes=classes,
+                    verbose=False,
+                    **self._inference_args()
+                )[0]
+                yield frame_idx, res
+
+    def detect_batched(self, frames, frame_skip=1, batch_size=8, classes=None):
+        """
+        Runs batched detection and tracks the detections with a standalone tracker.
+
+        Frames are grouped into batches of `batch_size` and sent to `model.predict`
+        in one call; each result is then associated frame by frame, in order, with a
+        tracker configured from the same YAML as the streaming path.
+
+        Args:
+            frames (iterable): (frame_idx, frame) tuples, e.g. from a `SampledFrameSource`.
+            frame_skip (int): The sampling step between two frames, used to scale the tracker buffer.
+            batch_size (int): Number of frames per inference call.
+            classes (list): A list of class IDs to filter for (e.g., [0] for persons).
+
+        Yields:
+            tuple: (frame_idx, result) with the tracking result for that frame.
+        """
+        with scaled_tracker_config(TRACKER_CONFIG, frame_skip) as tracker_cfg:
+            tracker = create_tracker(tracker_cfg)
+        batch_idx, batch_frames = [], []
+        for frame_idx, frame in frames:
+            batch_idx.append(frame_idx)
+            batch_frames.append(frame)
+            if len(batch_frames) == batch_size:
+                yield from self._track_batch(tracker, batch_idx, batch_frames, classes)
+                batch_idx, batch_frames = [], []
+        if batch_frames:
+            yield from self._track_batch(tracker, batch_idx, batch_frames, classes)
+
+    def _track_batch(self, tracker, batch_idx, batch_frames, classes):
+        # Same low confidence threshold as `model.track`, so the tracker sees the same detections
+        results = self.model.predict(
+            source=batch_frames,
+            conf=TRACK_CONF,
+            classes=classes,
+            verbose=False,
+            **self._inference_args()
+        )
+        for frame_idx, res in zip(batch_idx, results):
+            yield frame_idx, update_tracks(tracker, res)
@@ -1,46 +1,201 @@
-from .utils import pixel_distance
+import numpy as np
+
+NO_OWNER = -1
+NO_TEAM = -1
+
+def _event(event_type, frame, from_pid, to_pid, team, start_frame, distance_m):
+    return {
+        'type': event_type,
+        'frame': int(frame),
+        'start_frame': int(start_frame),
+        'from_player_id': from_pid,
+        'to_player_id': to_pid,
+        'team_id': team,
+        'distance_m': round(float(distance_m), 2)
+    }
+
+def _transition_type(from_team, to_team, loose):
+    """
+    Classifies a confirmed change of owner: 'pass' within a team, 'interception' when
+    the other team wins a loose ball, 'loss' when it takes the ball directly.
+    Returns None when a team is unknown.
+    """
+    if from_team is None or to_team is None:
+        return None
+    if from_team == to_team:
+        return 'pass'
+    return 'interception' if loose else 'loss'
 
 class EventManager:
     def __init__(self, cfg):
         """
-        Manages the detection of in-game events based on state changes
-        provided by the main analysis loop.
+        Detects in-game events from the stream of ball ownership, one analysed frame at a time.
+
+        The raw owner of each frame is debounced: an owner (or a loose ball) only
+        counts once it has been seen for `event_min_frames` consecutive analysed
+        frames, so a one-frame mis-assignment never creates an event. Consecutive
+        confirmed possessions then produce:
+
+        - 'pass': the ball goes to a team-mate;
+        - 'interception': the other team wins the ball after it was loose;
+        - 'loss': the other team takes the ball directly (tackle, duel);
+        - 'dribble': a possession during which the owner moved at least
+          `dribble_min_distance_m`, reported when it ends.
+
+        The state is a handful of scalars, whatever the length of the match.
+        `detect_events` computes the same events over a whole ownership series.
 
         Args:
             cfg (dict): The application configuration dictionary.
         """
         self.cfg = cfg
+        self.min_frames = max(1, cfg.get('event_min_frames', 2))
+        self.dribble_min_distance = cfg.get('dribble_min_distance_m', 5.0)
 
-    def update(self, frame_idx, players, ball, last_owner_pid, current_owner_pid):
+        # Current run of identical raw owners
+        self.run_owner = None
+        self.run_length = 0
+        self.run_start_frame = None
+        self.run_start_pos = None
+        # Current confirmed possession
+        self.owner = None
+        self.owner_team = None
+        self.start_frame = None
+        self.start_pos = None
+        self.last_frame = None
+        self.last_pos = None
+        self.loose = False
+
+    def update(self, frame_idx, owner_pid, owner_team=None, owner_pos=None):
         """
-        Analyzes the change in ball ownership to detect events like passes.
+        Feeds the ball owner of one analysed frame.
 
         Args:
             frame_idx (int): The current frame index.
-            players (dict): Dictionary of all player data.
-            ball (dict): Dictionary with ball data.
-            last_owner_pid (int or None): The ID of the player who owned the ball previously.
-            current_owner_pid (int or None): The ID of the player who owns the ball now.
+            owner_pid (int or None): The player owning the ball in this frame.
+            owner_team (str or None): The owner's team.
+            owner_pos (tuple): The owner's position on the pitch, in metres.
 
         Returns:
-            list: A list of event dictionaries detected in this frame.
+            list: The event dictionaries confirmed at this frame.
         """
+        if owner_pid != self.run_owner or self.run_length == 0:
+            self.run_owner, self.run_length = owner_pid, 0
+            self.run_start_frame, self.run_start_pos = frame_idx, owner_pos
+        self.run_length += 1
+        if self.run_length < self.min_frames:
+            return []
+
+        if owner_pid is None:
+            if self.run_length == self.min_frames:
+                self.loose = True
+            return []
+
         events = []
+        if owner_pid != self.owner:
+            if self.owner is not None:
+                events.extend(self._close_possession(frame_idx))
+                event_type = _transition_type(self.owner_team, owner_team, self.loose)
+                if event_type:
+                    events.append(_event(
+                        event_type, frame_idx, self.owner, owner_pid,
+                        owner_team if event_type == 'interception' else self.owner_team,
+                        self.last_frame, self._distance(self.last_pos, self.run_start_pos)))
+            self.owner = owner_pid
+            self.start_frame, self.start_pos = self.run_start_frame, self.run_start_pos
+        self.loose = False
+        self.owner_team = owner_team
+        self.last_frame, self.last_pos = frame_idx, owner_pos
+        return events
+
+    def finish(self):
+        """
+        Closes the current possession at the end of the stream.
+
+        Returns:
+            list: The last dribble event, if any.
+        """
+        events = self._close_possession(self.last_frame) if self.owner is not None else []
+        self.owner = None
+        return events
+
+    def _close_possession(self, frame_idx):
+        distance = self._distance(self.start_pos, self.last_pos)
+        if distance < self.dribble_min_distance:
+            return []
+        return [_event('dribble', frame_idx, self.owner, self.owner, self.owner_team, self.start_frame, distance)]
+
+    def _distance(self, a, b):
+        if a is None or b is None:
+            return 0.0
+        return float(np.hypot(a[0] - b[0], a[1] - b[1]))
+
+def detect_events(frames, owners, teams, xs, ys, cfg):
+    """
+    Computes the events of a whole ownership series at once.
+
+    Gives the same events as feeding every frame to `EventManager.update` and
+    calling `finish`, with the debouncing and possession segmentation done on
+    run lengths instead of frame by frame.
+
+    Args:
+        frames (np.array): Index of each analysed frame.
+        owners (np.array): Owner player ID of each frame, NO_OWNER for a loose ball.
+        teams (np.array): Owner team code of each frame, NO_TEAM when unknown.
+        xs, ys (np.array): Owner position on the pitch in metres (ignored on loose frames).
+        cfg (dict): The application configuration dictionary.
+
+    Returns:
+        list: The event dictionaries, in frame order.
+    """
+    min_frames = max(1, cfg.get('event_min_frames', 2))
+    dribble_min_distance = cfg.get('dribble_min_distance_m', 5.0)
+    frames, owners, teams = np.asarray(frames), np.asarray(owners), np.asarray(teams)
+    xs, ys = np.asarray(xs, dtype=np.float64), np.asarray(ys, dtype=np.float64)
+    if len(owners) == 0:
+        return []
+
+    # Runs of identical raw owners; only runs of min_frames or more are confirmed
+    starts = np.flatnonzero(np.r_[True, owners[1:] != owners[:-1]])
+    ends = np.r_[starts[1:], len(owners)]
+    values = owners[starts]
+    confirmed = ends - starts >= min_frames
+    loose_count = np.cumsum(confirmed & (values == NO_OWNER))
+
+    # Possessions: consecutive confirmed runs of the same owner, loose runs in between ignored
+    runs = np.flatnonzero(confirmed & (values != NO_OWNER))
+    if len(runs) == 0:
+        return []
+    new_possession = np.r_[True, values[runs][1:] != values[runs][:-1]]
+    first_run = runs[new_possession]
+    last_run = runs[np.r_[new_possession[1:], True]]
+    owner = values[first_run]
+    start = starts[first_run]
+    confirm = start + min_frames - 1
+    last = ends[last_run] - 1
+    # A loose ball was confirmed between the end of a possession and the start of the next
+    loose = loose_count[first_run[1:] - 1] - loose_count[last_run[:-1]] > 0
+
+    def team(i):
+        return None if teams[i] == NO_TEAM else str(teams[i])
+
+    def distance(i, j):
+        return float(np.hypot(xs[i] - xs[j], ys[i] - ys[j]))
 
-        # --- Pass Detection ---
-        # A pass occurs when the ball ownership changes from one player to another on the same team.
-        if last_owner_pid and current_owner_pid and last_owner_pid != current_owner_pid:
-            p_from = players.get(last_owner_pid)
-            p_to = players.get(current_owner_pid)
-
-            # Ensure both players exist and are on the same team for a pass
-            if p_from and p_to and p_from.get('team') is not None and p_from.get('team') == p_to.get('team'):
-                events.append({
-                    'type': 'pass',
-                    'frame': frame_idx,
-                    'from_player_id': last_owner_pid,
-                    'to_player_id': current_owner_pid,
-                    'team_id': p_from.get('team')
-                })
-
-        return events
\ No newline at end of file
+    events = []
+    for k in range(len(owner)):
+        is_last = k == len(owner) - 1
+        dribble = distance(start[k], last[k])
+        end_frame = frames[last[k]] if is_last else frames[confirm[k + 1]]
+        if dribble >= dribble_min_distance:
+            events.append(_event('dribble', end_frame, owner[k].item(), owner[k].item(), team(last[k]),
+                                 frames[start[k]], dribble))
+        if is_last:
+            break
+        to_team = team(confirm[k + 1])
+        event_type = _transition_type(team(last[k]), to_team, loose[k])
+        if event_type:
+            events.append(_event(event_type, end_frame, owner[k].item(), owner[k + 1].item(),
+                                 to_team if event_type == 'interception' else team(last[k]),
+                                 frames[last[k]], distance(last[k], start[k + 1])))
+    return events
@@ -0,0 +1,169 @@
+import numpy as np
+import pandas as pd
+from scipy.signal import savgol_filter
+
+from .pitch import PitchCalibration
+
+SPEED_ZONE_NAMES = ('walking', 'jogging', 'running', 'high_speed', 'sprinting')
+
+def _segments(track_ids, frames, max_gap):
+    """
+    Splits rows sorted by (track, frame) into continuous segments.
+
+    A new segment starts with every new track and whenever two consecutive
+    observations are `max_gap` frames or more apart (the player was re-identified
+    after a long time and must not "teleport").
+
+    Returns:
+        tuple: (starts, ends) row bounds of each segment.
+    """
+    breaks = np.flatnonzero((np.diff(track_ids) != 0) | (np.diff(frames) >= max_gap)) + 1
+    return np.r_[0, breaks], np.r_[breaks, len(frames)]
+
+def _smooth(values, starts, ends, window, polyorder):
+    smoothed = values.copy()
+    for s, e in zip(starts, ends):
+        if e - s >= window:
+            smoothed[s:e] = savgol_filter(values[s:e], window, polyorder)
+    return smoothed
+
+def smoothing_window(cfg, fps):
+    """
+    Returns:
+        int: The Savitzky-Golay window, in analysed samples, for `cfg['smoothing_window_seconds']`.
+        A window of polyorder + 1 samples fits the data exactly and would not smooth
+        anything, so the window has at least polyorder + 3 samples (and is odd).
+    """
+    polyorder = cfg.get('smoothing_polyorder', 2)
+    configured = int(round(cfg.get('smoothing_window_seconds', 2.0) * fps / cfg.get('frame_skip', 1)))
+    window = max(configured, polyorder + 3)
+    window += 1 - window % 2  # savgol needs an odd window
+    if window > configured + 1:
+        print(f"WARNING: smoothing_window_seconds covers {configured} analysed samples, too few to smooth "
+              f"with polyorder {polyorder}; using {window} samples ({window * cfg.get('frame_skip', 1) / fps:.2f}s)")
+    return window
+
+def speed_series(track_store, fps, cfg, calibration=None):
+    """
+    Computes the smoothed speed and acceleration of every player between consecutive samples.
+
+    Foot points are projected to pitch metres in bulk, then smoothed per
+    continuous segment with a Savitzky-Golay filter before differentiation,
+    which removes most of the detection jitter that inflates raw frame-to-frame
+    speeds.
+
+    Args:
+        track_store (TrackStore): All tracked observations.
+        fps (float): Frame rate of the source video.
+        cfg (dict): The application configuration dictionary.
+        calibration (PitchCalibration): The image-to-pitch mapping; built from `cfg`
+            (static camera) when not given.
+
+    Returns:
+        pd.DataFrame: One row per step with player_id, segment (continuous run of
+        observations), frame (end of the step), dt_s, distance_m, speed_kmh and
+        accel_ms2 (NaN on the first step of a segment).
+    """
+    columns = ['player_id', 'segment', 'frame', 'dt_s', 'distance_m', 'speed_kmh', 'accel_ms2']
+    if len(track_store) == 0:
+        return pd.DataFrame({name: np.empty(0, dtype=np.int64 if i < 3 else float) for i, name in enumerate(columns)})
+    frame_skip = cfg.get('frame_skip', 1)
+    if calibration is None:
+        calibration = PitchCalibration.from_config({**cfg, 'homography_refresh_seconds': None}, fps)
+    order, _, _, _ = track_store.trajectories()
+    track_ids = track_store.column('track_id')[order]
+    frames = track_store.column('frame')[order].astype(np.int64)
+    xs, ys = calibration.to_pitch(frames, track_store.column('x')[order], track_store.column('foot_y')[order])
+
+    starts, ends = _segments(track_ids, frames, frame_skip * 5)
+    polyorder = cfg.get('smoothing_polyorder', 2)
+    window = smoothing_window(cfg, fps)
+    xs = _smooth(xs, starts, ends, window, polyorder)
+    ys = _smooth(ys, starts, ends, window, polyorder)
+
+    # A step joins two consecutive rows of the same segment
+    in_segment = np.ones(len(frames), dtype=bool)
+    in_segment[starts] = False
+    step_end = np.flatnonzero(in_segment)
+    dt = (frames[step_end] - frames[step_end - 1]) / fps
+    dist_m = np.hypot(np.diff(xs)[step_end - 1], np.diff(ys)[step_end - 1])
+    speed_ms = dist_m / dt
+
+    # Acceleration between two consecutive steps of the same segment
+    accel = np.full(len(step_end), np.nan)
+    follows = np.flatnonzero(np.diff(step_end) == 1) + 1
+    accel[follows] = (speed_ms[follows] - speed_ms[follows - 1]) / ((dt[follows] + dt[follows - 1]) / 2)
+
+    return pd.DataFrame(dict(zip(columns, [
+        track_ids[step_end],
+        np.searchsorted(starts, step_end, side='right') - 1,
+        frames[step_end],
+        dt,
+        dist_m,
+        speed_ms * 3.6,
+        accel
+    ])))
+
+def player_kinematics(track_store, fps, cfg, series=None, calibration=None):
+    """
+    Summarises the kinematics of every player over the whole match.
+
+    Args:
+        track_store (TrackStore): All tracked observations.
+        fps (float): Frame rate of the source video.
+        cfg (dict): The application configuration dictionary (speed zones, sprint thresholds).
+        series (pd.DataFrame): A precomputed `speed_series`, to re-run with other thresholds.
+        calibration (PitchCalibration): The image-to-pitch mapping used by `speed_series`.
+
+    Returns:
+        pd.DataFrame: Indexed by player_id with distance_m, avg_speed_kmh, max_speed_kmh,
+        max_accel_ms2, max_decel_ms2, sprints and the seconds spent in each speed zone.
+    """
+    if series is None:
+        series = speed_series(track_store, fps, cfg, calibration)
+    zone_bounds = cfg.get('speed_zones_kmh', [7.0, 15.0, 20.0, 25.0])
+    zone_names = SPEED_ZONE_NAMES if len(zone_bounds) == len(SPEED_ZONE_NAMES) - 1 else [f"zone{i}" for i in range(len(zone_bounds) + 1)]
+    sprint_speed = cfg.get('sprint_speed_kmh', 25.0)
+    sprint_min_seconds = cfg.get('sprint_min_seconds', 1.0)
+
+    player_ids, step_player = np.unique(series['player_id'].to_numpy(), return_inverse=True)
+    n_players = len(player_ids)
+    dt = series['dt_s'].to_numpy()
+    speed = series['speed_kmh'].to_numpy()
+    accel = series['accel_ms2'].to_numpy()
+
+    distance = np.bincount(step_player, weights=series['distance_m'].to_numpy(), minlength=n_players)
+    duration = np.bincount(step_player, weights=dt, minlength=n_players)
+    max_speed = np.zeros(n_players)
+    np.maximum.at(max_speed, step_player, speed)
+    finite = ~np.isnan(accel)
+    max_accel = np.zeros(n_players)
+    max_decel = np.zeros(n_players)
+    np.maximum.at(max_accel, step_player[finite], accel[finite])
+    np.minimum.at(max_decel, step_player[finite], accel[finite])
+
+    zone = np.digitize(speed, zone_bounds)
+    zone_time = np.bincount(step_player * len(zone_names) + zone, weights=dt,
+                            minlength=n_players * len(zone_names)).reshape(n_players, len(zone_names))
+
+    # Sprints: runs of consecutive steps above the sprint speed lasting long enough
+    sprinting = speed >= sprint_speed
+    segment = series['segment'].to_numpy()
+    contiguous = np.r_[False, segment[1:] == segment[:-1]]
+    run_start = sprinting & ~(contiguous & np.r_[False, sprinting[:-1]])
+    run_id = np.cumsum(run_start) - 1
+    run_duration = np.bincount(run_id[sprinting], weights=dt[sprinting], minlength=int(run_start.sum()))
+    run_player = step_player[run_start]
+    sprints = np.bincount(run_player[run_duration >= sprint_min_seconds], minlength=n_players)
+
+    summary = pd.DataFrame({
+        'distance_m': distance.round(2),
+        'avg_speed_kmh': (3.6 * np.divide(distance, duration, out=np.zeros(n_players), where=duration > 0)).round(2),
+        'max_speed_kmh': max_speed.round(2),
+        'max_accel_ms2': max_accel.round(2),
+        'max_decel_ms2': max_decel.round(2),
+        'sprints': sprints
+    }, index=pd.Index(player_ids, name='player_id'))
+    for i, name in enumerate(zone_names):
+        summary[f"{name}_s"] = zone_time[:, i].round(2)
+    return summary
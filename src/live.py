@@ -0,0 +1,216 @@
+import json
+import os
+import sys
+import threading
+import time
+
+import numpy as np
+
+from .main import MatchAnalyzer, detection_stream, parse_detections, print_pipeline_report, write_match_outputs
+from .ball_roi import BallLocator
+from .pipeline import Pipeline
+from .profiling import Profiler
+from .video_io import LiveFrameSource
+
+def _json_default(value):
+    # numpy scalars (track IDs, stats) and anything else the encoder does not know
+    return value.item() if isinstance(value, np.generic) else str(value)
+
+def latency_summary(latencies):
+    """
+    Returns:
+        dict: Count, mean, p50, p95 and max of latencies in seconds (rounded to the millisecond).
+    """
+    if not latencies:
+        return {'count': 0}
+    values = np.asarray(latencies)
+    return {'count': len(values), 'mean_s': round(float(values.mean()), 3),
+            'p50_s': round(float(np.percentile(values, 50)), 3), 'p95_s': round(float(np.percentile(values, 95)), 3),
+            'max_s': round(float(values.max()), 3)}
+
+class LiveStatsEmitter:
+    def __init__(self, analyzer, source, output, interval_s=1.0, duration_s=None):
+        """
+        Pipeline stage running the match analysis on live detections and emitting
+        incremental stats as JSON lines.
+
+        Every `interval_s` seconds, after the frame just analysed, one 'update' line
+        holds the possession so far, the latest team stats, the events detected
+        since the previous line, the frame counters and the latency from the
+        capture of that frame to the emission. The latency from capture to the end
+        of the analysis is also recorded for every frame. Frames that arrive older
+        than the source's latency budget (the analysis fell behind inference) are
+        dropped unanalysed.
+
+        Args:
+            analyzer (MatchAnalyzer): The match state, updated by this stage only.
+            source (LiveFrameSource): The source of the frames, for capture times and counters.
+            output (file): Where the lines are written (flushed after each line).
+            interval_s (float): Seconds between two updates.
+            duration_s (float): Stop the source after this many seconds (None: run until it ends).
+        """
+        self.analyzer = analyzer
+        self.source = source
+        self.output = output
+        self.interval_s = interval_s
+        self.duration_s = duration_s
+        self.frame_latencies, self.emit_latencies = [], []
+        self.analysed = self.dropped_late = 0
+        self.emitted = 0
+        self.done = threading.Event()
+        self._events_sent = 0
+        self._captured_at = None
+        self._start = None
+        self._last_emit = None
+
+    def possession(self):
+        """
+        Returns:
+            dict: Team ID to seconds of possession and share of the stream time so far (%),
+            as in team_stats.csv.
+        """
+        analyzer = self.analyzer
+        elapsed_s = analyzer.last_frame_idx / analyzer.fps
+        return {team: {'seconds': round(seconds, 2), 'pct': round(100 * seconds / elapsed_s, 2) if elapsed_s else 0.0}
+                for team, seconds in analyzer.team_possession_seconds.items()}
+
+    def update(self, kind='update', latency_s=None):
+        analyzer = self.analyzer
+        events = analyzer.events[self._events_sent:]
+        self._events_sent = len(analyzer.events)
+        line = {
+            'type': kind,
+            'emitted_at': round(time.time(), 3),
+            'frame': analyzer.last_frame_idx,
+            'stream_time_s': round(analyzer.last_frame_idx / analyzer.fps, 2),
+            'latency_s': round(latency_s, 3) if latency_s is not None else None,
+            'possession': self.possession(),
+            'team_stats': analyzer.team_stats_history[-1] if analyzer.team_stats_history else {},
+            'events': events,
+            'frames': self.counters()
+        }
+        self.output.write(json.dumps(line, default=_json_default) + '\n')
+        self.output.flush()
+        self.emitted += 1
+
+    def counters(self):
+        return dict(self.source.counters(), dropped_late=self.dropped_late, analysed=self.analysed)
+
+    def _fresh(self, detections):
+        for item in detections:
+            captured_at = self.source.capture_time(item[0])
+            if captured_at is not None and time.monotonic() - captured_at > self.source.max_latency_s:
+                self.dropped_late += 1
+                continue
+            self._captured_at = captured_at
+            yield item
+
+    def process(self, detections):
+        """
+        Analyses (frame_idx, persons, balls, frame) items, emitting updates as it goes.
+
+        Yields:
+            tuple: The (frame_idx, annotated_frame) items of `MatchAnalyzer.process`.
+        """
+        self._start = self._last_emit = time.monotonic()
+        try:
+            for item in self.analyzer.process(self._fresh(detections)):
+                # The analyzer yields right after the frame it last pulled
+                frame_idx, captured_at = item[0], self._captured_at
+                now = time.monotonic()
+                self.analysed += 1
+                if captured_at is not None:
+                    self.frame_latencies.append(now - captured_at)
+                if now - self._last_emit >= self.interval_s:
+                    self.update(latency_s=now - captured_at if captured_at is not None else None)
+                    if captured_at is not None:
+                        self.emit_latencies.append(time.monotonic() - captured_at)
+                    self._last_emit = now
+                if self.duration_s is not None and now - self._start >= self.duration_s:
+                    self.source.stop()
+                yield item
+        finally:
+            self.done.set()
+
+    def summary(self):
+        return {
+            'wall_s': round(time.monotonic() - self._start, 2) if self._start is not None else 0.0,
+            'frames': self.counters(),
+            'updates': self.emitted,
+            'frame_latency': latency_summary(self.frame_latencies),
+            'emit_latency': latency_summary(self.emit_latencies)
+        }
+
+def run_live(source, output_dir, model_path, config, generate_llm_report=False, detector=None, loop=False, duration_s=None,
+             inference_stage=None):
+    """
+    Analyses a live source, emitting incremental stats until the source ends (or
+    `duration_s` elapses, or Ctrl-C), then writes the usual match outputs.
+
+    Updates are written to `<output_dir>/live_stats.jsonl` (or printed when
+    `cfg['live_stats_path']` is '-'); the capture-to-emission latency is reported
+    at the end and saved with the frame counters to `live_summary.json`.
+
+    Inference takes each frame straight from the source when it is ready for
+    one, so frames never wait in a queue before it; the analysis runs on its own
+    thread behind a one-item queue. The live pipeline has no ball gap filling
+    (it waits for the next detection) and no annotated video.
+
+    Args:
+        source (str): A stream URL or a video file (see `LiveFrameSource`).
+        loop (bool): Play a file in a loop, as a stand-in for a live stream.
+        duration_s (float): Stop after this many seconds.
+        inference_stage (callable): Replaces detection: takes the (frame_idx, frame)
+            items and returns (frame_idx, persons, balls, frame) items.
+
+    Returns:
+        dict: The live summary (frame counters, updates, latencies).
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    cfg = dict(config, video_codec=None)
+    profiler = Profiler(enabled=cfg.get('profile', False))
+    frame_source = LiveFrameSource.from_config(cfg, source, loop=loop)
+    fps = frame_source.fps
+    analyzer = MatchAnalyzer(cfg, fps, profiler)
+
+    if inference_stage is None:
+        if detector is None:
+            from .detector import Detector
+            detector = Detector(model_name=model_path, imgsz=cfg.get('imgsz'))
+        def inference_stage(frames):
+            return parse_detections(detector, detection_stream(detector, frames, cfg), BallLocator.from_config(detector, cfg), profiler)
+
+    stats_path = cfg.get('live_stats_path') or os.path.join(output_dir, 'live_stats.jsonl')
+    output = sys.stdout if stats_path == '-' else open(stats_path, 'w')
+    emitter = LiveStatsEmitter(analyzer, frame_source, output, cfg.get('live_stats_interval_seconds', 1.0), duration_s)
+    pipeline = Pipeline(inference_stage(frame_source), 'inference', 1, True, profiler)
+    pipeline.add_stage('analysis', emitter.process)
+
+    print(f"Live analysis of {source} ({fps:g} fps, latency budget {frame_source.max_latency_s:g}s); "
+          f"updates every {emitter.interval_s:g}s to {stats_path}")
+    try:
+        pipeline.run()
+    except KeyboardInterrupt:
+        print("Interrupted, finishing the frames in flight...")
+        frame_source.stop()
+        emitter.done.wait(timeout=30)
+    analyzer.finish()
+    emitter.update('final')
+    if output is not sys.stdout:
+        output.close()
+    print_pipeline_report(pipeline.report())
+
+    summary = emitter.summary()
+    with open(os.path.join(output_dir, 'live_summary.json'), 'w') as f:
+        json.dump(summary, f, indent=2)
+    frames, emit = summary['frames'], summary['emit_latency']
+    print(f"Live: {frames['captured']} frames captured, {frames['analysed']} analysed, "
+          f"{frames['dropped_overrun'] + frames['dropped_stale'] + frames['dropped_late']} dropped to keep up "
+          f"({frames['dropped_stale'] + frames['dropped_late']} over the latency budget); {summary['updates']} updates")
+    if emit['count']:
+        print(f"Capture to emission latency: p50 {emit['p50_s'] * 1e3:.0f} ms, p95 {emit['p95_s'] * 1e3:.0f} ms, "
+              f"max {emit['max_s'] * 1e3:.0f} ms")
+
+    write_match_outputs(output_dir, analyzer, source, fps, (frame_source.width, frame_source.height), cfg, generate_llm_report,
+                        profiler=profiler)
+    return summary
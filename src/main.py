@@ -2,15 +2,35 @@ import os, json, time
 import cv2
 import numpy as np
 import pandas as pd
-from .detector import Detector
-from .tracker import parse_frame_results
-from .utils import box_center, pixel_distance, speed_kmh
-from .events import EventManager
-from .visualization import draw_annotations
+from .tracker import TRACKER_CONFIG, parse_frame_results
+from .utils import box_center
+from .spatial import PlayerIndex
+from .events import EventManager, NO_OWNER, detect_events
+from .video_io import SampledFrameSource, AnnotatedVideoWriter
+from .pipeline import Pipeline
+from .detection_cache import DetectionCache, cache_key
+from .chunked import run_chunked_detection
+from .ball_roi import BallLocator
+from .ball_track import BallTracker
+from .track_store import TrackStore, NO_TEAM
+from .team_classifier import TeamClassifier
+from .pitch import PitchCalibration, PITCH_LENGTH, PITCH_WIDTH
+from .kinematics import player_kinematics
+from .track_archive import write_track_archive
+from .parquet_export import write_match_parquet, trajectories_frame
+from .visualization import draw_annotations, TrailRenderer, bin_positions, draw_pitch, render_heatmap, render_pass_network, TEAM_A_COLOR, TEAM_B_COLOR
+from .profiling import Profiler, print_profile_summary
 from . import stats
 from . import tactical_analysis
 
 def assign_teams_by_clustering(players, initial_positions):
+    """
+    Splits the players in two groups by their mean position over the sampled frames.
+
+    Only used when no frames are available (replayed detections) or when
+    `cfg['team_classification']` is 'position'; it separates the pitch halves
+    rather than the teams.
+    """
     if len(initial_positions) < 2:
         for i, pid in enumerate(players):
             players[pid]['team'] = str(i)
@@ -25,23 +45,58 @@ def assign_teams_by_clustering(players, initial_positions):
             players[pid]['team'] = str(team_assignments[i])
     return players
 
-def find_ball_owner(ball, persons):
-    owner = None
+def team_code(team):
+    """
+    Converts a team label ('0', '1' or None) to the integer code stored in a TrackStore.
+    """
+    return NO_TEAM if team is None else int(team)
+
+def find_ball_owner(ball, persons, max_distance=np.inf, index=None):
+    """
+    Finds the player closest to the ball, measured from the ball centre to the player's feet.
+
+    Args:
+        ball (dict): The ball detection, or None.
+        persons (list): The person detections of the frame.
+        max_distance (float): Players further away than this (in pixels) cannot own the ball.
+        index (PlayerIndex): The frame's player index, built from `persons` when not given.
+
+    Returns:
+        dict or None: The owning person, or None.
+    """
     if not ball or not persons: return None
-    bx, by = box_center(ball['box'])
-    min_dist = float('inf')
-    for p in persons:
-        cx, cy = box_center(p['box'])
-        d = pixel_distance((cx, cy), (bx, by))
-        if d < min_dist:
-            min_dist, owner = d, p
-    return owner
-
-def filter_players(players, min_positions=10):
-    return {pid: data for pid, data in players.items() if len(data.get('positions', [])) >= min_positions}
-
-def export_results(output_dir, players, events, video_path, cfg, team_possession_seconds, total_time_seconds, team_stats_history, generate_llm_report=False):
+    if index is None:
+        index = PlayerIndex.from_persons(persons)
+    row, _ = index.nearest(box_center(ball['box']), max_distance)
+    return persons[row] if row is not None else None
+
+def filter_players(players, track_store, min_positions=10):
+    track_ids, counts = track_store.counts()
+    stable = set(track_ids[counts >= min_positions].tolist())
+    return {pid: data for pid, data in players.items() if pid in stable}
+
+def event_counts(events_df):
+    """
+    Returns:
+        pd.DataFrame: Number of events of each type (columns 'passes', 'losses'...) per team.
+    """
+    counts = events_df.groupby(['team_id', 'type']).size().unstack(fill_value=0)
+    counts.columns = [{'pass': 'passes', 'loss': 'losses'}.get(col, f"{col}s") for col in counts.columns]
+    return counts
+
+def export_results(output_dir, players, events, video_path, cfg, team_possession_seconds, total_time_seconds, team_stats_history, generate_llm_report=False, kinematics=None, track_store=None, ball_track=None, calibration=None, ownership=None):
+    """
+    Writes the player, event, ball and team tables (and the Parquet dataset) of a match.
+
+    The ball ownership series (`MatchAnalyzer.ownership_series`) is saved as well, so
+    that `redetect_events` can recompute the events with other settings.
+
+    Returns:
+        concurrent.futures.Future or None: The tactical report being generated in the
+        background when `generate_llm_report`; see `tactical_analysis.save_report`.
+    """
     team_names = cfg.get('team_names', {})
+    output_formats = cfg.get('output_formats', ['csv'])
 
     # --- Export Player Stats ---
     player_rows = []
@@ -49,20 +104,28 @@ def export_results(output_dir, players, events, video_path, cfg, team_possession
         team_id = d.get('team')
         player_rows.append({
             'player_id': pid, 'number': d.get('number'), 'team_id': team_id,
-            'team_name': team_names.get(str(team_id), f'Team {team_id}'), 'touches': d.get('touches'),
-            'distance_m': round(d.get('dist_pixels', 0.0) * cfg.get('pixels_to_meters', 0.1), 2),
-            'max_speed_kmh': round(d.get('max_speed_kmh', 0.0), 2)
+            'team_name': team_names.get(str(team_id), f'Team {team_id}'), 'touches': d.get('touches')
         })
     player_df = pd.DataFrame(player_rows)
-    player_stats_path = os.path.join(output_dir, 'players_stats.csv')
-    player_df.to_csv(player_stats_path, index=False)
+    if kinematics is not None and not player_df.empty:
+        # Distances and speeds come from the smoothed whole trajectories
+        player_df = player_df.join(kinematics, on='player_id')
+    if 'csv' in output_formats:
+        player_stats_path = os.path.join(output_dir, 'players_stats.csv')
+        player_df.to_csv(player_stats_path, index=False)
 
     # --- Export Events ---
     events_df = pd.DataFrame(events) if events else pd.DataFrame()
     events_path = os.path.join(output_dir, 'events.csv')
-    if not events_df.empty:
+    if not events_df.empty and 'csv' in output_formats:
         events_df.to_csv(events_path, index=False)
 
+    # --- Export Ball Track ---
+    if ball_track is not None and 'csv' in output_formats:
+        ball_track.to_csv(os.path.join(output_dir, 'ball_track.csv'), index=False)
+    if ownership is not None and 'csv' in output_formats:
+        ownership.to_csv(os.path.join(output_dir, 'ownership.csv'), index=False)
+
     # --- Calculate and Export Team Stats ---
     team_stats_df = pd.DataFrame()
     if not player_df.empty and 'team_id' in player_df.columns:
@@ -71,9 +134,12 @@ def export_results(output_dir, players, events, video_path, cfg, team_possession
         ])
 
         if not history_df.empty:
-            avg_compactness = history_df.groupby('team_id')['compactness'].mean().round(2)
-            team_stats_df = pd.DataFrame(index=avg_compactness.index)
-            team_stats_df['avg_compactness_m'] = avg_compactness
+            team_averages = history_df.groupby('team_id')[['compactness', 'width', 'depth', 'hull_area']].mean().round(2)
+            team_stats_df = pd.DataFrame(index=team_averages.index)
+            team_stats_df['avg_compactness_m'] = team_averages['compactness']
+            team_stats_df['avg_width_m'] = team_averages['width']
+            team_stats_df['avg_depth_m'] = team_averages['depth']
+            team_stats_df['avg_hull_area_m2'] = team_averages['hull_area']
 
             possession_series = pd.Series(team_possession_seconds, name='possession_seconds')
             if total_time_seconds > 0:
@@ -81,147 +147,649 @@ def export_results(output_dir, players, events, video_path, cfg, team_possession
 
             team_stats_df['total_distance_m'] = player_df.groupby('team_id')['distance_m'].sum()
             if not events_df.empty:
-                event_counts = events_df.groupby(['team_id', 'type']).size().unstack(fill_value=0)
-                event_counts.columns = [f"{col}s" for col in event_counts.columns]
-                team_stats_df = team_stats_df.join(event_counts)
+                team_stats_df = team_stats_df.join(event_counts(events_df))
 
             team_stats_df.fillna(0, inplace=True)
             team_stats_df['team_name'] = team_stats_df.index.map(lambda x: team_names.get(str(x), f"Team {x}"))
-            team_stats_path = os.path.join(output_dir, 'team_stats.csv')
-            team_stats_df.to_csv(team_stats_path, index_label='team_id')
+            if 'csv' in output_formats:
+                team_stats_path = os.path.join(output_dir, 'team_stats.csv')
+                team_stats_df.to_csv(team_stats_path, index_label='team_id')
 
-    # --- Generate LLM Report (if enabled) ---
+    # --- Start the LLM Report (if enabled) ---
+    # The request runs in the background while the remaining outputs are written
+    pending_report = None
     if generate_llm_report:
         if not team_stats_df.empty and not player_df.empty:
-            report = tactical_analysis.generate_tactical_report(team_stats_df, player_df, events_df)
-            report_path = os.path.join(output_dir, 'tactical_report.txt')
-            with open(report_path, 'w') as f:
-                f.write(report)
-            print(f"Tactical report saved to {report_path}")
+            generator = tactical_analysis.ReportGenerator.from_config(cfg)
+            print("Sending data to LLM for tactical analysis...")
+            pending_report = generator.submit(tactical_analysis.format_data_for_llm(team_stats_df, player_df, events_df))
+            generator.close(wait=False)
         else:
             print("Skipping LLM report generation due to missing stats.")
 
+    # --- Export Parquet (partitioned by match) ---
+    if 'parquet' in output_formats:
+        match_id = cfg.get('match_id') or os.path.splitext(os.path.basename(video_path))[0]
+        dataset_dir = cfg.get('parquet_dataset_dir') or os.path.join(output_dir, 'parquet')
+        written = write_match_parquet(dataset_dir, match_id, {
+            'players': player_df,
+            'teams': team_stats_df.rename_axis('team_id').reset_index() if not team_stats_df.empty else team_stats_df,
+            'events': events_df,
+            'trajectories': trajectories_frame(track_store, calibration) if track_store is not None else None,
+            'ball': ball_track,
+            'ownership': ownership
+        })
+        print(f"Parquet tables for match '{match_id}' saved under {dataset_dir} ({len(written)} files)")
+
     # --- Export Summary ---
     summary = {'video': os.path.basename(video_path), 'n_players': len(players), 'n_events': len(events)}
     with open(os.path.join(output_dir, 'summary.json'), 'w') as f:
         json.dump(summary, f, indent=2)
     print(f"Done. Results saved in {output_dir}")
+    return pending_report
+
+def redetect_events(output_dir, cfg):
+    """
+    Recomputes the events of an analysed match from its saved ownership series
+    (`ownership.csv`) with the event settings of `cfg` (`event_min_frames`,
+    `dribble_min_distance_m`), without the video or the detections, and rewrites
+    `events.csv` and the event counts of `team_stats.csv`.
+
+    Returns:
+        list: The event dictionaries.
+    """
+    ownership = pd.read_csv(os.path.join(output_dir, 'ownership.csv'))
+    events = detect_events(ownership['frame'].to_numpy(), ownership['owner'].to_numpy(), ownership['team'].to_numpy(),
+                           ownership['x'].to_numpy(), ownership['y'].to_numpy(), cfg)
+    events_df = pd.DataFrame(events)
+    events_path = os.path.join(output_dir, 'events.csv')
+    if events_df.empty:
+        if os.path.exists(events_path):
+            os.remove(events_path)
+    else:
+        events_df.to_csv(events_path, index=False)
 
-def run_analysis(video_path, output_dir, model_path, config, generate_llm_report=False):
-    os.makedirs(output_dir, exist_ok=True)
-    cfg = config
-    detector = Detector(model_name=model_path)
-    event_manager = EventManager(cfg)
-
-    cap = cv2.VideoCapture(video_path)
-    fps = cap.get(cv2.CAP_PROP_FPS) or 25.0
-    width = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
-    height = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
-    cap.release()
-
-    output_video_path = os.path.join(output_dir, f"{os.path.splitext(os.path.basename(video_path))[0]}_annotated.avi")
-    # Using MJPG codec for maximum compatibility
-    video_writer = cv2.VideoWriter(output_video_path, cv2.VideoWriter_fourcc(*'MJPG'), fps / cfg.get('frame_skip', 1), (width, height))
-
-    # --- Unified Analysis Loop ---
-    print("Starting unified analysis loop...")
-    results_iter = detector.detect(video_path, show=False)
-
-    players = {}
-    team_assignments = {}
-    teams_identified = False
-    initial_player_positions = {}
-
+    team_stats_path = os.path.join(output_dir, 'team_stats.csv')
+    if os.path.exists(team_stats_path):
+        team_stats_df = pd.read_csv(team_stats_path, index_col='team_id')
+        team_stats_df.index = team_stats_df.index.astype(str)
+        team_stats_df = team_stats_df.drop(columns=[c for c in ('passes', 'losses', 'interceptions', 'dribbles')
+                                                    if c in team_stats_df.columns])
+        if not events_df.empty:
+            team_stats_df = team_stats_df.join(event_counts(events_df)).fillna(0)
+        # Keep the team name last, as written by export_results
+        team_stats_df = team_stats_df[[c for c in team_stats_df.columns if c != 'team_name'] + ['team_name']]
+        team_stats_df.to_csv(team_stats_path, index_label='team_id')
+    print(f"{len(events)} events recomputed from {len(ownership)} frames of ball ownership, saved in {output_dir}")
+    return events
+
+def figure_extent(cfg, frame_size, margin_m=3.0):
+    """
+    Returns:
+        tuple: ((x_min, x_max, y_min, y_max), calibrated) - the area drawn in the figures,
+        in metres: the pitch and a margin when it is calibrated with keypoints,
+        the whole frame at the uniform scale otherwise.
+    """
+    if cfg.get('pitch_keypoints'):
+        return (-margin_m, PITCH_LENGTH + margin_m, -margin_m, PITCH_WIDTH + margin_m), True
+    scale = cfg.get('pixels_to_meters', 0.1)
+    return (0.0, frame_size[0] * scale, 0.0, frame_size[1] * scale), False
+
+def export_figures(output_dir, track_store, calibration, players, events, cfg, frame_size):
+    """
+    Renders heatmaps (per team and per player) and the pass network of each team from the stored trajectories.
+
+    All foot points are projected to the pitch and binned in one pass, so the
+    figures of a whole match take a fraction of a second and never touch the video.
+    Tracker ID switches multiply the track IDs over a match, so per-player heatmaps
+    are only drawn for the `cfg['player_heatmaps']` most observed tracks.
+
+    Args:
+        players (dict): The players of the pass networks and heatmap candidates (e.g. the stable tracks).
+        events (list): The event dictionaries, passes included.
+        frame_size (tuple): (width, height) of the video.
+
+    Returns:
+        list: The paths written.
+    """
+    figures_dir = os.path.join(output_dir, 'figures')
+    os.makedirs(figures_dir, exist_ok=True)
+    extent, calibrated = figure_extent(cfg, frame_size)
+    px_per_m = cfg.get('figure_px_per_m', 8)
+    cell = cfg.get('heatmap_cell_m', 1.0)
+    background = draw_pitch(extent, px_per_m, lines=calibrated)
+
+    xs, ys = calibration.to_pitch(track_store.column('frame'), track_store.column('x'), track_store.column('foot_y'))
+    teams = track_store.column('team').astype(np.int64)
+    team_codes = np.unique(teams[teams != NO_TEAM])
+    team_grids = bin_positions(xs, ys, teams, int(team_codes.max()) + 1 if len(team_codes) else 0, extent, cell)
+
+    # Row -> index of the player in `player_ids`, -1 for tracks without a figure
+    player_ids = np.array(sorted(players), dtype=np.int64)
+    track_col = track_store.column('track_id')
+    group = np.full(len(track_col), -1, dtype=np.int64)
+    if len(player_ids):
+        pos = np.clip(np.searchsorted(player_ids, track_col), 0, len(player_ids) - 1)
+        hit = player_ids[pos] == track_col
+        group[hit] = pos[hit]
+    seen = group >= 0
+    counts = np.bincount(group[seen], minlength=len(player_ids))
+    mean_x = np.bincount(group[seen], weights=xs[seen], minlength=len(player_ids)) / np.maximum(counts, 1)
+    mean_y = np.bincount(group[seen], weights=ys[seen], minlength=len(player_ids)) / np.maximum(counts, 1)
+    mean_positions = {pid: (mean_x[i], mean_y[i]) for i, pid in enumerate(player_ids.tolist()) if counts[i]}
+
+    # Heatmaps of the most observed tracks only (None: all of them)
+    n_heatmaps = cfg.get('player_heatmaps', 22)
+    ranked = np.argsort(-counts, kind='stable')
+    ranked = ranked[counts[ranked] > 0][:n_heatmaps]
+    slot = np.full(len(player_ids) + 1, -1, dtype=np.int64)
+    slot[ranked] = np.arange(len(ranked))
+    player_grids = bin_positions(xs, ys, slot[group], len(ranked), extent, cell)
+
+    written = []
+    def save(name, image):
+        path = os.path.join(figures_dir, name)
+        cv2.imwrite(path, image)
+        written.append(path)
+
+    events_df = pd.DataFrame(events) if events else pd.DataFrame(columns=['type', 'team_id', 'from_player_id', 'to_player_id'])
+    for code in team_codes.tolist():
+        save(f'heatmap_team_{code}.png', render_heatmap(team_grids[code], background))
+        passes = events_df[(events_df['type'] == 'pass') & (events_df['team_id'] == str(code))]
+        save(f'pass_network_team_{code}.png', render_pass_network(
+            passes, mean_positions, background, extent, px_per_m, TEAM_A_COLOR if code == 0 else TEAM_B_COLOR))
+    for rank, i in enumerate(ranked.tolist()):
+        save(f'heatmap_player_{player_ids[i]}.png', render_heatmap(player_grids[rank], background))
+    return written
+
+def detection_stream(detector, frames, cfg):
+    """
+    Selects the detection/tracking path for sampled frames according to `cfg['inference_mode']`.
+
+    - 'sampled': frames are tracked one by one.
+    - 'batched': frames are detected in batches of `cfg['batch_size']` and
+      tracked by a standalone tracker.
+
+    Args:
+        detector (Detector): The detector to run.
+        frames (iterable): (frame_idx, frame) tuples, e.g. from a `SampledFrameSource`.
+        cfg (dict): The application configuration dictionary.
+
+    Returns:
+        An iterator of (frame_idx, result) tuples for the analysed frames.
+    """
     frame_skip = cfg.get('frame_skip', 1)
-    frames_to_sample = frame_skip * cfg.get('team_clustering_sample_frames', 10)
-
-    events, team_stats_history = [], []
-    team_possession_seconds = {}
-    last_owner_pid = None
-    current_owner_pid = None
-
-    last_frame_idx = 0
-    for frame_idx, res in enumerate(results_iter):
-        try:
-            if frame_idx % frame_skip != 0: continue
-            last_frame_idx = frame_idx
-            persons, balls = parse_frame_results(res, detector)
-            frame = res.orig_img
-
-            # Dynamically add any new players found by the tracker
+    mode = cfg.get('inference_mode', 'sampled')
+    classes = detection_classes(detector, cfg)
+    if mode == 'sampled':
+        return detector.detect_sampled(frames, frame_skip=frame_skip, classes=classes)
+    if mode == 'batched':
+        return detector.detect_batched(frames, frame_skip=frame_skip, batch_size=cfg.get('batch_size', 8), classes=classes)
+    raise ValueError(f"Unknown inference_mode '{mode}'")
+
+def detection_classes(detector, cfg):
+    """
+    Returns:
+        list or None: Only the person classes when the ball is searched separately
+        (`cfg['ball_roi']`), all classes otherwise.
+    """
+    return detector.class_ids(('person',)) if cfg.get('ball_roi', False) else None
+
+def full_detection_stream(detector, video_path, frame_skip, classes=None):
+    """
+    Runs `model.track` on every frame of the video and keeps only the analysed results.
+    """
+    for frame_idx, res in enumerate(detector.detect(video_path, show=False, classes=classes)):
+        if frame_idx % frame_skip == 0:
+            yield frame_idx, res
+
+def parse_detections(detector, results, ball_locator=None, profiler=None):
+    """
+    Turns (frame_idx, result) tuples into (frame_idx, persons, balls, frame) tuples.
+
+    Args:
+        ball_locator (BallLocator): When given, the ball is searched by the locator
+            instead of being taken from the (players-only) results.
+        profiler (Profiler): Receives the parsing and ball search time of each frame.
+    """
+    profiler = profiler if profiler is not None else Profiler(enabled=False)
+    for frame_idx, res in results:
+        timer = profiler.frame_timer(frame_idx)
+        persons, balls = parse_frame_results(res, detector)
+        timer.lap('inference.parse')
+        if ball_locator is not None:
+            balls = ball_locator.locate(frame_idx, res.orig_img)
+            timer.lap('inference.ball_roi')
+        yield frame_idx, persons, balls, res.orig_img
+
+class MatchAnalyzer:
+    def __init__(self, cfg, fps, profiler=None):
+        """
+        Holds the per-match analysis state and turns parsed detections into annotated frames.
+
+        Args:
+            cfg (dict): The application configuration dictionary.
+            fps (float): Frame rate of the source video.
+            profiler (Profiler): Receives the time of each analysis step and the frame errors.
+        """
+        self.cfg = cfg
+        self.fps = fps
+        self.profiler = profiler if profiler is not None else Profiler(enabled=False)
+        self.event_manager = EventManager(cfg)
+
+        self.frame_skip = cfg.get('frame_skip', 1)
+        self.frames_to_sample = self.frame_skip * cfg.get('team_clustering_sample_frames', 10)
+
+        self.players = {}
+        self.track_store = TrackStore()
+        self.team_assignments = {}
+        self.teams_identified = False
+        self.team_classifier = TeamClassifier.from_config(cfg)
+        self.known_teams = None
+        self.initial_player_positions = {}
+
+        self.events, self.team_stats_history = [], []
+        self.ownership = []
+        self.team_possession_seconds = {}
+        self.last_frame_idx = 0
+        self.calibration = PitchCalibration.from_config(cfg, fps)
+        # The ball only has an owner when a player's feet are close enough to it
+        self.max_possession_distance_m = cfg.get('max_possession_distance_m', 3.0)
+        self.player_index = None
+
+        # Frames are only annotated when the annotated video is written
+        self.annotate = bool(cfg.get('video_codec', 'mp4v'))
+        trail_seconds = cfg.get('trail_seconds')
+        self.max_trail_frames = max(1, round(trail_seconds * fps / self.frame_skip)) if trail_seconds else None
+        self.trails = None
+
+    def use_known_teams(self, teams):
+        """
+        Assigns each track its team from a previous classification of the same
+        detections (see `DetectionCache.load_teams`) instead of classifying it again,
+        which needs no image.
+
+        Args:
+            teams (dict): Track ID to team ('0', '1'... or None).
+        """
+        self.known_teams = teams
+        self.team_possession_seconds = {str(team_id): 0 for team_id in range(self.team_classifier.n_teams)}
+        self.team_classifier = None
+        self.teams_identified = True
+
+    @property
+    def needs_frames(self):
+        """
+        Whether the analysis uses the images, not only the detections: to annotate
+        them, to classify teams by jersey colour or to follow the camera motion.
+        """
+        return self.annotate or self.team_classifier is not None or self.calibration.refresh_interval is not None
+
+    def process(self, detections):
+        """
+        Analyses a stream of parsed detections.
+
+        Args:
+            detections (iterable): (frame_idx, persons, balls, frame) tuples; `frame`
+                may be None (e.g. when replaying cached detections).
+
+        Yields:
+            tuple: (frame_idx, annotated_frame) for each successfully analysed frame;
+            the annotated frame is None without an input frame.
+        """
+        for frame_idx, persons, balls, frame in detections:
+            try:
+                annotated_frame = self.process_frame(frame_idx, persons, balls, frame)
+            except Exception as e:
+                # A bad frame must not stop the match; it is counted and reported at the end
+                self.profiler.error('analysis', frame_idx, e)
+                continue
+            yield frame_idx, annotated_frame
+
+    def finish(self):
+        """
+        Flushes the events still pending at the end of the match.
+        """
+        self.events.extend(self.event_manager.finish())
+
+    def ownership_series(self):
+        """
+        Returns:
+            pd.DataFrame: The ball owner of every analysed frame (frame, owner, team, and x, y
+            on the pitch in metres), saved as ownership.csv and the input of `events.detect_events`.
+        """
+        return pd.DataFrame(self.ownership, columns=['frame', 'owner', 'team', 'x', 'y'])
+
+    def update_teams(self, changed):
+        """
+        Applies the team changes reported by the team classifier.
+
+        Args:
+            changed (dict): Track ID to new team ('0', '1' or None).
+        """
+        if not changed:
+            return
+        players = self.players
+        for pid, team in changed.items():
+            if pid in players:
+                players[pid]['team'] = team
+            self.team_assignments[pid] = team
+        # Observations already stored take the majority team; tracks seen for the first time have none yet
+        self.track_store.set_teams({pid: team for pid, team in changed.items()
+                                    if pid in players and players[pid]['last_frame'] is not None})
+        if not self.teams_identified and self.team_classifier.fitted:
+            self.team_possession_seconds = {str(team_id): 0 for team_id in range(self.team_classifier.n_teams)}
+            self.teams_identified = True
+            print("Teams identified from jersey colours. Continuing full analysis...")
+
+    def process_frame(self, frame_idx, persons, balls, frame=None):
+        cfg = self.cfg
+        players = self.players
+        # Video time since the previous analysed frame: more than frame_skip frames when frames
+        # were dropped (live sources) or failed
+        step_s = (frame_idx - self.last_frame_idx if frame_idx > self.last_frame_idx else self.frame_skip) / self.fps
+        self.last_frame_idx = frame_idx
+        timer = self.profiler.frame_timer(frame_idx)
+
+        # Dynamically add any new players found by the tracker
+        new_pids = []
+        for p in persons:
+            pid = p.get('id')
+            if pid and pid not in players:
+                players[pid] = {'touches':0,'last_pos':None,'last_frame':None,'team':None}
+                new_pids.append(pid)
+
+        if frame is not None:
+            self.calibration.update(frame_idx, frame, [p['box'] for p in persons])
+            timer.lap('analysis.calibration')
+
+        # Stage 1: Team identification, from jersey colours when the frame is available
+        if self.known_teams is not None:
+            self.update_teams({pid: self.known_teams.get(pid) for pid in new_pids})
+        elif self.team_classifier is not None and frame is not None:
+            self.update_teams(self.team_classifier.update(frame, persons))
+        elif not self.teams_identified:
             for p in persons:
                 pid = p.get('id')
-                if pid and pid not in players:
-                    players[pid] = {'touches':0,'positions':[],'dist_pixels':0.0,'last_pos':None,'last_frame':None,'max_speed_kmh':0.0,'team':None}
-
-            # Stage 1: Collect positions for team identification
-            if not teams_identified:
-                for p in persons:
-                    pid = p.get('id')
-                    if pid: initial_player_positions.setdefault(pid, []).append(box_center(p['box']))
-
-                if frame_idx > frames_to_sample:
-                    print("Identifying teams based on collected positions...")
-                    players = assign_teams_by_clustering(players, initial_player_positions)
-                    team_assignments = {pid: pdata.get('team') for pid, pdata in players.items()}
-
-                    team_ids = set(team_assignments.values())
-                    team_possession_seconds = {team_id: 0 for team_id in team_ids if team_id is not None}
-                    teams_identified = True
-                    print("Teams identified. Continuing full analysis...")
-
-            # Stage 2: Main analysis logic (runs on every frame)
-            for p in persons:
-                pid = p.get('id')
-                if pid and pid in players:
-                    p['center'] = box_center(p['box'])
-                    stats.update_player_movement(players[pid], p, frame_idx, fps, cfg)
-
-            current_team_stats = {}
-            if teams_identified:
-                current_team_stats = stats.calculate_team_stats(players, team_assignments, cfg.get('pixels_to_meters'))
-                team_stats_history.append(current_team_stats)
-
-            ball = balls[0] if balls else None
-            owner = find_ball_owner(ball, persons)
-            owner_pid = owner['id'] if owner else None
-
-            if teams_identified and owner_pid and owner_pid in players:
-                players[owner_pid]['touches'] += 1
-                owner_team = players[owner_pid].get('team')
-                if owner_team in team_possession_seconds:
-                    team_possession_seconds[owner_team] += (frame_skip / fps)
-
-            new_events = event_manager.update(frame_idx, players, ball, owner_pid)
-            events.extend(new_events)
-
-            # Annotation
-            ball_pos = box_center(balls[0]['box']) if balls else None
-            y_offset = 30
-            if teams_identified:
-                for team_id, team_data in current_team_stats.items():
-                    if team_id is None: continue
-                    compactness = team_data.get('compactness', 0)
-                    team_name = cfg['team_names'].get(str(team_id), f"Team {team_id}")
-                    text = f"{team_name} Compactness: {compactness:.2f}m"
-                    cv2.putText(frame, text, (10, y_offset), cv2.FONT_HERSHEY_SIMPLEX, 0.8, (255,255,255), 2)
-                    y_offset += 30
-
-            annotated_frame = draw_annotations(frame.copy(), players, ball_pos, team_assignments)
-            video_writer.write(annotated_frame)
-        except Exception as e:
-            # print(f"Error in frame {frame_idx}: {e}")
-            continue
-
-    video_writer.release()
-    print(f"Annotated video saved to {output_video_path}")
-    total_duration = last_frame_idx / fps
+                if pid: self.initial_player_positions.setdefault(pid, []).append(box_center(p['box']))
+
+            if frame_idx > self.frames_to_sample:
+                print("Identifying teams based on collected positions...")
+                players = self.players = assign_teams_by_clustering(players, self.initial_player_positions)
+                self.team_assignments = {pid: pdata.get('team') for pid, pdata in players.items()}
+                self.track_store.set_teams(self.team_assignments)
+
+                team_ids = set(self.team_assignments.values())
+                self.team_possession_seconds = {team_id: 0 for team_id in team_ids if team_id is not None}
+                self.teams_identified = True
+                print("Teams identified. Continuing full analysis...")
+        timer.lap('analysis.teams')
+
+        # Stage 2: Main analysis logic (runs on every frame)
+        # Positions go to the TrackStore; distances and speeds are computed from it after the match
+        observed = []
+        for p in persons:
+            pid = p.get('id')
+            if pid and pid in players:
+                center = box_center(p['box'])
+                player = players[pid]
+                player['last_pos'], player['last_frame'] = center, frame_idx
+                observed.append((pid, *center, p['conf'], team_code(player.get('team')), p['box'][3]))
+        if observed:
+            ids, xs, ys, confs, teams, foot_ys = zip(*observed)
+            self.track_store.append(frame_idx, ids, xs, ys, confs, teams, foot_ys)
+        timer.lap('analysis.movement')
+
+        current_team_stats = {}
+        if self.teams_identified:
+            store = self.track_store
+            rows = store.active_at(frame_idx, cfg.get('team_stats_staleness_frames', 0))
+            pitch_x, pitch_y = self.calibration.to_pitch(store.column('frame')[rows], store.column('x')[rows], store.column('foot_y')[rows])
+            current_team_stats = stats.calculate_team_stats(pitch_x, pitch_y, store.column('team')[rows], pixels_to_meters=1.0)
+            self.team_stats_history.append(current_team_stats)
+        timer.lap('analysis.stats')
+
+        ball = balls[0] if balls else None
+        self.player_index = PlayerIndex.from_persons(persons)
+        max_distance = (self.max_possession_distance_m / self.calibration.meters_per_pixel(frame_idx, box_center(ball['box']))
+                        if ball else np.inf)
+        owner = find_ball_owner(ball, persons, max_distance, self.player_index)
+        owner_pid = owner['id'] if owner else None
+        timer.lap('analysis.owner')
+
+        if self.teams_identified and owner_pid and owner_pid in players:
+            players[owner_pid]['touches'] += 1
+            owner_team = players[owner_pid].get('team')
+            if owner_team in self.team_possession_seconds:
+                self.team_possession_seconds[owner_team] += step_s
+
+        owner_team = players[owner_pid].get('team') if owner_pid in players else None
+        owner_pos = None
+        if owner_pid in players:
+            pitch_x, pitch_y = self.calibration.to_pitch([frame_idx], [box_center(owner['box'])[0]], [owner['box'][3]])
+            owner_pos = (float(pitch_x[0]), float(pitch_y[0]))
+        self.ownership.append((frame_idx, owner_pid if owner_pid is not None else NO_OWNER, team_code(owner_team),
+                               *(owner_pos if owner_pos is not None else (np.nan, np.nan))))
+        self.events.extend(self.event_manager.update(frame_idx, owner_pid, owner_team, owner_pos))
+        timer.lap('analysis.events')
+
+        # Annotation
+        if frame is None or not self.annotate:
+            return None
+        ball_pos = box_center(balls[0]['box']) if balls else None
+        y_offset = 30
+        if self.teams_identified:
+            for team_id, team_data in current_team_stats.items():
+                if team_id is None: continue
+                compactness = team_data.get('compactness', 0)
+                team_name = cfg['team_names'].get(str(team_id), f"Team {team_id}")
+                text = f"{team_name} Compactness: {compactness:.2f}m"
+                cv2.putText(frame, text, (10, y_offset), cv2.FONT_HERSHEY_SIMPLEX, 0.8, (255,255,255), 2)
+                y_offset += 30
+
+        if self.trails is None:
+            self.trails = TrailRenderer(frame.shape, self.max_trail_frames, cfg.get('trail_fade', True))
+        # Each decoded frame is a fresh array, annotated in place
+        annotated = draw_annotations(frame, players, ball_pos, self.team_assignments, self.trails)
+        timer.lap('analysis.annotate')
+        return annotated
+
+def write_frames(video_writer, frames):
+    """
+    Encodes the (frame_idx, frame) items of the analysis with the given writer,
+    yielding (frame_idx, number of frames written so far) for each frame written.
+    """
+    n = 0
+    for frame_idx, frame in frames:
+        if frame is None: continue
+        video_writer.write(frame)
+        n += 1
+        yield frame_idx, n
+
+def print_pipeline_report(report):
+    print("Pipeline stages (busy time / waiting for input / blocked on output, output queue depth):")
+    for name, s in report.items():
+        print(f"  {name:<10} items={s['items']:<6} busy={s['busy_s']:.2f}s wait_in={s['wait_in_s']:.2f}s "
+              f"wait_out={s['wait_out_s']:.2f}s queue max={s['out_queue_max']} mean={s['out_queue_mean']}")
+
+def write_match_outputs(output_dir, analyzer, video_path, fps, frame_size, cfg, generate_llm_report=False, ball_track=None, profiler=None):
+    """
+    Writes the outputs of an analysed match: the trajectory archive, the stats
+    tables, the figures and, when `generate_llm_report`, the tactical report.
+
+    Args:
+        analyzer (MatchAnalyzer): The finished analysis.
+        video_path (str): The analysed video (or stream), used to name the match.
+        frame_size (tuple): (width, height) of the video.
+        ball_track (pd.DataFrame): The fused ball track, if any.
+        profiler (Profiler): Receives the time of each output step.
+
+    Returns:
+        dict: The stable player tracks.
+    """
+    timer = (profiler if profiler is not None else Profiler(enabled=False)).frame_timer(None)
+    width, height = frame_size
+    total_duration = analyzer.last_frame_idx / fps
 
     # Filter players with too few positions to be considered stable tracks
     min_pos_filter = cfg.get('min_player_positions', 2) # Using the value from main.py config
-    print(f"DEBUG: Total players tracked before filtering: {len(players)}")
-    players = filter_players(players, min_positions=min_pos_filter)
+    print(f"DEBUG: Total players tracked before filtering: {len(analyzer.players)}")
+    players = filter_players(analyzer.players, analyzer.track_store, min_positions=min_pos_filter)
     print(f"DEBUG: Total players after filtering: {len(players)}")
 
     print(f"Finished processing. Found {len(players)} stable player tracks.")
-    export_results(output_dir, players, events, video_path, cfg, team_possession_seconds, total_duration, team_stats_history, generate_llm_report)
\ No newline at end of file
+    tracks_path = os.path.join(output_dir, 'tracks.ftrk')
+    write_track_archive(tracks_path, analyzer.track_store, {
+        'video': os.path.basename(video_path), 'fps': fps, 'frame_skip': analyzer.frame_skip, 'width': width, 'height': height,
+        'camera_segments': analyzer.calibration.segments()
+    })
+    print(f"Trajectories saved to {tracks_path}")
+    timer.lap('post.archive')
+
+    # No person was ever tracked (e.g. an empty or non-football video): nothing to summarise
+    kinematics = (player_kinematics(analyzer.track_store, fps, cfg, calibration=analyzer.calibration)
+                  if len(analyzer.track_store) else None)
+    timer.lap('post.kinematics')
+    pending_report = export_results(output_dir, players, analyzer.events, video_path, cfg, analyzer.team_possession_seconds, total_duration, analyzer.team_stats_history, generate_llm_report, kinematics, analyzer.track_store, ball_track, analyzer.calibration,
+                                    analyzer.ownership_series())
+    timer.lap('post.export')
+    if cfg.get('figures', True):
+        t0 = time.perf_counter()
+        figures = export_figures(output_dir, analyzer.track_store, analyzer.calibration, players, analyzer.events, cfg, (width, height))
+        print(f"{len(figures)} heatmaps and pass networks saved to {os.path.join(output_dir, 'figures')} in {time.perf_counter() - t0:.2f}s")
+        timer.lap('post.figures')
+    if pending_report is not None:
+        report_path = tactical_analysis.save_report(output_dir, pending_report.result())
+        print(f"Tactical report saved to {report_path}")
+        timer.lap('post.report_wait')
+    return players
+
+def run_analysis(video_path, output_dir, model_path, config, generate_llm_report=False, detector=None):
+    """
+    Analyses one video and writes all outputs to `output_dir`.
+
+    Args:
+        detector (Detector): An already loaded detector to reuse (e.g. across the
+            videos of a batch); one is created from `model_path` when needed otherwise.
+
+    Returns:
+        dict: A short run summary (frames analysed, players, events, frame errors).
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    cfg = config
+    run_start = time.perf_counter()
+    # Per-stage timings are only recorded with cfg['profile']; frame errors are always counted
+    profiler = Profiler(enabled=cfg.get('profile', False))
+
+    frame_skip = cfg.get('frame_skip', 1)
+    frame_source = SampledFrameSource(video_path, frame_skip)
+    fps = frame_source.fps
+    width, height = frame_source.width, frame_source.height
+
+    # --- Detection cache ---
+    # Detections only depend on the video, the model, the tracker and the sampling,
+    # so analysis-only changes replay them instead of running inference again
+    cache, cached, recorder = None, None, None
+    if cfg.get('detection_cache_dir'):
+        cache = DetectionCache(cfg['detection_cache_dir'])
+        key = cache_key(video_path, model_path, TRACKER_CONFIG, cfg)
+        cached = cache.load(key)
+        if cached is None:
+            recorder = cache.recorder(key)
+
+    # --- Chunked detection ---
+    # Long videos can be tracked as parallel chunks; the stitched detections are then
+    # analysed like a cache replay
+    if cached is None and cfg.get('chunks', 1) > 1 and cfg.get('inference_mode', 'sampled') != 'full':
+        cached = run_chunked_detection(video_path, model_path, cfg)
+        if recorder is not None:
+            cached.save(recorder.path)
+            print(f"Detections cached to {recorder.path}")
+            recorder = None
+
+    # --- Unified Analysis Pipeline ---
+    # decode -> inference -> analysis -> encode, each stage on its own thread when pipelined
+    print("Starting unified analysis loop...")
+    analyzer = MatchAnalyzer(cfg, fps, profiler)
+    queue_size = cfg.get('pipeline_queue_size', 8)
+    threaded = cfg.get('pipelined', True)
+    if cached is not None and cache is not None and analyzer.team_classifier is not None:
+        # Teams classified from the jersey colours on a previous run of these detections
+        known_teams = cache.load_teams(key, cfg)
+        if known_teams is not None:
+            print(f"Reusing the teams of {len(known_teams)} tracks classified on a previous run.")
+            analyzer.use_known_teams(known_teams)
+    if cached is not None:
+        # Replay skips inference; the video is still decoded when the analysis needs the images
+        if analyzer.needs_frames:
+            print(f"Replaying {len(cached)} frames of precomputed detections with their decoded images.")
+            pipeline = Pipeline(cached.replay(frame_source), 'replay', queue_size, threaded, profiler)
+        else:
+            print(f"Replaying {len(cached)} frames of precomputed detections (no video decoding).")
+            pipeline = Pipeline(cached.replay(), 'replay', queue_size, threaded, profiler)
+    else:
+        if detector is None:
+            # Imported here: replays and the analysis itself need neither ultralytics nor torch
+            from .detector import Detector
+            detector = Detector(model_name=model_path, imgsz=cfg.get('imgsz'))
+        if cfg.get('inference_mode', 'sampled') == 'full':
+            # ultralytics decodes the video itself in this mode
+            detections = parse_detections(detector, full_detection_stream(detector, video_path, frame_skip, detection_classes(detector, cfg)),
+                                          BallLocator.from_config(detector, cfg), profiler)
+            pipeline = Pipeline(recorder.wrap(detections) if recorder else detections, 'inference', queue_size, threaded, profiler)
+        else:
+            def inference_stage(frames):
+                detections = parse_detections(detector, detection_stream(detector, frames, cfg), BallLocator.from_config(detector, cfg), profiler)
+                return recorder.wrap(detections) if recorder else detections
+            pipeline = Pipeline(frame_source, 'decode', queue_size, threaded, profiler)
+            pipeline.add_stage('inference', inference_stage)
+
+    # The encode stage already has its own thread when pipelined
+    video_writer = AnnotatedVideoWriter.from_config(
+        cfg, os.path.join(output_dir, f"{os.path.splitext(os.path.basename(video_path))[0]}_annotated"),
+        fps / frame_skip, (width, height), background=not threaded)
+    ball_tracker = None
+    if cfg.get('ball_tracking', True):
+        # Replayed detections are all known: their ball track is computed in one pass upfront
+        ball_tracker = BallTracker.from_detections(cached, fps, cfg) if cached is not None else BallTracker(fps, cfg)
+    if ball_tracker is not None:
+        pipeline.add_stage('ball', ball_tracker.process)
+    pipeline.add_stage('analysis', analyzer.process)
+    if video_writer is not None:
+        pipeline.add_stage('encode', lambda frames: write_frames(video_writer, frames))
+    try:
+        pipeline.run()
+    finally:
+        if video_writer is not None:
+            video_writer.close()
+    if video_writer is not None:
+        video_stats = video_writer.stats()
+        print(f"Annotated video saved to {video_writer.path} ({video_stats['codec']}, {video_stats['size'][0]}x{video_stats['size'][1]}, "
+              f"{video_stats['bytes'] / 1e6:.1f} MB, {video_stats['encode_s']:.1f}s encoding)")
+    if recorder is not None:
+        recorder.save()
+        print(f"Detections cached to {recorder.path}")
+    if cache is not None and analyzer.team_classifier is not None and analyzer.team_classifier.fitted:
+        cache.save_teams(key, analyzer.team_classifier.teams, cfg)
+
+    analyzer.finish()
+
+    pipeline_report = pipeline.report()
+    print_pipeline_report(pipeline_report)
+    with open(os.path.join(output_dir, 'pipeline_stats.json'), 'w') as f:
+        json.dump(pipeline_report, f, indent=2)
+
+    players = write_match_outputs(output_dir, analyzer, video_path, fps, (width, height), cfg, generate_llm_report,
+                                  ball_tracker.track() if ball_tracker is not None else None, profiler)
+    source_stats = next(iter(pipeline_report.values()))
+
+    if profiler.n_errors:
+        print(f"WARNING: {profiler.n_errors} frames failed during analysis and were skipped: "
+              + ", ".join(f"{key} x{entry['count']}" for key, entry in profiler.errors.items()))
+    if profiler.enabled:
+        profile = profiler.summary(time.perf_counter() - run_start, source_stats['items'])
+        print_profile_summary(profile)
+        trace_path, summary_path = profiler.write(output_dir, profile)
+        print(f"Profile saved to {summary_path} (per-frame trace: {trace_path})")
+    return {'frames': source_stats['items'], 'n_players': len(players), 'n_events': len(analyzer.events),
+            'frame_errors': profiler.n_errors}
@@ -0,0 +1,94 @@
+import os
+
+import pandas as pd
+
+TABLES = ('players', 'teams', 'events', 'trajectories', 'ball')
+
+# Low-cardinality string columns stored as Parquet dictionaries
+CATEGORICAL_COLUMNS = ('team_id', 'team_name', 'type')
+
+def _typed(df):
+    df = df.copy()
+    for col in df.columns:
+        if col in CATEGORICAL_COLUMNS:
+            df[col] = df[col].where(df[col].isna(), df[col].astype(str)).astype('category')
+        elif pd.api.types.is_integer_dtype(df[col]) and df[col].dtype.itemsize > 4 and df[col].abs().max() < 2**31:
+            df[col] = df[col].astype('int32')
+    return df
+
+def trajectories_frame(track_store, calibration=None):
+    """
+    Builds the trajectories table (one row per observation) from a TrackStore.
+
+    With a PitchCalibration, the foot points are also projected to pitch metres
+    (pitch_x, pitch_y columns).
+    """
+    df = pd.DataFrame({name: track_store.column(name) for name, _ in track_store.COLUMNS})
+    if calibration is not None:
+        pitch_x, pitch_y = calibration.to_pitch(df['frame'].to_numpy(), df['x'].to_numpy(), df['foot_y'].to_numpy())
+        df['pitch_x'], df['pitch_y'] = pitch_x.astype('float32'), pitch_y.astype('float32')
+    return df
+
+def write_match_parquet(dataset_dir, match_id, tables):
+    """
+    Writes the tables of one match into a hive-partitioned Parquet dataset.
+
+    Each table is written to `<dataset_dir>/<table>/match=<match_id>/part-0.parquet`,
+    replacing any previous output of the same match, so a whole season can be
+    read back as one dataset per table.
+
+    Args:
+        dataset_dir (str): Root of the Parquet dataset shared by all matches.
+        match_id (str): Identifier of the match (used as partition value).
+        tables (dict): Table name to DataFrame; empty DataFrames are skipped.
+
+    Returns:
+        list: The paths written.
+    """
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    written = []
+    for name, df in tables.items():
+        if df is None or df.empty:
+            continue
+        partition_dir = os.path.join(dataset_dir, name, f"match={match_id}")
+        os.makedirs(partition_dir, exist_ok=True)
+        path = os.path.join(partition_dir, 'part-0.parquet')
+        table = pa.Table.from_pandas(_typed(df), preserve_index=False)
+        pq.write_table(table, path, compression='zstd')
+        written.append(path)
+    return written
+
+def open_dataset(dataset_dir, table):
+    """
+    Opens one table of the Parquet dataset lazily (nothing is read until queried).
+
+    Returns:
+        pyarrow.dataset.Dataset: The dataset, with a `match` column from the partitions.
+    """
+    import pyarrow as pa
+    import pyarrow.dataset as ds
+
+    # Match IDs are strings, even when they look like numbers (e.g. '2024')
+    partitioning = ds.partitioning(pa.schema([('match', pa.string())]), flavor='hive')
+    return ds.dataset(os.path.join(dataset_dir, table), format='parquet', partitioning=partitioning)
+
+def load_table(dataset_dir, table, columns=None, matches=None):
+    """
+    Concatenates a table across matches, reading only the requested columns and partitions.
+
+    Args:
+        dataset_dir (str): Root of the Parquet dataset.
+        table (str): One of TABLES.
+        columns (list): Columns to read (all by default).
+        matches (list): Match IDs to read (all by default).
+
+    Returns:
+        pd.DataFrame: The concatenated rows, with a `match` column.
+    """
+    import pyarrow.dataset as ds
+
+    dataset = open_dataset(dataset_dir, table)
+    flt = ds.field('match').isin([str(m) for m in matches]) if matches is not None else None
+    return dataset.to_table(columns=columns, filter=flt).to_pandas()
@@ -0,0 +1,194 @@
+import queue
+import threading
+import time
+
+_END = object()
+
+class StageStats:
+    def __init__(self, name):
+        """
+        Timing and queue counters for one pipeline stage.
+
+        Args:
+            name (str): The stage name used in reports.
+        """
+        self.name = name
+        self.items = 0
+        self.busy_s = 0.0
+        self.wait_in_s = 0.0
+        self.wait_out_s = 0.0
+        self.queue_max = 0
+        self.queue_sum = 0
+        self.queue_samples = 0
+
+    def sample_queue(self, depth):
+        self.queue_max = max(self.queue_max, depth)
+        self.queue_sum += depth
+        self.queue_samples += 1
+
+    def as_dict(self):
+        return {
+            'items': self.items,
+            'busy_s': round(self.busy_s, 3),
+            'wait_in_s': round(self.wait_in_s, 3),
+            'wait_out_s': round(self.wait_out_s, 3),
+            'out_queue_max': self.queue_max,
+            'out_queue_mean': round(self.queue_sum / self.queue_samples, 2) if self.queue_samples else 0.0
+        }
+
+def _frame_of(item):
+    return item[0] if isinstance(item, tuple) and item else None
+
+class _TimedInput:
+    """Iterator wrapper accumulating the time spent waiting for upstream items."""
+    def __init__(self, upstream, stats):
+        self.upstream = iter(upstream)
+        self.stats = stats
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        t0 = time.perf_counter()
+        try:
+            return next(self.upstream)
+        finally:
+            self.stats.wait_in_s += time.perf_counter() - t0
+
+class Pipeline:
+    def __init__(self, source, source_name='decode', queue_size=8, threaded=True, profiler=None):
+        """
+        A linear chain of generator stages, optionally run on one thread per stage.
+
+        Each stage is a function taking an iterable of items and returning an
+        iterable of items. When `threaded` is True, stages are connected by bounded
+        queues so a slow stage applies backpressure to the ones before it; OpenCV
+        decode/encode and torch inference release the GIL, so they overlap.
+        When False, the stages are simply chained in the calling thread.
+
+        Args:
+            source (iterable): The items feeding the first stage (e.g. decoded frames).
+            source_name (str): The name under which the source is reported.
+            queue_size (int): Maximum number of items buffered between two stages.
+            threaded (bool): Whether to run each stage on its own thread.
+            profiler (Profiler): When enabled, receives the busy time of every item of
+                every stage (keyed by the frame index of (frame_idx, ...) items).
+        """
+        self.queue_size = max(1, int(queue_size))
+        self.threaded = threaded
+        self._record = profiler.record if profiler is not None and profiler.enabled else None
+        self.stages = [(StageStats(source_name), lambda _: source)]
+        self._stop = threading.Event()
+        self._errors = []
+
+    def add_stage(self, name, fn):
+        """
+        Appends a stage to the pipeline.
+
+        Args:
+            name (str): The stage name used in reports.
+            fn (callable): Takes the iterable of upstream items and returns an iterable.
+        """
+        self.stages.append((StageStats(name), fn))
+        return self
+
+    def run(self):
+        """
+        Runs the pipeline until the source is exhausted, discarding the output of the last stage.
+
+        Raises:
+            Exception: The first error raised by any stage, after all threads have stopped.
+        """
+        if self.threaded:
+            self._run_threaded()
+        else:
+            upstream = iter(())
+            for stats, fn in self.stages:
+                upstream = self._timed_stage(stats, fn, upstream)
+            for _ in upstream:
+                pass
+
+    def report(self):
+        """
+        Returns:
+            dict: Per-stage counters keyed by stage name.
+        """
+        return {stats.name: stats.as_dict() for stats, _ in self.stages}
+
+    def _timed_stage(self, stats, fn, upstream):
+        inp = _TimedInput(upstream, stats)
+        gen = iter(fn(inp))
+        while True:
+            t0 = time.perf_counter()
+            wait0 = stats.wait_in_s
+            try:
+                item = next(gen)
+            except StopIteration:
+                stats.busy_s += time.perf_counter() - t0 - (stats.wait_in_s - wait0)
+                return
+            busy = time.perf_counter() - t0 - (stats.wait_in_s - wait0)
+            stats.busy_s += busy
+            stats.items += 1
+            if self._record is not None:
+                self._record(stats.name, busy, _frame_of(item))
+            yield item
+
+    def _run_threaded(self):
+        queues = [queue.Queue(maxsize=self.queue_size) for _ in self.stages[:-1]]
+        threads = []
+        for i, (stats, fn) in enumerate(self.stages):
+            in_q = queues[i - 1] if i > 0 else None
+            out_q = queues[i] if i < len(queues) else None
+            t = threading.Thread(target=self._worker, args=(stats, fn, in_q, out_q), name=f"pipeline-{stats.name}", daemon=True)
+            threads.append(t)
+            t.start()
+        for t in threads:
+            t.join()
+        if self._errors:
+            raise self._errors[0]
+
+    def _worker(self, stats, fn, in_q, out_q):
+        try:
+            upstream = self._drain(in_q) if in_q is not None else iter(())
+            for item in self._timed_stage(stats, fn, upstream):
+                if out_q is None:
+                    continue
+                t0 = time.perf_counter()
+                self._put(out_q, item)
+                stats.wait_out_s += time.perf_counter() - t0
+                stats.sample_queue(out_q.qsize())
+                if self._stop.is_set():
+                    break
+        except Exception as e:
+            self._errors.append(e)
+            self._stop.set()
+        finally:
+            if out_q is not None:
+                self._put(out_q, _END, force=True)
+
+    def _drain(self, in_q):
+        while True:
+            try:
+                item = in_q.get(timeout=0.1)
+            except queue.Empty:
+                if self._stop.is_set():
+                    return
+                continue
+            if item is _END or self._stop.is_set():
+                return
+            yield item
+
+    def _put(self, out_q, item, force=False):
+        while True:
+            try:
+                out_q.put(item, timeout=0.1)
+                return
+            except queue.Full:
+                if self._stop.is_set():
+                    if not force:
+                        return
+                    # Downstream has stopped consuming; make room for the end marker
+                    try:
+                        out_q.get_nowait()
+                    except queue.Empty:
+                        pass
@@ -0,0 +1,238 @@
+import cv2
+import numpy as np
+
+PITCH_LENGTH, PITCH_WIDTH = 105.0, 68.0
+
+def _landmarks():
+    # Pitch coordinates in metres: x along the length from the left goal line, y across from the top touch line
+    half = {
+        'corner_top': (0.0, 0.0),
+        'corner_bottom': (0.0, PITCH_WIDTH),
+        'box_goal_line_top': (0.0, 13.84),
+        'box_goal_line_bottom': (0.0, 54.16),
+        'box_top': (16.5, 13.84),
+        'box_bottom': (16.5, 54.16),
+        'six_goal_line_top': (0.0, 24.84),
+        'six_goal_line_bottom': (0.0, 43.16),
+        'six_top': (5.5, 24.84),
+        'six_bottom': (5.5, 43.16),
+        'penalty_spot': (11.0, 34.0),
+    }
+    points = {}
+    for name, (x, y) in half.items():
+        points[f'left_{name}'] = (x, y)
+        points[f'right_{name}'] = (PITCH_LENGTH - x, y)
+    points.update({
+        'halfway_top': (PITCH_LENGTH / 2, 0.0),
+        'halfway_bottom': (PITCH_LENGTH / 2, PITCH_WIDTH),
+        'centre': (PITCH_LENGTH / 2, PITCH_WIDTH / 2),
+        'centre_circle_top': (PITCH_LENGTH / 2, PITCH_WIDTH / 2 - 9.15),
+        'centre_circle_bottom': (PITCH_LENGTH / 2, PITCH_WIDTH / 2 + 9.15),
+    })
+    return points
+
+# Named landmarks of a standard 105 x 68 m pitch, usable as calibration keypoints
+PITCH_KEYPOINTS = _landmarks()
+
+def project(homography, xs, ys):
+    """
+    Applies a homography to many points at once.
+
+    Args:
+        homography (np.array): The 3x3 matrix.
+        xs, ys (np.array): Point coordinates, shape (n,).
+
+    Returns:
+        tuple: (xs, ys) of the projected points.
+    """
+    h = np.asarray(homography, dtype=np.float64)
+    xs, ys = np.asarray(xs, dtype=np.float64), np.asarray(ys, dtype=np.float64)
+    w = h[2, 0] * xs + h[2, 1] * ys + h[2, 2]
+    return (h[0, 0] * xs + h[0, 1] * ys + h[0, 2]) / w, (h[1, 0] * xs + h[1, 1] * ys + h[1, 2]) / w
+
+def homography_from_keypoints(keypoints):
+    """
+    Estimates the image-to-pitch homography from manually located landmarks.
+
+    Args:
+        keypoints (dict): Landmark name (see PITCH_KEYPOINTS) to its [u, v] pixel position.
+
+    Returns:
+        np.array: The 3x3 homography mapping pixels to pitch metres.
+    """
+    unknown = set(keypoints) - set(PITCH_KEYPOINTS)
+    if unknown:
+        raise ValueError(f"Unknown pitch keypoints: {', '.join(sorted(unknown))}")
+    if len(keypoints) < 4:
+        raise ValueError("At least 4 pitch keypoints are needed to estimate a homography")
+    image = np.array(list(keypoints.values()), dtype=np.float64)
+    pitch = np.array([PITCH_KEYPOINTS[name] for name in keypoints], dtype=np.float64)
+    homography, _ = cv2.findHomography(image, pitch, cv2.RANSAC if len(keypoints) > 4 else 0, 3.0)
+    if homography is None:
+        raise ValueError("The pitch keypoints are degenerate (collinear or duplicated)")
+    return homography
+
+def pitch_mask(frame, boxes=None):
+    """
+    Returns:
+        np.array: A uint8 mask of the grass area of the frame (lines included, players
+        removed), where camera motion is measured.
+    """
+    hsv = cv2.cvtColor(frame, cv2.COLOR_BGR2HSV)
+    mask = cv2.inRange(hsv, (35, 40, 40), (85, 255, 255))
+    # Closing fills the lines and small holes inside the grass
+    mask = cv2.morphologyEx(mask, cv2.MORPH_CLOSE, cv2.getStructuringElement(cv2.MORPH_RECT, (15, 15)))
+    if boxes is not None:
+        for x1, y1, x2, y2 in np.asarray(boxes, dtype=np.int64).reshape(-1, 4):
+            mask[max(y1, 0):max(y2, 0), max(x1, 0):max(x2, 0)] = 0
+    return mask
+
+class PitchCalibration:
+    def __init__(self, homography, refresh_interval=None, downscale=0.5, min_motion_px=1.0):
+        """
+        Maps image positions to pitch metres, following a panning camera.
+
+        The initial homography holds for the first analysed frame. Every
+        `refresh_interval` frames, the camera motion since the last keyframe is
+        estimated from corners tracked on the pitch area (lines, grass texture;
+        players masked out) and composed with the current homography, which
+        opens a new camera segment. Projections look up the segment of each
+        observation, so a whole trajectory is mapped with one matrix operation
+        per segment.
+
+        Args:
+            homography (np.array): 3x3 image-to-pitch homography of the first frame.
+            refresh_interval (int): Frames between two camera motion estimates (None: static camera).
+            downscale (float): Scale at which camera motion is estimated.
+            min_motion_px (float): Camera motions below this (in pixels) keep the current segment.
+        """
+        self.starts = [0]
+        self.homographies = [np.asarray(homography, dtype=np.float64)]
+        self.refresh_interval = refresh_interval
+        self.downscale = downscale
+        self.min_motion_px = min_motion_px
+        self._last_check = None
+        self._key_gray = None
+        self._key_points = None
+
+    @classmethod
+    def from_config(cls, cfg, fps):
+        """
+        Builds the calibration from `cfg['pitch_keypoints']`, or from the scalar
+        `cfg['pixels_to_meters']` when no keypoints are given.
+
+        Camera motion is only followed on top of keypoints: chained on a uniform
+        scale, its drift would move positions off the frame-sized pitch of the
+        figures. `cfg['camera_motion_without_keypoints']` enables it anyway.
+        """
+        keypoints = cfg.get('pitch_keypoints')
+        if keypoints:
+            homography = homography_from_keypoints(keypoints)
+        else:
+            scale = cfg.get('pixels_to_meters', 0.1)
+            homography = np.diag([scale, scale, 1.0])
+        refresh_seconds = cfg.get('homography_refresh_seconds')
+        if not keypoints and not cfg.get('camera_motion_without_keypoints', False):
+            refresh_seconds = None
+        refresh_interval = max(1, round(refresh_seconds * fps)) if refresh_seconds else None
+        return cls(homography, refresh_interval)
+
+    def homography_at(self, frame_idx):
+        """
+        Returns:
+            np.array: The image-to-pitch homography of the camera segment containing `frame_idx`.
+        """
+        i = max(np.searchsorted(self.starts, frame_idx, side='right') - 1, 0)
+        return self.homographies[i]
+
+    def to_pitch(self, frames, xs, ys):
+        """
+        Projects image positions observed at various frames to pitch metres.
+
+        Args:
+            frames (np.array): Frame of each point, shape (n,).
+            xs, ys (np.array): Image positions (e.g. foot points), shape (n,).
+
+        Returns:
+            tuple: (xs, ys) in pitch metres.
+        """
+        frames = np.asarray(frames)
+        xs, ys = np.asarray(xs, dtype=np.float64), np.asarray(ys, dtype=np.float64)
+        if len(self.homographies) == 1:
+            return project(self.homographies[0], xs, ys)
+        segment = np.maximum(np.searchsorted(self.starts, frames, side='right') - 1, 0)
+        order = np.argsort(segment, kind='stable')
+        bounds = np.searchsorted(segment[order], np.arange(len(self.homographies) + 1))
+        out_x, out_y = np.empty(len(xs)), np.empty(len(xs))
+        for i, (lo, hi) in enumerate(zip(bounds[:-1], bounds[1:])):
+            if hi > lo:
+                rows = order[lo:hi]
+                out_x[rows], out_y[rows] = project(self.homographies[i], xs[rows], ys[rows])
+        return out_x, out_y
+
+    def meters_per_pixel(self, frame_idx, point):
+        """
+        Returns:
+            float: The local scale of the image around `point`, in metres per pixel.
+        """
+        x, y = point
+        px, py = project(self.homography_at(frame_idx), [x, x + 1, x], [y, y, y + 1])
+        # Square root of the area of the projected unit pixel
+        return float(np.sqrt(abs((px[1] - px[0]) * (py[2] - py[0]) - (px[2] - px[0]) * (py[1] - py[0]))))
+
+    def update(self, frame_idx, frame, boxes=None):
+        """
+        Follows the camera motion, at most once every `refresh_interval` frames.
+
+        Args:
+            frame_idx (int): Index of the frame in the video.
+            frame (np.array): The BGR image.
+            boxes (np.array): Player boxes, excluded from the motion estimate.
+        """
+        if self.refresh_interval is None:
+            return
+        if self._last_check is not None and frame_idx - self._last_check < self.refresh_interval:
+            return
+        self._last_check = frame_idx
+        small = cv2.resize(frame, None, fx=self.downscale, fy=self.downscale, interpolation=cv2.INTER_AREA)
+        gray = cv2.cvtColor(small, cv2.COLOR_BGR2GRAY)
+        motion = self._camera_motion(gray)
+        if motion is None:
+            # First frame, or not enough texture to follow the camera: the current
+            # segment goes on and motion is measured from this frame from now on
+            self._set_key_frame(gray, small, boxes)
+            return
+        corners = np.array([[0, 0], [gray.shape[1], 0], [0, gray.shape[0]], [gray.shape[1], gray.shape[0]]], dtype=np.float64)
+        moved = np.stack(project(motion, corners[:, 0], corners[:, 1]), axis=1)
+        if np.abs(moved - corners).max() / self.downscale < self.min_motion_px:
+            return
+        # Full-resolution motion from the key frame to this frame, then current pixels -> key pixels -> pitch
+        scale = np.diag([self.downscale, self.downscale, 1.0])
+        motion = np.linalg.inv(scale) @ motion @ scale
+        self.starts.append(frame_idx)
+        self.homographies.append(self.homographies[-1] @ np.linalg.inv(motion))
+        self._set_key_frame(gray, small, boxes)
+
+    def _set_key_frame(self, gray, small, boxes):
+        mask = pitch_mask(small, None if boxes is None else np.asarray(boxes, dtype=np.float64) * self.downscale)
+        self._key_gray = gray
+        self._key_points = cv2.goodFeaturesToTrack(gray, maxCorners=300, qualityLevel=0.01, minDistance=8, mask=mask)
+
+    def _camera_motion(self, gray):
+        if self._key_points is None or len(self._key_points) < 8:
+            return None
+        points, status, _ = cv2.calcOpticalFlowPyrLK(self._key_gray, gray, self._key_points, None)
+        found = status.ravel() == 1
+        if found.sum() < 8:
+            return None
+        motion, inliers = cv2.findHomography(self._key_points[found], points[found], cv2.RANSAC, 2.0)
+        if motion is None or inliers.sum() < 8:
+            return None
+        return motion
+
+    def segments(self):
+        """
+        Returns:
+            list: JSON-serialisable (start_frame, homography) camera segments.
+        """
+        return [{'start_frame': int(s), 'homography': h.tolist()} for s, h in zip(self.starts, self.homographies)]
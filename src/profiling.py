@@ -0,0 +1,156 @@
+import csv
+import json
+import os
+import sys
+import time
+import traceback
+
+import numpy as np
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+# Error messages kept per error type in the summary
+MAX_ERROR_SAMPLES = 5
+
+class FrameTimer:
+    __slots__ = ('profiler', 'frame_idx', 't')
+
+    def __init__(self, profiler, frame_idx):
+        self.profiler = profiler
+        self.frame_idx = frame_idx
+        self.t = time.perf_counter()
+
+    def lap(self, stage):
+        """
+        Records the time elapsed since the previous lap (or the timer creation) under `stage`.
+        """
+        now = time.perf_counter()
+        self.profiler.record(stage, now - self.t, self.frame_idx)
+        self.t = now
+
+class _NullTimer:
+    __slots__ = ()
+
+    def lap(self, stage):
+        pass
+
+_NULL_TIMER = _NullTimer()
+
+def peak_rss_mb():
+    """
+    Returns:
+        float or None: The peak resident set size of the process, in MiB (None where unsupported).
+    """
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Kilobytes on Linux, bytes on macOS
+    return round(peak / (1024 * 1024 if sys.platform == 'darwin' else 1024), 1)
+
+class Profiler:
+    def __init__(self, enabled=True):
+        """
+        Collects per-frame timings of the analysis stages and the per-frame errors.
+
+        Timings are only recorded when `enabled`; a disabled profiler hands out a
+        shared no-op timer, so instrumented code costs a few empty calls per frame.
+        Errors are counted either way, so a failing frame is never silent.
+
+        Records are appended from the pipeline threads (list appends are atomic).
+
+        Args:
+            enabled (bool): Whether to record timings.
+        """
+        self.enabled = enabled
+        self.records = []
+        self.errors = {}
+        self.n_errors = 0
+
+    def frame_timer(self, frame_idx):
+        """
+        Returns:
+            A timer whose `lap(stage)` records the time since the previous lap for this frame.
+        """
+        return FrameTimer(self, frame_idx) if self.enabled else _NULL_TIMER
+
+    def record(self, stage, seconds, frame_idx=None):
+        if self.enabled:
+            self.records.append((stage, frame_idx, seconds))
+
+    def error(self, stage, frame_idx, exc):
+        """
+        Counts an error swallowed by a per-frame handler and keeps a few samples per type.
+        """
+        self.n_errors += 1
+        key = f"{stage}:{type(exc).__name__}"
+        entry = self.errors.setdefault(key, {'count': 0, 'samples': []})
+        entry['count'] += 1
+        if len(entry['samples']) < MAX_ERROR_SAMPLES:
+            entry['samples'].append({
+                'frame': None if frame_idx is None else int(frame_idx),
+                'message': str(exc),
+                'where': traceback.format_exception(type(exc), exc, exc.__traceback__)[-2].strip()
+            })
+
+    def summary(self, wall_s, frames):
+        """
+        Args:
+            wall_s (float): Wall-clock duration of the run.
+            frames (int): Number of frames analysed.
+
+        Returns:
+            dict: Per-stage count, total, mean, p50, p95 and max (ms), plus frames/s,
+            peak RSS and the error counters.
+        """
+        stages = {}
+        if self.records:
+            names = np.array([r[0] for r in self.records])
+            seconds = np.array([r[2] for r in self.records])
+            for name in dict.fromkeys(names.tolist()):
+                ms = seconds[names == name] * 1e3
+                p50, p95 = np.percentile(ms, [50, 95])
+                stages[name] = {
+                    'n': int(len(ms)),
+                    'total_s': round(float(ms.sum()) / 1e3, 3),
+                    'mean_ms': round(float(ms.mean()), 3),
+                    'p50_ms': round(float(p50), 3),
+                    'p95_ms': round(float(p95), 3),
+                    'max_ms': round(float(ms.max()), 3)
+                }
+        return {
+            'wall_s': round(wall_s, 3),
+            'frames': frames,
+            'fps': round(frames / wall_s, 2) if wall_s > 0 else 0.0,
+            'peak_rss_mb': peak_rss_mb(),
+            'errors': self.n_errors,
+            'errors_by_type': self.errors,
+            'stages': stages
+        }
+
+    def write(self, output_dir, summary):
+        """
+        Writes the per-frame trace (`profile_trace.csv`: stage, frame, ms) and the summary (`profile.json`).
+
+        Returns:
+            tuple: (trace_path, summary_path).
+        """
+        trace_path = os.path.join(output_dir, 'profile_trace.csv')
+        with open(trace_path, 'w', newline='') as f:
+            writer = csv.writer(f)
+            writer.writerow(['stage', 'frame', 'ms'])
+            writer.writerows((stage, '' if frame is None else frame, round(seconds * 1e3, 4))
+                             for stage, frame, seconds in self.records)
+        summary_path = os.path.join(output_dir, 'profile.json')
+        with open(summary_path, 'w') as f:
+            json.dump(summary, f, indent=2)
+        return trace_path, summary_path
+
+def print_profile_summary(summary):
+    print(f"Profile: {summary['frames']} frames in {summary['wall_s']:.2f}s ({summary['fps']:.2f} frames/s), "
+          f"peak RSS {summary['peak_rss_mb']} MiB, {summary['errors']} frame errors")
+    for name, s in summary['stages'].items():
+        print(f"  {name:<22} n={s['n']:<6} total={s['total_s']:8.2f}s p50={s['p50_ms']:8.2f}ms "
+              f"p95={s['p95_ms']:8.2f}ms max={s['max_ms']:8.2f}ms")
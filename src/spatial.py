@@ -0,0 +1,73 @@
+from itertools import chain
+
+import numpy as np
+from scipy.spatial import cKDTree
+
+# Below this many players, a vectorised scan beats building and querying a KD-tree
+TREE_MIN_POINTS = 64
+
+def foot_points(boxes):
+    """
+    Returns the bottom-centre of each box, where a player touches the pitch.
+
+    Args:
+        boxes (np.array): Boxes of shape (n, 4) as [x1, y1, x2, y2].
+
+    Returns:
+        np.array: Points of shape (n, 2).
+    """
+    boxes = np.asarray(boxes, dtype=np.float64).reshape(-1, 4)
+    points = np.empty((len(boxes), 2))
+    points[:, 0] = (boxes[:, 0] + boxes[:, 2]) * 0.5
+    points[:, 1] = boxes[:, 3]
+    return points
+
+class PlayerIndex:
+    def __init__(self, points, ids=None):
+        """
+        Spatial index over the players of one frame, for nearest-player queries.
+
+        The KD-tree is only built for crowded frames; a typical frame answers
+        with a vectorised scan.
+
+        Args:
+            points (np.array): Player positions, shape (n, 2).
+            ids (list): Player IDs matching `points` (row indices by default).
+        """
+        self.points = np.asarray(points, dtype=np.float64).reshape(-1, 2)
+        self.ids = ids if ids is not None else list(range(len(self.points)))
+        self._tree = None
+
+    @property
+    def tree(self):
+        if self._tree is None and len(self.points):
+            self._tree = cKDTree(self.points)
+        return self._tree
+
+    @classmethod
+    def from_persons(cls, persons):
+        """
+        Builds the index from `parse_frame_results` person dictionaries, at their foot points.
+        """
+        # fromiter avoids building an intermediate list of per-box lists
+        boxes = np.fromiter(chain.from_iterable(p['box'] for p in persons), dtype=np.float64, count=4 * len(persons))
+        return cls(foot_points(boxes), [p['id'] for p in persons])
+
+    def __len__(self):
+        return len(self.points)
+
+    def nearest(self, point, max_distance=np.inf):
+        """
+        Returns:
+            tuple: (row, distance) of the closest player, or (None, inf) when no player
+            lies within `max_distance`.
+        """
+        if len(self.points) == 0:
+            return None, np.inf
+        if len(self.points) < TREE_MIN_POINTS:
+            dist = np.hypot(self.points[:, 0] - point[0], self.points[:, 1] - point[1])
+            row = int(np.argmin(dist))
+            dist = dist[row]
+        else:
+            dist, row = self.tree.query(point, distance_upper_bound=max_distance)
+        return (int(row), float(dist)) if dist <= max_distance else (None, np.inf)
@@ -1,75 +1,60 @@
+import cv2
 import numpy as np
-from .utils import pixel_distance, speed_kmh
-from scipy.spatial.distance import pdist, squareform
+from .track_store import NO_TEAM
 
-def calculate_team_compactness(player_positions):
+def calculate_team_stats(xs, ys, teams, pixels_to_meters=0.1):
     """
-    Calculates the team compactness based on the average distance between players.
-    A lower value means the team is more compact.
-    """
-    if len(player_positions) < 2:
-        return 0
+    Calculates aggregate statistics for each team from the players visible in the current frame.
 
-    # Calculate the pairwise distance between all players
-    dist_matrix = pdist(np.array(player_positions))
+    All teams are processed in one pass over the pairwise distance matrix of the
+    visible players, so the cost depends on the players on screen only.
 
-    # The compactness is the mean of these distances
-    return np.mean(dist_matrix)
+    Args:
+        xs, ys (np.array): Positions of the visible players, in pixels.
+        teams (np.array): Team code of each player (NO_TEAM players are ignored).
+        pixels_to_meters (float): The conversion factor from pixels to meters.
 
-def update_player_movement(player_data, player_obj, frame_idx, fps, cfg):
-    """
-    Updates a single player's position, distance, and speed based on their movement.
-    This modifies the player_data dictionary in place.
+    Returns:
+        dict: Per team ('0', '1', ...): player_count, compactness (mean pairwise
+        distance), centroid, width, depth (extent along x and y) and hull_area,
+        in meters / square meters.
     """
-    cx, cy = player_obj['center']
-    player_data['positions'].append((frame_idx, cx, cy))
-
-    frame_skip = cfg.get('frame_skip', 1)
-
-    # Calculate distance and speed if the player was seen in a recent frame
-    if player_data.get('last_pos') is not None and player_data.get('last_frame') is not None:
-        # Avoid calculating distance for "teleporting" players (re-identified after long time)
-        if (frame_idx - player_data['last_frame']) < (frame_skip * 5): # Increased tolerance
-            dd = pixel_distance(player_data['last_pos'], (cx, cy))
-            player_data['dist_pixels'] += dd
-
-            dt = (frame_idx - player_data['last_frame']) / fps
-            if dt > 0:
-                sp = speed_kmh(dd, dt, cfg.get('pixels_to_meters', 0.1))
-                if sp > player_data['max_speed_kmh']:
-                    player_data['max_speed_kmh'] = sp
-
-    player_data['last_pos'] = (cx, cy)
-    player_data['last_frame'] = frame_idx
+    teams = np.asarray(teams)
+    valid = teams != NO_TEAM
+    if not valid.any():
+        return {}
+    pts = np.stack([np.asarray(xs, dtype=np.float64), np.asarray(ys, dtype=np.float64)], axis=1)[valid] * pixels_to_meters
+    codes, team_idx, counts = np.unique(teams[valid], return_inverse=True, return_counts=True)
+    n_teams = len(codes)
+
+    # Sum of intra-team distances (each pair counted twice) over the full distance matrix
+    diff = pts[:, None, :] - pts[None, :, :]
+    dist = np.hypot(diff[..., 0], diff[..., 1])
+    same_team = team_idx[:, None] == team_idx[None, :]
+    pair_sums = np.bincount(team_idx, weights=(dist * same_team).sum(axis=1), minlength=n_teams)
+    n_pairs = counts * (counts - 1)
+    compactness = np.divide(pair_sums, n_pairs, out=np.zeros(n_teams), where=n_pairs > 0)
+
+    centroid_x = np.bincount(team_idx, weights=pts[:, 0], minlength=n_teams) / counts
+    centroid_y = np.bincount(team_idx, weights=pts[:, 1], minlength=n_teams) / counts
+    mins = np.full((n_teams, 2), np.inf)
+    maxs = np.full((n_teams, 2), -np.inf)
+    np.minimum.at(mins, team_idx, pts)
+    np.maximum.at(maxs, team_idx, pts)
+    extent = maxs - mins
 
-def calculate_team_stats(players, team_assignments, pixels_to_meters=0.1):
-    """
-    Calculates aggregate statistics for each team for the current frame.
-    """
     team_stats = {}
-
-    # Initialize stats structure for each team
-    unique_teams = set(team_assignments.values())
-    for team_id in unique_teams:
-        if team_id is None: continue
-        team_stats[team_id] = {
-            'player_count': 0,
-            'positions': [],
-            'compactness': 0
+    for i, code in enumerate(codes):
+        hull_area = 0.0
+        if counts[i] >= 3:
+            hull = cv2.convexHull(pts[team_idx == i].astype(np.float32))
+            hull_area = float(cv2.contourArea(hull))
+        team_stats[str(code)] = {
+            'player_count': int(counts[i]),
+            'compactness': round(float(compactness[i]), 2),
+            'centroid': (round(float(centroid_x[i]), 2), round(float(centroid_y[i]), 2)),
+            'width': round(float(extent[i, 0]), 2),
+            'depth': round(float(extent[i, 1]), 2),
+            'hull_area': round(hull_area, 2)
         }
-
-    # Aggregate current positions from players
-    for pid, p_data in players.items():
-        team_id = p_data.get('team')
-        if team_id in team_stats:
-            if p_data.get('last_pos'):
-                team_stats[team_id]['positions'].append(p_data['last_pos'])
-                team_stats[team_id]['player_count'] += 1
-
-    # Calculate compactness for each team
-    for team_id, stats in team_stats.items():
-        if stats['player_count'] > 1:
-            compactness_pixels = calculate_team_compactness(stats['positions'])
-            stats['compactness'] = round(compactness_pixels * pixels_to_meters, 2)
-
-    return team_stats
\ No newline at end of file
+    return team_stats
@@ -1,5 +1,16 @@
+import hashlib
+import json
 import os
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
 import openai
+import pandas as pd
+
+REPORT_CACHE_VERSION = 1
+SYSTEM_PROMPT = "You are a world-class football tactical analyst."
 
 def format_data_for_llm(team_stats_df, player_stats_df, events_df):
     """
@@ -18,6 +29,9 @@ def format_data_for_llm(team_stats_df, player_stats_df, events_df):
     prompt += "# Key Player Statistics\n"
     prompt += "Here are the top 3 players from each team based on distance covered:\n"
     for team_id in player_stats_df['team_id'].unique():
+        # Players without a team (referees, unclassified tracks) are left out
+        if team_id not in team_stats_df.index:
+            continue
         team_name = team_stats_df.loc[team_id]['team_name']
         top_players = player_stats_df[player_stats_df['team_id'] == team_id].nlargest(3, 'distance_m')
         prompt += f"## {team_name}:\n"
@@ -38,34 +52,213 @@ def format_data_for_llm(team_stats_df, player_stats_df, events_df):
     prompt += "--- ANALYSIS ---"
     return prompt
 
-def generate_tactical_report(team_stats_df, player_stats_df, events_df):
+def prompt_from_outputs(output_dir):
     """
-    Generates a tactical report using an LLM.
+    Rebuilds the report prompt of an analysed match from its CSV outputs
+    (`team_stats.csv`, `players_stats.csv` and, when present, `events.csv`).
 
-    Returns:
-        str: The generated tactical report or an error message.
+    Raises:
+        FileNotFoundError: When the team or player stats were not exported.
     """
-    api_key = os.getenv("OPENAI_API_KEY")
-    if not api_key:
-        return "ERROR: OPENAI_API_KEY environment variable not set. Cannot generate tactical report."
+    team_stats_df = pd.read_csv(os.path.join(output_dir, 'team_stats.csv'), index_col='team_id', dtype={'team_id': str})
+    player_stats_df = pd.read_csv(os.path.join(output_dir, 'players_stats.csv'), dtype={'team_id': str})
+    events_path = os.path.join(output_dir, 'events.csv')
+    events_df = pd.read_csv(events_path, dtype={'team_id': str}) if os.path.exists(events_path) else pd.DataFrame()
+    return format_data_for_llm(team_stats_df, player_stats_df, events_df)
 
-    openai.api_key = api_key
+def _retryable(exc):
+    # Network failures, rate limiting and server errors are transient; bad requests or credentials are not
+    return isinstance(exc, (openai.APIConnectionError, openai.RateLimitError, openai.InternalServerError))
 
-    formatted_prompt = format_data_for_llm(team_stats_df, player_stats_df, events_df)
+class ReportGenerator:
+    def __init__(self, model="gpt-3.5-turbo", base_url=None, api_key=None, temperature=0.7, max_tokens=500,
+                 timeout=60.0, max_retries=3, backoff_seconds=1.0, max_concurrency=4, cache_dir=None):
+        """
+        Generates tactical reports from an OpenAI-compatible chat completions endpoint.
 
-    print("Sending data to LLM for tactical analysis...")
+        Requests run on a pool of `max_concurrency` threads, so a report is
+        generated while the caller goes on with other work, and many matches'
+        reports are generated with bounded concurrency. Transient failures are
+        retried with exponential backoff and jitter. Reports are cached on disk
+        under the hash of the prompt and every setting that changes the answer,
+        so analysing the same match again does not request the same report twice.
+
+        Args:
+            model (str): The chat model name.
+            base_url (str): The endpoint (e.g. a local server); None uses the OpenAI API
+                (or the OPENAI_BASE_URL environment variable).
+            api_key (str): The API key; defaults to OPENAI_API_KEY.
+            temperature (float): Sampling temperature.
+            max_tokens (int): Maximum length of a report.
+            timeout (float): Timeout of one request, in seconds.
+            max_retries (int): Retries of a request after a transient failure.
+            backoff_seconds (float): Delay before the first retry, doubled at each retry.
+            max_concurrency (int): Maximum number of requests in flight.
+            cache_dir (str): Directory of the report cache (None disables it).
+        """
+        self.model = model
+        self.base_url = base_url
+        self.api_key = api_key if api_key is not None else os.getenv("OPENAI_API_KEY")
+        self.temperature = temperature
+        self.max_tokens = max_tokens
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.backoff_seconds = backoff_seconds
+        self.max_concurrency = max(1, int(max_concurrency))
+        self.cache_dir = cache_dir
+        self._client = None
+        self._executor = None
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_config(cls, cfg):
+        return cls(model=cfg.get('llm_model', "gpt-3.5-turbo"),
+                   base_url=cfg.get('llm_base_url'),
+                   temperature=cfg.get('llm_temperature', 0.7),
+                   max_tokens=cfg.get('llm_max_tokens', 500),
+                   timeout=cfg.get('llm_timeout_seconds', 60.0),
+                   max_retries=cfg.get('llm_max_retries', 3),
+                   max_concurrency=cfg.get('llm_max_concurrency', 4),
+                   cache_dir=cfg.get('llm_cache_dir'))
+
+    def cache_key(self, prompt):
+        """
+        Returns:
+            str: A hex digest of the prompt and of the settings that change the report.
+        """
+        inputs = {
+            'version': REPORT_CACHE_VERSION,
+            'endpoint': self.base_url,
+            'model': self.model,
+            'temperature': self.temperature,
+            'max_tokens': self.max_tokens,
+            'system': SYSTEM_PROMPT,
+            'prompt': prompt
+        }
+        return hashlib.sha256(json.dumps(inputs, sort_keys=True).encode()).hexdigest()
 
-    try:
-        response = openai.chat.completions.create(
-            model="gpt-3.5-turbo",
-            messages=[
-                {"role": "system", "content": "You are a world-class football tactical analyst."},
-                {"role": "user", "content": formatted_prompt}
-            ],
-            temperature=0.7,
-            max_tokens=500
-        )
-        report = response.choices[0].message.content
+    def _cache_path(self, prompt):
+        return os.path.join(self.cache_dir, f"{self.cache_key(prompt)}.json")
+
+    def cached(self, prompt):
+        """
+        Returns:
+            str or None: The cached report for this prompt, if any.
+        """
+        if not self.cache_dir:
+            return None
+        try:
+            with open(self._cache_path(prompt)) as f:
+                return json.load(f)['report']
+        except (OSError, ValueError, KeyError):
+            return None
+
+    def _store(self, prompt, report):
+        path = self._cache_path(prompt)
+        os.makedirs(self.cache_dir, exist_ok=True)
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump({'model': self.model, 'endpoint': self.base_url, 'created': time.time(), 'report': report}, f)
+        os.replace(tmp_path, path)
+
+    def _get_client(self):
+        with self._lock:
+            if self._client is None:
+                # A local stand-in server does not check the key, but the client requires one
+                api_key = self.api_key or ("not-needed" if self.base_url else None)
+                self._client = openai.OpenAI(api_key=api_key, base_url=self.base_url, timeout=self.timeout, max_retries=0)
+            return self._client
+
+    def _request(self, prompt):
+        client = self._get_client()
+        for attempt in range(self.max_retries + 1):
+            try:
+                response = client.chat.completions.create(
+                    model=self.model,
+                    messages=[
+                        {"role": "system", "content": SYSTEM_PROMPT},
+                        {"role": "user", "content": prompt}
+                    ],
+                    temperature=self.temperature,
+                    max_tokens=self.max_tokens
+                )
+                return response.choices[0].message.content
+            except Exception as e:
+                if attempt == self.max_retries or not _retryable(e):
+                    raise
+                delay = self.backoff_seconds * 2 ** attempt
+                time.sleep(delay + random.uniform(0, delay))
+
+    def generate(self, prompt):
+        """
+        Generates the report for a prompt, from the cache when possible.
+
+        Returns:
+            str: The report, or an error message (errors are not cached).
+        """
+        report = self.cached(prompt)
+        if report is not None:
+            return report
+        if not self.api_key and not self.base_url:
+            return "ERROR: OPENAI_API_KEY environment variable not set. Cannot generate tactical report."
+        try:
+            report = self._request(prompt)
+        except Exception as e:
+            return f"ERROR: Failed to generate report from LLM. Details: {e}"
+        if self.cache_dir and report is not None:
+            self._store(prompt, report)
         return report
-    except Exception as e:
-        return f"ERROR: Failed to generate report from LLM. Details: {e}"
\ No newline at end of file
+
+    def submit(self, prompt):
+        """
+        Starts generating a report in the background.
+
+        Returns:
+            concurrent.futures.Future: Resolves to the report (see `generate`).
+        """
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.max_concurrency, thread_name_prefix='llm-report')
+        return self._executor.submit(self.generate, prompt)
+
+    def generate_many(self, prompts):
+        """
+        Generates many reports, at most `max_concurrency` at a time.
+
+        Returns:
+            list: The reports, in the order of `prompts`.
+        """
+        futures = [self.submit(prompt) for prompt in prompts]
+        return [future.result() for future in futures]
+
+    def close(self, wait=True):
+        """
+        Releases the worker threads; reports already submitted are still generated.
+        """
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=wait)
+
+def generate_tactical_report(team_stats_df, player_stats_df, events_df, generator=None):
+    """
+    Generates a tactical report using an LLM.
+
+    Returns:
+        str: The generated tactical report or an error message.
+    """
+    generator = generator if generator is not None else ReportGenerator()
+    print("Sending data to LLM for tactical analysis...")
+    return generator.generate(format_data_for_llm(team_stats_df, player_stats_df, events_df))
+
+def save_report(output_dir, report):
+    """
+    Writes a report to `<output_dir>/tactical_report.txt`.
+
+    Returns:
+        str: The report path.
+    """
+    report_path = os.path.join(output_dir, 'tactical_report.txt')
+    with open(report_path, 'w') as f:
+        f.write(report)
+    return report_path
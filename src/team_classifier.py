@@ -0,0 +1,191 @@
+import cv2
+import numpy as np
+
+# OpenCV hue range (0-179) of the pitch; grass pixels inside a torso crop are ignored
+PITCH_HUE_RANGE = (35, 85)
+
+def torso_features(frame, boxes, grid=8, hue_bins=12, sat_min=60, val_min=50):
+    """
+    Computes a colour histogram of the torso of each detection, for all boxes at once.
+
+    A `grid` x `grid` lattice of pixels is sampled in the torso (middle half of
+    the box width, 20-50% of its height), so the cost does not depend on the
+    box size. Saturated pixels are binned by hue; unsaturated or dark pixels
+    go to a 'white' and a 'black' bin. Pitch-green pixels are ignored. The
+    histograms are L1-normalised and square-rooted (Hellinger embedding), so
+    Euclidean distances between them are meaningful for clustering.
+
+    Args:
+        frame (np.array): The BGR image.
+        boxes (np.array): Boxes of shape (n, 4) as [x1, y1, x2, y2].
+        grid (int): Side of the sampling lattice.
+        hue_bins (int): Number of hue bins for saturated pixels.
+        sat_min (int): Minimum saturation (0-255) of a coloured pixel.
+        val_min (int): Minimum value (0-255) below which a pixel counts as black.
+
+    Returns:
+        tuple: (features, valid) with features of shape (n, hue_bins + 2) and a
+        boolean mask of the boxes where at least one non-pitch pixel was sampled.
+    """
+    n_bins = hue_bins + 2
+    boxes = np.asarray(boxes, dtype=np.float64).reshape(-1, 4)
+    if len(boxes) == 0:
+        return np.empty((0, n_bins)), np.empty(0, dtype=bool)
+    height, width = frame.shape[:2]
+    steps = (np.arange(grid) + 0.5) / grid
+    box_w = boxes[:, 2] - boxes[:, 0]
+    box_h = boxes[:, 3] - boxes[:, 1]
+    xs = boxes[:, 0:1] + box_w[:, None] * (0.25 + 0.5 * steps)
+    ys = boxes[:, 1:2] + box_h[:, None] * (0.2 + 0.3 * steps)
+    xs = np.clip(xs, 0, width - 1).astype(np.intp)
+    ys = np.clip(ys, 0, height - 1).astype(np.intp)
+    # (n, grid * grid, 3) gathered in one indexing operation, converted as a single small image
+    pixels = frame[ys[:, :, None], xs[:, None, :]].reshape(len(boxes), grid * grid, 3)
+    hsv = cv2.cvtColor(np.ascontiguousarray(pixels), cv2.COLOR_BGR2HSV).astype(np.int32)
+    hue, sat, val = hsv[..., 0], hsv[..., 1], hsv[..., 2]
+
+    coloured = (sat >= sat_min) & (val >= val_min)
+    bins = np.where(coloured, hue * hue_bins // 180, np.where(val >= 128, hue_bins, hue_bins + 1))
+    keep = ~(coloured & (hue >= PITCH_HUE_RANGE[0]) & (hue <= PITCH_HUE_RANGE[1]))
+    flat = (np.arange(len(boxes))[:, None] * n_bins + bins).ravel()
+    hist = np.bincount(flat, weights=keep.ravel().astype(np.float64), minlength=len(boxes) * n_bins)
+    hist = hist.reshape(len(boxes), n_bins)
+    totals = hist.sum(axis=1)
+    valid = totals > 0
+    hist[valid] /= totals[valid, None]
+    return np.sqrt(hist), valid
+
+class TeamClassifier:
+    def __init__(self, n_teams=2, sample_frames=20, min_tracks=4, outlier_quantile=0.9, outlier_scale=1.5):
+        """
+        Assigns tracks to teams from the colour of their jersey.
+
+        Torso histograms of the first `sample_frames` frames are buffered, then
+        clustered once: each track contributes its mean histogram, KMeans
+        finds one centroid per team and tracks far from every centroid
+        (referees, goalkeepers) are left out of a second fit. Afterwards each
+        detection is labelled by its nearest centroid, or as an outlier beyond
+        the distance threshold, and votes for its track; the team of a track
+        is its majority label. Tracks appearing late are thus classified from
+        their first detection on, at constant cost per detection.
+
+        Args:
+            n_teams (int): Number of teams.
+            sample_frames (int): Frames buffered before the clusters are fitted.
+            min_tracks (int): Distinct tracks needed to fit; sampling goes on until reached.
+            outlier_quantile (float): Quantile of the distances to the nearest centroid...
+            outlier_scale (float): ...multiplied by this factor to give the outlier threshold,
+                for tracks at fit time and for single detections afterwards.
+        """
+        self.n_teams = n_teams
+        self.sample_frames = sample_frames
+        self.min_tracks = min_tracks
+        self.outlier_quantile = outlier_quantile
+        self.outlier_scale = outlier_scale
+        self.centroids = None
+        self.threshold = np.inf
+        self.votes = {}
+        self.teams = {}
+        self._frames_seen = 0
+        self._buffer_ids, self._buffer_features = [], []
+
+    @classmethod
+    def from_config(cls, cfg):
+        """
+        Returns:
+            TeamClassifier or None: A classifier configured from `cfg`, or None when
+            `cfg['team_classification']` is not 'appearance'.
+        """
+        if cfg.get('team_classification', 'appearance') != 'appearance':
+            return None
+        return cls(sample_frames=cfg.get('team_clustering_sample_frames', 20),
+                   outlier_quantile=cfg.get('team_outlier_quantile', 0.9),
+                   outlier_scale=cfg.get('team_outlier_scale', 1.5))
+
+    @property
+    def fitted(self):
+        return self.centroids is not None
+
+    def update(self, frame, persons):
+        """
+        Classifies the person detections of one frame.
+
+        Args:
+            frame (np.array): The BGR image.
+            persons (list): The person detections of the frame.
+
+        Returns:
+            dict: Track ID to team ('0', '1'..., or None for outliers) of every track
+            whose team changed; all buffered tracks when the clusters were just fitted.
+        """
+        persons = [p for p in persons if p.get('id')]
+        if not persons:
+            return {}
+        features, valid = torso_features(frame, [p['box'] for p in persons])
+        ids = np.array([p['id'] for p in persons])[valid]
+        features = features[valid]
+
+        if not self.fitted:
+            self._frames_seen += 1
+            self._buffer_ids.append(ids)
+            self._buffer_features.append(features)
+            ids, features = np.concatenate(self._buffer_ids), np.concatenate(self._buffer_features)
+            if self._frames_seen < self.sample_frames or len(np.unique(ids)) < self.min_tracks:
+                return {}
+            self.fit(ids, features)
+            self._buffer_ids, self._buffer_features = [], []
+        return self._vote(ids, self.predict(features))
+
+    def fit(self, ids, features):
+        """
+        Fits the team centroids and the outlier threshold.
+
+        Args:
+            ids (np.array): Track ID of each sample, shape (n,).
+            features (np.array): Torso features, shape (n, d).
+        """
+        from sklearn.cluster import KMeans
+        track_ids, inverse = np.unique(ids, return_inverse=True)
+        means = np.zeros((len(track_ids), features.shape[1]))
+        np.add.at(means, inverse, features)
+        means /= np.bincount(inverse, minlength=len(track_ids))[:, None]
+
+        inliers = np.ones(len(means), dtype=bool)
+        for _ in range(2):
+            kmeans = KMeans(n_clusters=self.n_teams, random_state=42, n_init=10).fit(means[inliers])
+            dist = np.min(np.linalg.norm(means[:, None, :] - kmeans.cluster_centers_[None], axis=2), axis=1)
+            outliers = dist > np.quantile(dist[inliers], self.outlier_quantile) * self.outlier_scale
+            # Refit once without the outlying tracks, if enough tracks remain
+            if not outliers[inliers].any() or (~outliers).sum() < 2 * self.n_teams:
+                break
+            inliers = ~outliers
+        self.centroids = kmeans.cluster_centers_
+        # Single detections are noisier than track means: the threshold applied to them
+        # comes from the detections of the inlier tracks
+        samples = features[inliers[inverse]]
+        dist = np.min(np.linalg.norm(samples[:, None, :] - self.centroids[None], axis=2), axis=1)
+        self.threshold = np.quantile(dist, self.outlier_quantile) * self.outlier_scale
+
+    def predict(self, features):
+        """
+        Returns:
+            np.array: The nearest centroid of each feature row, or `n_teams` for outliers.
+        """
+        dist = np.linalg.norm(features[:, None, :] - self.centroids[None], axis=2)
+        labels = np.argmin(dist, axis=1)
+        labels[dist[np.arange(len(labels)), labels] > self.threshold] = self.n_teams
+        return labels
+
+    def _vote(self, ids, labels):
+        changed = {}
+        for pid, label in zip(ids.tolist(), labels.tolist()):
+            votes = self.votes.get(pid)
+            if votes is None:
+                votes = self.votes[pid] = np.zeros(self.n_teams + 1, dtype=np.int64)
+            votes[label] += 1
+            best = int(np.argmax(votes))
+            team = str(best) if best < self.n_teams else None
+            if pid not in self.teams or self.teams[pid] != team:
+                self.teams[pid] = team
+                changed[pid] = team
+        return changed
@@ -0,0 +1,127 @@
+import json
+import struct
+
+import numpy as np
+
+from .track_store import TrackStore
+
+MAGIC = b'FTRK'
+VERSION = 1
+ALIGN = 64
+_PREAMBLE = struct.Struct('<4sHI')  # magic, version, header length
+
+def _aligned(offset):
+    return -(-offset // ALIGN) * ALIGN
+
+def write_track_archive(path, track_store, metadata=None):
+    """
+    Writes all observations of a TrackStore to a fixed-record binary file.
+
+    Layout: a small preamble, a JSON header describing each column (dtype,
+    offset, length) and the match metadata, then every column stored as one
+    contiguous little-endian array aligned on 64 bytes. Rows are in frame order
+    and a frame index (distinct frames and the first row of each) is stored
+    alongside, so a time window maps to one row slice.
+
+    Args:
+        path (str): Destination file (conventionally `*.ftrk`).
+        track_store (TrackStore): The observations to write.
+        metadata (dict): JSON-serialisable match metadata (video, fps, frame_skip...).
+    """
+    columns = {name: np.ascontiguousarray(track_store.column(name), dtype=np.dtype(dtype).newbyteorder('<'))
+               for name, dtype in TrackStore.COLUMNS}
+    index_frame, index_start = np.unique(columns['frame'], return_index=True)
+    columns['index_frame'] = index_frame.astype('<i4')
+    columns['index_start'] = index_start.astype('<i8')
+
+    # The header size depends on the offsets it contains: lay out columns after a generous bound
+    layout, offset = {}, 0
+    for name, arr in columns.items():
+        layout[name] = {'dtype': arr.dtype.str, 'length': int(len(arr)), 'offset': offset}
+        offset = _aligned(offset + arr.nbytes)
+    header = {'n_rows': len(track_store), 'columns': layout, 'metadata': metadata or {}}
+    header_bytes = json.dumps(header).encode()
+    data_start = _aligned(_PREAMBLE.size + len(header_bytes) + 1024)
+    for col in layout.values():
+        col['offset'] += data_start
+    header_bytes = json.dumps(header).encode()
+
+    with open(path, 'wb') as f:
+        f.write(_PREAMBLE.pack(MAGIC, VERSION, len(header_bytes)))
+        f.write(header_bytes)
+        for name, arr in columns.items():
+            f.seek(layout[name]['offset'])
+            f.write(arr.tobytes())
+
+class TrackArchive:
+    def __init__(self, path):
+        """
+        Opens a track archive written by `write_track_archive` with zero-copy column access.
+
+        Columns are memory-mapped, so opening a file only reads its header and
+        slicing a window only touches the pages of that window.
+
+        Args:
+            path (str): Path to the archive.
+        """
+        self.path = path
+        with open(path, 'rb') as f:
+            magic, version, header_len = _PREAMBLE.unpack(f.read(_PREAMBLE.size))
+            if magic != MAGIC:
+                raise ValueError(f"{path} is not a track archive")
+            if version > VERSION:
+                raise ValueError(f"{path} uses archive version {version}, newer than supported ({VERSION})")
+            header = json.loads(f.read(header_len))
+        self.n_rows = header['n_rows']
+        self.metadata = header['metadata']
+        self._columns = {}
+        for name, col in header['columns'].items():
+            if col['length'] == 0:
+                self._columns[name] = np.empty(0, dtype=np.dtype(col['dtype']))
+            else:
+                self._columns[name] = np.memmap(path, dtype=np.dtype(col['dtype']), mode='r',
+                                                offset=col['offset'], shape=(col['length'],))
+
+    def __len__(self):
+        return self.n_rows
+
+    @property
+    def column_names(self):
+        return [name for name, _ in TrackStore.COLUMNS if name in self._columns]
+
+    def column(self, name):
+        """
+        Returns:
+            np.memmap: The whole column, memory-mapped.
+        """
+        return self._columns[name]
+
+    def frame_rows(self, start_frame, end_frame):
+        """
+        Returns:
+            slice: The rows observed in frames [start_frame, end_frame).
+        """
+        index_frame, index_start = self._columns['index_frame'], self._columns['index_start']
+        lo = int(np.searchsorted(index_frame, start_frame, side='left'))
+        hi = int(np.searchsorted(index_frame, end_frame, side='left'))
+        start = int(index_start[lo]) if lo < len(index_frame) else self.n_rows
+        end = int(index_start[hi]) if hi < len(index_frame) else self.n_rows
+        return slice(start, end)
+
+    def window(self, start_frame, end_frame):
+        """
+        Returns:
+            dict: Column name to a zero-copy view of the rows in frames [start_frame, end_frame).
+        """
+        rows = self.frame_rows(start_frame, end_frame)
+        return {name: self._columns[name][rows] for name in self.column_names}
+
+    def to_track_store(self, start_frame=None, end_frame=None):
+        """
+        Loads the archive (or a frame window of it) into an in-memory TrackStore.
+        """
+        if start_frame is None and end_frame is None:
+            return TrackStore.from_columns({name: self._columns[name] for name in self.column_names})
+        return TrackStore.from_columns(self.window(
+            start_frame if start_frame is not None else np.iinfo(np.int32).min,
+            end_frame if end_frame is not None else np.iinfo(np.int32).max))
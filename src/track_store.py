@@ -0,0 +1,201 @@
+import numpy as np
+
+NO_TEAM = -1
+
+class TrackStore:
+    COLUMNS = (
+        ('frame', np.int32),
+        ('track_id', np.int32),
+        ('x', np.float32),
+        ('y', np.float32),
+        ('foot_y', np.float32),
+        ('conf', np.float32),
+        ('team', np.int8),
+    )
+
+    def __init__(self, capacity=4096):
+        """
+        Columnar storage of all tracked observations, one row per (frame, track).
+
+        Rows are appended frame by frame into growable NumPy arrays (capacity is
+        doubled when full), so an observation costs ~25 bytes instead of a tuple of
+        Python objects. Rows are kept in frame order; a per-track index is built
+        lazily for trajectory queries and invalidated on append.
+
+        Args:
+            capacity (int): Initial number of rows allocated.
+        """
+        self._size = 0
+        self._data = {name: np.empty(capacity, dtype=dtype) for name, dtype in self.COLUMNS}
+        self._index = None
+
+    @classmethod
+    def from_columns(cls, columns):
+        """
+        Builds a store from whole columns at once (e.g. read back from an archive).
+
+        Args:
+            columns (dict): Column name to array, all of the same length and in frame order.
+                Without 'foot_y' (archives written before it existed), foot points default to 'y'.
+        """
+        n = len(columns['frame'])
+        columns = {'foot_y': columns['y'], **columns}
+        store = cls(capacity=max(1, n))
+        for name, _ in cls.COLUMNS:
+            store._data[name][:n] = columns[name]
+        store._size = n
+        return store
+
+    def __len__(self):
+        return self._size
+
+    @property
+    def nbytes(self):
+        return sum(col[:self._size].nbytes for col in self._data.values())
+
+    def append(self, frame_idx, track_ids, xs, ys, confs=None, teams=None, foot_ys=None):
+        """
+        Appends the observations of one frame.
+
+        Args:
+            frame_idx (int): The frame index; must not decrease between calls.
+            track_ids (array-like): Track IDs of the observations.
+            xs, ys (array-like): Position of each observation, in pixels.
+            confs (array-like): Detection confidences (defaults to 1).
+            teams (array-like): Team of each observation as an int (defaults to NO_TEAM).
+            foot_ys (array-like): Bottom of each box, where the player touches the pitch (defaults to ys).
+        """
+        n = len(track_ids)
+        if n == 0:
+            return
+        self._reserve(self._size + n)
+        rows = slice(self._size, self._size + n)
+        self._data['frame'][rows] = frame_idx
+        self._data['track_id'][rows] = track_ids
+        self._data['x'][rows] = xs
+        self._data['y'][rows] = ys
+        self._data['foot_y'][rows] = ys if foot_ys is None else foot_ys
+        self._data['conf'][rows] = 1.0 if confs is None else confs
+        self._data['team'][rows] = NO_TEAM if teams is None else teams
+        self._size += n
+        self._index = None
+
+    def column(self, name):
+        """
+        Returns:
+            np.ndarray: A view of the filled part of a column.
+        """
+        return self._data[name][:self._size]
+
+    def set_teams(self, track_teams):
+        """
+        Sets the team of every observation of the given tracks.
+
+        Args:
+            track_teams (dict): Mapping of track ID to team (int, or None for no team).
+        """
+        if not track_teams:
+            return
+        ids = np.fromiter(track_teams.keys(), dtype=np.int64, count=len(track_teams))
+        teams = np.array([NO_TEAM if t is None else int(t) for t in track_teams.values()], dtype=np.int8)
+        order = np.argsort(ids)
+        ids, teams = ids[order], teams[order]
+        track_col = self.column('track_id')
+        pos = np.clip(np.searchsorted(ids, track_col), 0, len(ids) - 1)
+        hit = ids[pos] == track_col
+        self.column('team')[hit] = teams[pos[hit]]
+
+    def track_ids(self):
+        """
+        Returns:
+            np.ndarray: The sorted unique track IDs.
+        """
+        return self._get_index()[0]
+
+    def counts(self):
+        """
+        Returns:
+            tuple: (track_ids, n_observations) arrays.
+        """
+        ids, starts, ends, _ = self._get_index()
+        return ids, ends - starts
+
+    def track_rows(self, track_id):
+        """
+        Returns:
+            np.ndarray: Row indices of one track, in frame order (empty if unknown).
+        """
+        ids, starts, ends, order = self._get_index()
+        i = np.searchsorted(ids, track_id)
+        if i >= len(ids) or ids[i] != track_id:
+            return np.empty(0, dtype=np.int64)
+        return order[starts[i]:ends[i]]
+
+    def trajectory(self, track_id):
+        """
+        Returns:
+            tuple: (frames, xy) arrays of one track, with xy of shape (n, 2).
+        """
+        rows = self.track_rows(track_id)
+        return self.column('frame')[rows], np.stack([self.column('x')[rows], self.column('y')[rows]], axis=1)
+
+    def trajectories(self):
+        """
+        Returns:
+            tuple: (order, track_ids, starts, ends) where `order` sorts rows by (track, frame)
+            and rows `order[starts[i]:ends[i]]` belong to `track_ids[i]`.
+        """
+        ids, starts, ends, order = self._get_index()
+        return order, ids, starts, ends
+
+    def last_positions(self):
+        """
+        Returns:
+            tuple: (track_ids, frames, xs, ys) of the last observation of every track.
+        """
+        ids, starts, ends, order = self._get_index()
+        last = order[ends - 1] if len(ids) else np.empty(0, dtype=np.int64)
+        return ids, self.column('frame')[last], self.column('x')[last], self.column('y')[last]
+
+    def window(self, start_frame, end_frame):
+        """
+        Returns:
+            slice: The rows observed in frames [start_frame, end_frame).
+        """
+        frames = self.column('frame')
+        return slice(int(np.searchsorted(frames, start_frame, side='left')),
+                     int(np.searchsorted(frames, end_frame, side='left')))
+
+    def active_at(self, frame_idx, staleness=0):
+        """
+        Returns the tracks observed within `staleness` frames before (and including) `frame_idx`.
+
+        Returns:
+            np.ndarray: The row of the latest observation of each active track, ordered by track ID.
+        """
+        rows = self.window(frame_idx - staleness, frame_idx + 1)
+        track_col = self.column('track_id')[rows]
+        # Rows are in frame order, so the last occurrence of each ID is its latest observation
+        _, rev_first = np.unique(track_col[::-1], return_index=True)
+        return rows.start + (len(track_col) - 1 - rev_first)
+
+    def _reserve(self, size):
+        capacity = len(self._data['frame'])
+        if size <= capacity:
+            return
+        capacity = max(capacity, 1)
+        while capacity < size:
+            capacity *= 2
+        for name, col in self._data.items():
+            grown = np.empty(capacity, dtype=col.dtype)
+            grown[:self._size] = col[:self._size]
+            self._data[name] = grown
+
+    def _get_index(self):
+        if self._index is None:
+            track_col = self.column('track_id')
+            # Stable sort keeps the frame order within each track
+            order = np.argsort(track_col, kind='stable')
+            ids, starts, counts = np.unique(track_col[order], return_index=True, return_counts=True)
+            self._index = (ids, starts, starts + counts, order)
+        return self._index
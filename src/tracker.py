@@ -1,4 +1,12 @@
+import contextlib
+import math
+import os
+import tempfile
 import numpy as np
+import yaml
+
+TRACKER_CONFIG = 'football-tracker.yaml'
+BALL_CLASS_NAMES = ('sports ball', 'ball', 'sports_ball')
 
 # Using the tracking info returned by ultralytics YOLO.track (it includes .boxes with .id when track is used)
 # This file provides helper functions to parse tracked results
@@ -31,7 +39,7 @@ def parse_frame_results(res, model):
 
             if class_name == 'person':
                 persons.append(item)
-            elif class_name in ['sports ball', 'ball', 'sports_ball']:
+            elif class_name in BALL_CLASS_NAMES:
                 balls.append(item)
 
     except Exception as e:
@@ -52,9 +60,89 @@ def parse_frame_results(res, model):
                 }
                 if name == 'person':
                     persons.append(item)
-                elif name in ['sports ball', 'ball', 'sports_ball']:
+                elif name in BALL_CLASS_NAMES:
                     balls.append(item)
             except Exception:
                 continue
 
-    return persons, balls
\ No newline at end of file
+    return persons, balls
+
+@contextlib.contextmanager
+def scaled_tracker_config(tracker_cfg, frame_skip):
+    """
+    Provides a tracker configuration whose `track_buffer` is expressed in sampled frames.
+
+    ByteTrack counts lost frames in tracker updates, so when only one frame out of
+    `frame_skip` reaches the tracker the buffer must shrink by the same factor to
+    keep lost tracks alive for the same amount of video time.
+
+    Args:
+        tracker_cfg (str): Path to the reference tracker YAML (e.g. 'football-tracker.yaml').
+        frame_skip (int): The sampling step between two tracked frames.
+
+    Yields:
+        str: Path to a YAML file usable as the `tracker` argument of ultralytics; a
+        scaled copy is a temporary file removed when the context exits.
+    """
+    if frame_skip <= 1:
+        yield tracker_cfg
+        return
+
+    with open(tracker_cfg) as f:
+        cfg = yaml.safe_load(f)
+    cfg['track_buffer'] = max(1, math.ceil(cfg.get('track_buffer', 30) / frame_skip))
+
+    base = os.path.splitext(os.path.basename(tracker_cfg))[0]
+    # A file of its own per call: batch and chunk workers scale the same config concurrently
+    with tempfile.NamedTemporaryFile('w', prefix=f"{base}-skip{frame_skip}-", suffix='.yaml', delete=False) as f:
+        yaml.safe_dump(cfg, f)
+    try:
+        yield f.name
+    finally:
+        os.unlink(f.name)
+
+
+def create_tracker(tracker_cfg):
+    """
+    Builds a standalone tracker instance from a tracker YAML, independent of the YOLO predictor.
+
+    Args:
+        tracker_cfg (str): Path to the tracker YAML (e.g. 'football-tracker.yaml').
+
+    Returns:
+        The tracker object (BYTETracker or BOTSORT) expected by `update_tracks`.
+    """
+    from ultralytics.trackers.track import TRACKER_MAP
+    from ultralytics.utils import IterableSimpleNamespace
+
+    with open(tracker_cfg) as f:
+        cfg = yaml.safe_load(f)
+    if cfg['tracker_type'] not in TRACKER_MAP:
+        raise ValueError(f"Unsupported tracker type '{cfg['tracker_type']}' in {tracker_cfg}")
+    return TRACKER_MAP[cfg['tracker_type']](args=IterableSimpleNamespace(**cfg))
+
+def update_tracks(tracker, res):
+    """
+    Associates the detections of a single `predict` result with the tracker.
+
+    This mirrors what ultralytics does after each frame in `track` mode, so the
+    returned result carries `.boxes.id` and can be fed to `parse_frame_results`.
+
+    Args:
+        tracker: A tracker built by `create_tracker`.
+        res: A single ultralytics Results object produced by `model.predict`.
+
+    Returns:
+        The Results object restricted to tracked boxes, with track IDs attached.
+    """
+    det = res.boxes.cpu().numpy()
+    tracks = tracker.update(det, res.orig_img)
+    if len(tracks) == 0:
+        return res
+
+    import torch
+
+    idx = tracks[:, -1].astype(int)
+    res = res[idx]
+    res.update(boxes=torch.as_tensor(tracks[:, :-1], device=res.boxes.data.device))
+    return res
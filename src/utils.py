@@ -1,5 +1,7 @@
 import math
 
+import numpy as np
+
 def box_center(box):
     """
     Calculates the center coordinates of a bounding box.
@@ -37,4 +39,20 @@ def speed_kmh(pixels, dt_seconds, pixels_to_meters):
         return 0.0
     meters = pixels * pixels_to_meters
     m_per_s = meters / dt_seconds
-    return m_per_s * 3.6
\ No newline at end of file
+    return m_per_s * 3.6
+
+def box_iou(boxes_a, boxes_b):
+    """
+    Calculates the pairwise intersection over union of two sets of boxes.
+    Args:
+        boxes_a (np.array): Boxes of shape (n, 4) as [x1, y1, x2, y2].
+        boxes_b (np.array): Boxes of shape (m, 4) as [x1, y1, x2, y2].
+    Returns:
+        The (n, m) IoU matrix.
+    """
+    top_left = np.maximum(boxes_a[:, None, :2], boxes_b[None, :, :2])
+    bottom_right = np.minimum(boxes_a[:, None, 2:], boxes_b[None, :, 2:])
+    inter = np.prod(np.clip(bottom_right - top_left, 0, None), axis=2)
+    area_a = np.prod(boxes_a[:, 2:] - boxes_a[:, :2], axis=1)
+    area_b = np.prod(boxes_b[:, 2:] - boxes_b[:, :2], axis=1)
+    return inter / np.maximum(area_a[:, None] + area_b[None, :] - inter, 1e-9)
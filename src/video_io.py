@@ -0,0 +1,383 @@
+import collections
+import os
+import queue
+import subprocess
+import threading
+import time
+
+import cv2
+import numpy as np
+
+# Codec name -> (file extension, OpenCV fourcc); 'h264' frames are piped to ffmpeg/libx264
+VIDEO_CODECS = {
+    'mjpg': ('.avi', 'MJPG'),
+    'mp4v': ('.mp4', 'mp4v'),
+    'h264': ('.mp4', None),
+}
+
+class SampledFrameSource:
+    def __init__(self, path, frame_skip=1, start_frame=0, end_frame=None):
+        """
+        Iterates over a video file and only decodes the frames that will be analysed.
+
+        Frames that fall between two samples are advanced with `grab()` and never
+        retrieved, so they skip the colour conversion and the copy into a numpy
+        array as well as the downstream inference.
+
+        Args:
+            path (str): Path to the video file.
+            frame_skip (int): Keep one frame out of every `frame_skip` frames.
+            start_frame (int): First frame to read (rounded up to a sampled frame).
+            end_frame (int): Stop before this frame (end of the video by default).
+        """
+        self.path = path
+        self.frame_skip = max(1, int(frame_skip))
+        self.start_frame = -(-max(0, int(start_frame)) // self.frame_skip) * self.frame_skip
+        self.end_frame = end_frame
+
+        cap = cv2.VideoCapture(path)
+        if not cap.isOpened():
+            raise IOError(f"Could not open video source {path}")
+        self.fps = cap.get(cv2.CAP_PROP_FPS) or 25.0
+        self.width = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
+        self.height = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
+        self.frame_count = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+        cap.release()
+
+    def __iter__(self):
+        """
+        Yields:
+            tuple: (frame_idx, frame) where `frame_idx` is the index of the frame
+            in the original video and `frame` is the decoded BGR image.
+        """
+        cap = cv2.VideoCapture(self.path)
+        frame_idx = self.start_frame
+        if frame_idx > 0:
+            cap.set(cv2.CAP_PROP_POS_FRAMES, frame_idx)
+        try:
+            while self.end_frame is None or frame_idx < self.end_frame:
+                if frame_idx % self.frame_skip == 0:
+                    ok, frame = cap.read()
+                    if not ok:
+                        break
+                    yield frame_idx, frame
+                elif not cap.grab():
+                    break
+                frame_idx += 1
+        finally:
+            cap.release()
+
+    def __len__(self):
+        end = self.frame_count if self.end_frame is None else min(self.end_frame, self.frame_count)
+        return max(0, -(-(end - self.start_frame) // self.frame_skip)) if self.frame_count > 0 else 0
+
+def is_stream_url(source):
+    return isinstance(source, str) and '://' in source
+
+class LiveFrameSource:
+    def __init__(self, source, frame_skip=1, max_latency_s=2.0, loop=False, follow=False, realtime=None,
+                 idle_timeout_s=10.0, poll_seconds=0.2):
+        """
+        Reads a live source and hands out only its most recent frames.
+
+        A capture thread reads every frame as it arrives and offers one frame out
+        of every `frame_skip` through a single slot: an offered frame that has not
+        been taken when the next one arrives is dropped, and a frame older than
+        `max_latency_s` when taken is dropped too. A consumer slower than the
+        stream therefore skips frames instead of falling further and further behind.
+
+        `source` is a stream URL (rtsp://, http://, ...) or a file. A file is either
+        played back at its frame rate as a stand-in for a camera (`loop` restarts
+        it at the end) or followed as it grows (`follow`: at the end of the file it
+        is reopened until no new frame arrives for `idle_timeout_s`).
+
+        Args:
+            source (str): The stream URL or file path.
+            frame_skip (int): Offer one captured frame out of every `frame_skip`.
+            max_latency_s (float): Age beyond which a frame is dropped when taken.
+            loop (bool): Restart a file at its end (frame indices keep increasing).
+            follow (bool): Wait for a growing file instead of stopping at its end.
+            realtime (bool): Read at the source frame rate; defaults to True for
+                files (a stream URL is paced by the stream itself).
+            idle_timeout_s (float): How long a followed file may not grow before the
+                source ends.
+            poll_seconds (float): Delay between two attempts to read a followed file.
+        """
+        self.source = source
+        self.frame_skip = max(1, int(frame_skip))
+        self.max_latency_s = max_latency_s
+        self.loop = loop
+        self.follow = follow
+        self.realtime = (not is_stream_url(source)) if realtime is None else realtime
+        self.idle_timeout_s = idle_timeout_s
+        self.poll_seconds = poll_seconds
+
+        self._cap = cv2.VideoCapture(source)
+        if not self._cap.isOpened():
+            raise IOError(f"Could not open video source {source}")
+        self.fps = self._cap.get(cv2.CAP_PROP_FPS) or 25.0
+        self.width = int(self._cap.get(cv2.CAP_PROP_FRAME_WIDTH))
+        self.height = int(self._cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
+
+        self.captured = self.delivered = self.dropped_overrun = self.dropped_stale = 0
+        self._slot = None
+        self._done = False
+        self._cond = threading.Condition()
+        self._stop = threading.Event()
+        self._capture_times = collections.deque()
+        self._thread = None
+
+    @classmethod
+    def from_config(cls, cfg, source, loop=False):
+        return cls(source, cfg.get('frame_skip', 1), max_latency_s=cfg.get('live_max_latency_seconds', 2.0),
+                   loop=loop, follow=cfg.get('live_follow', False),
+                   idle_timeout_s=cfg.get('live_idle_timeout_seconds', 10.0))
+
+    def _read(self, frame_idx):
+        ok, frame = self._cap.read()
+        if ok or is_stream_url(self.source):
+            return frame if ok else None
+        if self.loop:
+            self._cap.set(cv2.CAP_PROP_POS_FRAMES, 0)
+            ok, frame = self._cap.read()
+            return frame if ok else None
+        if not self.follow:
+            return None
+        # The end of a growing file: reopen it past the frames already read until it grows
+        deadline = time.monotonic() + self.idle_timeout_s
+        while not self._stop.is_set() and time.monotonic() < deadline:
+            time.sleep(self.poll_seconds)
+            self._cap.release()
+            self._cap = cv2.VideoCapture(self.source)
+            self._cap.set(cv2.CAP_PROP_POS_FRAMES, frame_idx)
+            ok, frame = self._cap.read()
+            if ok:
+                return frame
+        return None
+
+    def _capture(self):
+        start = time.monotonic()
+        frame_idx = 0
+        try:
+            while not self._stop.is_set():
+                if self.realtime:
+                    delay = start + frame_idx / self.fps - time.monotonic()
+                    if delay > 0:
+                        time.sleep(delay)
+                frame = self._read(frame_idx)
+                if frame is None:
+                    break
+                captured_at = time.monotonic()
+                self.captured += 1
+                if frame_idx % self.frame_skip == 0:
+                    with self._cond:
+                        if self._slot is not None:
+                            self.dropped_overrun += 1
+                        self._slot = (frame_idx, frame, captured_at)
+                        self._cond.notify()
+                frame_idx += 1
+        finally:
+            self._cap.release()
+            with self._cond:
+                self._done = True
+                self._cond.notify()
+
+    def __iter__(self):
+        """
+        Yields:
+            tuple: (frame_idx, frame), `frame_idx` counting every frame captured since
+            the start; the capture time of each frame is kept for `capture_time`.
+        """
+        self._thread = threading.Thread(target=self._capture, name='live-capture', daemon=True)
+        self._thread.start()
+        try:
+            while True:
+                with self._cond:
+                    while self._slot is None and not self._done:
+                        self._cond.wait()
+                    if self._slot is None:
+                        return
+                    frame_idx, frame, captured_at = self._slot
+                    self._slot = None
+                if time.monotonic() - captured_at > self.max_latency_s:
+                    self.dropped_stale += 1
+                    continue
+                self.delivered += 1
+                self._capture_times.append((frame_idx, captured_at))
+                yield frame_idx, frame
+        finally:
+            self.stop()
+
+    def capture_time(self, frame_idx):
+        """
+        Returns:
+            float or None: The `time.monotonic()` capture time of a delivered frame.
+            Times of this frame and of the frames before it are forgotten, so the
+            frames must be looked up in order.
+        """
+        captured_at = None
+        while self._capture_times and self._capture_times[0][0] <= frame_idx:
+            idx, t = self._capture_times.popleft()
+            if idx == frame_idx:
+                captured_at = t
+        return captured_at
+
+    def stop(self):
+        """
+        Stops the capture; the iteration ends after the frame already offered, if any.
+        """
+        self._stop.set()
+
+    def counters(self):
+        return {'captured': self.captured, 'delivered': self.delivered,
+                'dropped_overrun': self.dropped_overrun, 'dropped_stale': self.dropped_stale}
+
+class AnnotatedVideoWriter:
+    def __init__(self, path, fps, frame_size, codec='mp4v', scale=1.0, background=True, queue_size=16,
+                 ffmpeg='ffmpeg', crf=23, preset='veryfast'):
+        """
+        Encodes the annotated frames, optionally downscaled, on a background thread.
+
+        `write` hands the frame to a bounded queue and returns; a dedicated thread
+        resizes and encodes it (both release the GIL), so encoding overlaps the
+        analysis of the next frames. A full queue blocks `write`, which keeps
+        memory bounded when the encoder is the slowest step. Frames are used as
+        given, without a copy: the caller must not modify a frame once written.
+
+        Args:
+            path (str): Output file; its extension should match the codec (see VIDEO_CODECS).
+            fps (float): Frame rate of the output.
+            frame_size (tuple): (width, height) of the written frames.
+            codec (str): 'mjpg' (very large files), 'mp4v' (OpenCV MPEG-4) or 'h264'
+                (frames piped to an ffmpeg process encoding with libx264, the smallest files).
+            scale (float): Output scale (e.g. 0.5 for a half-resolution preview).
+            background (bool): Whether to encode on a background thread.
+            queue_size (int): Frames buffered for the background thread.
+            ffmpeg (str): The ffmpeg executable, for 'h264'.
+            crf (int): libx264 constant rate factor (lower is better quality, larger files).
+            preset (str): libx264 speed preset.
+        """
+        if codec not in VIDEO_CODECS:
+            raise ValueError(f"Unknown video codec '{codec}' (expected one of {', '.join(VIDEO_CODECS)})")
+        self.path = path
+        self.codec = codec
+        width, height = frame_size
+        # Even dimensions, required by yuv420p encoders
+        self.out_size = (max(2, round(width * scale / 2) * 2), max(2, round(height * scale / 2) * 2))
+        self.resize = self.out_size != (width, height)
+        self.frames = 0
+        self.encode_s = 0.0
+        self.blocked_s = 0.0
+        self._error = None
+
+        if codec == 'h264':
+            command = [ffmpeg, '-y', '-loglevel', 'error', '-f', 'rawvideo', '-pix_fmt', 'bgr24',
+                       '-s', f'{self.out_size[0]}x{self.out_size[1]}', '-r', f'{fps:g}', '-i', '-',
+                       '-c:v', 'libx264', '-preset', preset, '-crf', str(crf), '-pix_fmt', 'yuv420p',
+                       '-movflags', '+faststart', path]
+            try:
+                self._process = subprocess.Popen(command, stdin=subprocess.PIPE, stderr=subprocess.PIPE)
+            except FileNotFoundError:
+                raise IOError(f"ffmpeg not found at '{ffmpeg}'; install it or choose the 'mp4v' or 'mjpg' codec")
+            self._writer = None
+        else:
+            self._process = None
+            self._writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*VIDEO_CODECS[codec][1]), fps, self.out_size)
+            if not self._writer.isOpened():
+                raise IOError(f"Could not open a '{codec}' video writer for {path}")
+
+        self._queue = None
+        if background:
+            self._queue = queue.Queue(maxsize=max(1, int(queue_size)))
+            self._thread = threading.Thread(target=self._run, name='video-encoder', daemon=True)
+            self._thread.start()
+
+    @classmethod
+    def from_config(cls, cfg, output_stem, fps, frame_size, background=True):
+        """
+        Returns:
+            AnnotatedVideoWriter or None: A writer to `output_stem` plus the codec's
+            extension, or None when `cfg['video_codec']` disables the video.
+        """
+        codec = cfg.get('video_codec', 'mp4v')
+        if not codec:
+            return None
+        return cls(output_stem + VIDEO_CODECS[codec][0], fps, frame_size, codec,
+                   scale=cfg.get('video_scale', 1.0), background=background,
+                   queue_size=cfg.get('video_queue_size', 16), ffmpeg=cfg.get('ffmpeg_path', 'ffmpeg'),
+                   crf=cfg.get('video_crf', 23), preset=cfg.get('video_preset', 'veryfast'))
+
+    def write(self, frame):
+        if self._error is not None:
+            raise self._error
+        if self._queue is None:
+            self._encode(frame)
+            return
+        t0 = time.perf_counter()
+        self._queue.put(frame)
+        self.blocked_s += time.perf_counter() - t0
+
+    def _encode(self, frame):
+        t0 = time.perf_counter()
+        if self.resize:
+            frame = cv2.resize(frame, self.out_size, interpolation=cv2.INTER_AREA)
+        if self._process is not None:
+            self._process.stdin.write(np.ascontiguousarray(frame).data)
+        else:
+            self._writer.write(frame)
+        self.frames += 1
+        self.encode_s += time.perf_counter() - t0
+
+    def _run(self):
+        while True:
+            frame = self._queue.get()
+            if frame is None:
+                return
+            if self._error is not None:
+                # Keep draining so that the producer never blocks on a dead encoder
+                continue
+            try:
+                self._encode(frame)
+            except Exception as e:
+                self._error = e
+
+    def close(self):
+        """
+        Flushes the queued frames and finalises the file.
+
+        Raises:
+            Exception: The first encoding error, if any.
+        """
+        if self._queue is not None:
+            self._queue.put(None)
+            self._thread.join()
+            self._queue = None
+        if self._process is not None:
+            try:
+                self._process.stdin.close()
+            except BrokenPipeError:
+                pass
+            stderr = self._process.stderr.read().decode(errors='replace').strip()
+            if self._process.wait() != 0 and self._error is None:
+                self._error = IOError(f"ffmpeg failed: {stderr}")
+            self._process = None
+        elif self._writer is not None:
+            self._writer.release()
+            self._writer = None
+        if self._error is not None:
+            raise self._error
+
+    def stats(self):
+        """
+        Returns:
+            dict: Frames written, encoding time (resize included), time `write` was
+            blocked on a full queue, and the output file size.
+        """
+        return {
+            'codec': self.codec,
+            'size': list(self.out_size),
+            'frames': self.frames,
+            'encode_s': round(self.encode_s, 3),
+            'blocked_s': round(self.blocked_s, 3),
+            'bytes': os.path.getsize(self.path) if os.path.exists(self.path) else 0
+        }
@@ -1,5 +1,7 @@
+from collections import deque
 import cv2
 import numpy as np
+import pandas as pd
 
 # --- Configuration des couleurs ---
 # Utiliser un colormap pour assigner des couleurs uniques et vives aux joueurs
@@ -7,8 +9,89 @@ PLAYER_COLORS = cv2.applyColorMap(np.arange(0, 255, 15, dtype=np.uint8), cv2.COL
 BALL_COLOR = (255, 255, 255)  # Blanc
 TEAM_A_COLOR = (255, 0, 0)   # Bleu
 TEAM_B_COLOR = (0, 0, 255)   # Rouge
+PITCH_COLOR = (60, 120, 60)  # Vert pelouse, fond des heatmaps
 
-def draw_annotations(frame, players, ball_position, team_assignments):
+class TrailRenderer:
+    def __init__(self, frame_shape, max_trail_frames=None, fade=True):
+        """
+        Dessine les trajectoires de façon incrémentale sur un calque persistant.
+
+        À chaque image, seul le dernier segment de chaque joueur est ajouté au calque,
+        qui est ensuite composé sur l'image en une seule opération : le coût par image
+        ne dépend plus de la longueur de la vidéo.
+
+        Args:
+            frame_shape (tuple): Dimensions (hauteur, largeur[, canaux]) des images.
+            max_trail_frames (int): Longueur maximale des trajectoires, en images analysées.
+                None conserve toute la trajectoire.
+            fade (bool): Si True, les trajectoires bornées s'estompent progressivement ;
+                sinon elles sont coupées net après `max_trail_frames` images.
+        """
+        height, width = frame_shape[:2]
+        # Calque de couleur prémultiplié par l'alpha, et calque alpha
+        self.layer = np.zeros((height, width, 3), dtype=np.uint8)
+        self.alpha = np.zeros((height, width), dtype=np.uint8)
+        self.max_trail_frames = max_trail_frames
+        self.fade = fade
+        self.last_points = {}
+        # Atténuation telle qu'un segment disparaît (< 1/255) après max_trail_frames images
+        self.decay = (1.0 / 255) ** (1.0 / max_trail_frames) if max_trail_frames and fade else None
+        # Segments des dernières images, redessinés quand la trajectoire est coupée net
+        self.recent_segments = deque(maxlen=max_trail_frames) if max_trail_frames and not fade else None
+
+    def update(self, players):
+        """
+        Ajoute au calque le dernier segment de chaque joueur observé depuis l'appel précédent.
+
+        Args:
+            players (dict): Dictionnaire des joueurs, avec leur 'last_pos' et 'last_frame'.
+        """
+        if self.decay is not None:
+            # Arrondi par défaut (beta -0.5) : un arrondi au plus proche figerait les faibles
+            # valeurs (v * decay > v - 0.5) en traînées fantômes ; ici chaque valeur reste
+            # sous 255 * decay^n et s'annule au plus tard après max_trail_frames images
+            cv2.convertScaleAbs(self.layer, dst=self.layer, alpha=self.decay, beta=-0.5)
+            cv2.convertScaleAbs(self.alpha, dst=self.alpha, alpha=self.decay, beta=-0.5)
+
+        segments = []
+        for pid, player_data in players.items():
+            if player_data.get('last_pos') is None:
+                continue
+            frame_idx = player_data.get('last_frame')
+            x, y = player_data['last_pos']
+            last = self.last_points.get(pid)
+            if last is not None and last[0] == frame_idx:
+                continue
+            point = (int(x), int(y))
+            self.last_points[pid] = (frame_idx, point)
+            if last is not None:
+                color = PLAYER_COLORS[pid % len(PLAYER_COLORS)][0].tolist()
+                segments.append((last[1], point, color))
+
+        if self.recent_segments is not None:
+            self.recent_segments.append(segments)
+            self.layer[:] = 0
+            self.alpha[:] = 0
+            for frame_segments in self.recent_segments:
+                self._draw(frame_segments)
+        else:
+            self._draw(segments)
+
+    def _draw(self, segments):
+        for start, end, color in segments:
+            cv2.line(self.layer, start, end, color, thickness=2)
+            cv2.line(self.alpha, start, end, 255, thickness=2)
+
+    def composite(self, frame):
+        """
+        Compose le calque des trajectoires sur l'image (modifiée en place).
+        """
+        inv_alpha = cv2.cvtColor(255 - self.alpha, cv2.COLOR_GRAY2BGR)
+        cv2.multiply(frame, inv_alpha, dst=frame, scale=1.0 / 255)
+        cv2.add(frame, self.layer, dst=frame)
+        return frame
+
+def draw_annotations(frame, players, ball_position, team_assignments, trails=None):
     """
     Dessine toutes les annotations sur une image du match.
 
@@ -17,16 +100,16 @@ def draw_annotations(frame, players, ball_position, team_assignments):
         players (dict): Dictionnaire contenant les informations des joueurs (positions, etc.).
         ball_position (tuple): Coordonnées (x, y) du ballon.
         team_assignments (dict): Dictionnaire associant les ID de joueurs à leur équipe ('A' ou 'B').
+        trails (TrailRenderer): Moteur de rendu incrémental des trajectoires. Si None,
+            les trajectoires ne sont pas dessinées.
 
     Returns:
         np.array: L'image avec les annotations.
     """
     # --- Dessiner les trajectoires ---
-    for pid, player_data in players.items():
-        positions = np.array(player_data.get('positions', []), dtype=np.int32).reshape((-1, 1, 2))
-        if len(positions) > 2:
-            color = PLAYER_COLORS[pid % len(PLAYER_COLORS)][0].tolist()
-            cv2.polylines(frame, [positions], isClosed=False, color=color, thickness=2)
+    if trails is not None:
+        trails.update(players)
+        trails.composite(frame)
 
     # --- Dessiner les boîtes des joueurs et leur ID ---
     for pid, player_data in players.items():
@@ -43,7 +126,7 @@ def draw_annotations(frame, players, ball_position, team_assignments):
 
     # --- Dessiner le ballon ---
     if ball_position:
-        cv2.circle(frame, ball_position, radius=8, color=BALL_COLOR, thickness=-1)
+        cv2.circle(frame, (int(ball_position[0]), int(ball_position[1])), radius=8, color=BALL_COLOR, thickness=-1)
 
     return frame
 
@@ -56,11 +139,154 @@ def generate_video(input_path, output_path, analysis_data):
     # Logique pour lire la vidéo, appliquer draw_annotations frame par frame, et sauvegarder.
     pass
 
-def create_heatmap(positions, frame_shape):
+def bin_positions(xs, ys, groups, n_groups, extent, cell_size=1.0):
     """
-    Crée une heatmap à partir d'une liste de positions.
-    (Cette fonction sera implémentée plus en détail plus tard)
+    Compte les positions par case d'une grille, pour tous les groupes en une seule passe.
+
+    Args:
+        xs, ys (np.array): Positions (mètres sur le terrain, ou pixels).
+        groups (np.array): Indice du groupe (joueur, équipe) de chaque position, dans
+            [0, n_groups) ; les positions d'indice négatif sont ignorées.
+        n_groups (int): Nombre de groupes.
+        extent (tuple): Zone couverte (x_min, x_max, y_min, y_max) ; les positions hors
+            de la zone sont ignorées.
+        cell_size (float): Côté d'une case, dans l'unité des positions.
+
+    Returns:
+        np.array: Grilles d'entiers de forme (n_groups, ny, nx).
+    """
+    x_min, x_max, y_min, y_max = extent
+    nx = int(np.ceil((x_max - x_min) / cell_size))
+    ny = int(np.ceil((y_max - y_min) / cell_size))
+    cx = np.floor((np.asarray(xs, dtype=np.float64) - x_min) / cell_size).astype(np.int64)
+    cy = np.floor((np.asarray(ys, dtype=np.float64) - y_min) / cell_size).astype(np.int64)
+    groups = np.asarray(groups, dtype=np.int64)
+    inside = (groups >= 0) & (groups < n_groups) & (cx >= 0) & (cx < nx) & (cy >= 0) & (cy < ny)
+    flat = (groups[inside] * ny + cy[inside]) * nx + cx[inside]
+    return np.bincount(flat, minlength=n_groups * ny * nx).reshape(n_groups, ny, nx)
+
+def draw_pitch(extent, px_per_unit=8, lines=True):
+    """
+    Dessine le fond (pelouse et lignes) sur lequel les heatmaps et réseaux de passes sont rendus.
+
+    Args:
+        extent (tuple): Zone représentée (x_min, x_max, y_min, y_max), en mètres.
+        px_per_unit (float): Résolution de l'image, en pixels par mètre.
+        lines (bool): Si True, trace les lignes d'un terrain de 105 x 68 m ; à désactiver
+            quand les positions ne sont pas calibrées sur le terrain.
+
+    Returns:
+        np.array: L'image BGR du terrain.
     """
-    print("Génération de la heatmap...")
-    # Logique pour créer une heatmap à partir des coordonnées.
-    pass
\ No newline at end of file
+    x_min, x_max, y_min, y_max = extent
+    width = int(round((x_max - x_min) * px_per_unit))
+    height = int(round((y_max - y_min) * px_per_unit))
+    pitch = np.empty((height, width, 3), dtype=np.uint8)
+    pitch[:] = PITCH_COLOR
+    if not lines:
+        return pitch
+
+    def pt(x, y):
+        return int(round((x - x_min) * px_per_unit)), int(round((y - y_min) * px_per_unit))
+
+    white = (255, 255, 255)
+    cv2.rectangle(pitch, pt(0, 0), pt(105, 68), white, 2)
+    cv2.line(pitch, pt(52.5, 0), pt(52.5, 68), white, 2)
+    cv2.circle(pitch, pt(52.5, 34), int(round(9.15 * px_per_unit)), white, 2)
+    for goal, box, six in ((0, 16.5, 5.5), (105, 88.5, 99.5)):
+        cv2.rectangle(pitch, pt(goal, 13.84), pt(box, 54.16), white, 2)
+        cv2.rectangle(pitch, pt(goal, 24.84), pt(six, 43.16), white, 2)
+    return pitch
+
+def render_heatmap(grid, background, sigma_cells=1.5, alpha=0.7):
+    """
+    Rend une grille de comptage sur le fond en une seule composition.
+
+    La grille est lissée, redimensionnée à la taille du fond et colorée ; son
+    opacité suit la densité, si bien que les zones jamais visitées laissent voir
+    le terrain.
+
+    Args:
+        grid (np.array): Grille de comptage (ny, nx), alignée sur le fond.
+        background (np.array): Image du terrain (non modifiée).
+        sigma_cells (float): Écart-type du lissage gaussien, en cases.
+        alpha (float): Opacité maximale de la heatmap.
+
+    Returns:
+        np.array: L'image de la heatmap.
+    """
+    heat = grid.astype(np.float32)
+    if sigma_cells > 0:
+        heat = cv2.GaussianBlur(heat, (0, 0), sigma_cells)
+    heat = cv2.resize(heat, (background.shape[1], background.shape[0]), interpolation=cv2.INTER_LINEAR)
+    heat = cv2.convertScaleAbs(heat, alpha=255.0 / max(float(heat.max()), 1e-9))
+    colored = cv2.applyColorMap(heat, cv2.COLORMAP_JET)
+    # Composition en entiers 8 bits, comme pour le calque des trajectoires
+    weight = cv2.cvtColor(cv2.convertScaleAbs(heat, alpha=alpha), cv2.COLOR_GRAY2BGR)
+    image = cv2.multiply(colored, weight, scale=1.0 / 255)
+    return cv2.add(image, cv2.multiply(background, 255 - weight, scale=1.0 / 255))
+
+def create_heatmap(positions, frame_shape, cell_size=10):
+    """
+    Crée une heatmap à partir d'une liste de positions dans l'image.
+
+    Args:
+        positions (list): Positions (x, y) en pixels.
+        frame_shape (tuple): Dimensions (hauteur, largeur[, canaux]) des images.
+        cell_size (int): Côté d'une case de la grille, en pixels.
+
+    Returns:
+        np.array: L'image de la heatmap, à la taille des images.
+    """
+    height, width = frame_shape[:2]
+    positions = np.asarray(positions, dtype=np.float64).reshape(-1, 2)
+    grid = bin_positions(positions[:, 0], positions[:, 1], np.zeros(len(positions)), 1, (0, width, 0, height), cell_size)[0]
+    background = np.empty((height, width, 3), dtype=np.uint8)
+    background[:] = PITCH_COLOR
+    return render_heatmap(grid, background)
+
+def render_pass_network(passes, positions, background, extent, px_per_unit=8, color=TEAM_A_COLOR, min_passes=1):
+    """
+    Dessine le réseau de passes d'une équipe.
+
+    Chaque joueur est placé à sa position moyenne, avec un disque proportionnel
+    au nombre de passes données et reçues ; chaque paire de joueurs est reliée
+    par un trait d'épaisseur proportionnelle au nombre de passes échangées.
+
+    Args:
+        passes (pd.DataFrame): Les passes de l'équipe (colonnes from_player_id et to_player_id).
+        positions (dict): ID du joueur vers sa position moyenne (x, y), dans l'unité de `extent`.
+        background (np.array): Image du terrain (non modifiée).
+        extent (tuple): Zone représentée par le fond (x_min, x_max, y_min, y_max).
+        px_per_unit (float): Résolution du fond.
+        color (tuple): Couleur BGR de l'équipe.
+        min_passes (int): Les paires ayant échangé moins de passes ne sont pas reliées.
+
+    Returns:
+        np.array: L'image du réseau de passes.
+    """
+    image = background.copy()
+    if passes.empty:
+        return image
+    x_min, _, y_min, _ = extent
+
+    def pt(pid):
+        x, y = positions[pid]
+        return int(round((x - x_min) * px_per_unit)), int(round((y - y_min) * px_per_unit))
+
+    # Passes dans les deux sens cumulées par paire de joueurs
+    a = np.minimum(passes['from_player_id'].to_numpy(), passes['to_player_id'].to_numpy())
+    b = np.maximum(passes['from_player_id'].to_numpy(), passes['to_player_id'].to_numpy())
+    pairs, counts = np.unique(np.stack([a, b], axis=1), axis=0, return_counts=True)
+    involvement = pd.concat([passes['from_player_id'], passes['to_player_id']]).value_counts()
+    max_count = counts.max()
+    for (p1, p2), count in zip(pairs.tolist(), counts.tolist()):
+        if count >= min_passes and p1 in positions and p2 in positions:
+            cv2.line(image, pt(p1), pt(p2), color, 1 + int(round(7 * count / max_count)), cv2.LINE_AA)
+    max_involvement = involvement.max()
+    for pid, n in involvement.items():
+        if pid in positions:
+            center = pt(pid)
+            cv2.circle(image, center, 6 + int(round(10 * n / max_involvement)), color, -1, cv2.LINE_AA)
+            cv2.putText(image, str(pid), (center[0] - 8, center[1] + 5), cv2.FONT_HERSHEY_SIMPLEX, 0.45, (255, 255, 255), 1)
+    return image
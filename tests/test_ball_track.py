@@ -0,0 +1,66 @@
+import numpy as np
+import pandas as pd
+
+from src.ball_track import BALL_DETECTED, BALL_INTERPOLATED, BALL_MISSING, BallTracker
+from src.detection_cache import DetectionRecorder
+
+FPS = 25.0
+CFG = {'ball_max_gap_seconds': 1.0}
+
+def ball(x, y, conf=0.9, size=10):
+    return {'id': np.int32(0), 'box': [x - size / 2, y - size / 2, x + size / 2, y + size / 2], 'conf': np.float32(conf)}
+
+def recorded(balls_per_frame, frame_skip=5):
+    recorder = DetectionRecorder()
+    for _ in recorder.wrap((i * frame_skip, [], balls, None) for i, balls in enumerate(balls_per_frame)):
+        pass
+    return recorder.detections()
+
+def run_online(detections):
+    tracker = BallTracker(FPS, CFG)
+    emitted = [(frame_idx, balls) for frame_idx, _, balls, _ in tracker.process(detections.replay())]
+    return tracker.track(), emitted
+
+def centers(emitted):
+    return [[((b['box'][0] + b['box'][2]) / 2, (b['box'][1] + b['box'][3]) / 2) for b in balls] for _, balls in emitted]
+
+def test_gap_is_interpolated_between_filtered_centres():
+    detections = recorded([[ball(100, 100)], [ball(110, 100)], [], [], [ball(140, 100)]])
+    track, emitted = run_online(detections)
+    assert track['source'].tolist() == [BALL_DETECTED, BALL_DETECTED, BALL_INTERPOLATED, BALL_INTERPOLATED, BALL_DETECTED]
+    assert [b[0].get('interpolated', False) for _, b in emitted] == [False, False, True, True, False]
+    # The emitted ball is the filtered centre, not the raw detection
+    xs = track['x'].to_numpy()
+    assert xs[0] == 100 and 100 < xs[1] < 110
+    assert np.allclose([c[0][0] for c in centers(emitted)], xs, atol=1e-3)
+
+def test_outlier_is_rejected():
+    path = [[ball(100 + 5 * i, 200)] for i in range(6)]
+    path[4] = [ball(900, 600, conf=0.95), ball(120, 200, conf=0.5)]
+    track, _ = run_online(recorded(path))
+    assert abs(track['x'][4] - 120) < 5 and abs(track['y'][4] - 200) < 5
+
+def test_long_gap_stays_missing():
+    detections = recorded([[ball(100, 100)]] + [[]] * 10 + [[ball(500, 300)]])
+    track, emitted = run_online(detections)
+    assert (track['source'][1:-1] == BALL_MISSING).all()
+    assert all(balls == [] for _, balls in emitted[1:-1])
+
+def test_batch_track_matches_the_pipeline_stage():
+    rng = np.random.default_rng(0)
+    balls_per_frame = []
+    for i in range(400):
+        balls = [] if rng.random() < 0.3 else [ball(300 + 200 * np.sin(i / 30), 300 + 4 * i % 500, rng.uniform(0.3, 0.9))]
+        if rng.random() < 0.2:
+            balls.append(ball(*rng.uniform(0, 1900, 2), conf=rng.uniform(0.2, 0.99)))
+        balls_per_frame.append(balls)
+    detections = recorded(balls_per_frame)
+    track, emitted = run_online(detections)
+
+    batch = BallTracker.from_detections(detections, FPS, CFG)
+    batch_emitted = [(frame_idx, balls) for frame_idx, _, balls, _ in batch.process(detections.replay())]
+    pd.testing.assert_frame_equal(batch.track(), track)
+    assert [f for f, _ in batch_emitted] == [f for f, _ in emitted]
+    assert np.allclose(sum(centers(batch_emitted), []), sum(centers(emitted), []))
+    assert [[b.get('interpolated', False) for b in balls] for _, balls in batch_emitted] == \
+           [[b.get('interpolated', False) for b in balls] for _, balls in emitted]
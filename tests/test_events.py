@@ -0,0 +1,109 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.events import EventManager, NO_OWNER, NO_TEAM, detect_events
+
+CFG = {'event_min_frames': 2, 'dribble_min_distance_m': 5.0}
+FRAME_SKIP = 10
+
+def online(sequence, cfg=CFG):
+    """Feeds (owner, team, pos) tuples, one per analysed frame, to an EventManager."""
+    manager = EventManager(cfg)
+    events = []
+    for i, (owner, team, pos) in enumerate(sequence):
+        events.extend(manager.update(i * FRAME_SKIP, owner, team, pos))
+    return events + manager.finish()
+
+def offline(sequence, cfg=CFG):
+    frames = np.arange(len(sequence)) * FRAME_SKIP
+    owners = np.array([NO_OWNER if owner is None else owner for owner, _, _ in sequence])
+    teams = np.array([NO_TEAM if team is None else int(team) for _, team, _ in sequence])
+    xs = np.array([np.nan if pos is None else pos[0] for _, _, pos in sequence])
+    ys = np.array([np.nan if pos is None else pos[1] for _, _, pos in sequence])
+    return detect_events(frames, owners, teams, xs, ys, cfg)
+
+def held(owner, team, n, start=(0.0, 0.0), step=(0.0, 0.0)):
+    return [(owner, team, (start[0] + i * step[0], start[1] + i * step[1])) for i in range(n)]
+
+def loose(n):
+    return [(None, None, None)] * n
+
+@pytest.fixture(params=[online, offline], ids=['online', 'offline'])
+def detect(request):
+    return request.param
+
+def test_pass_between_team_mates(detect):
+    events = detect(held(7, '0', 3, start=(10, 20)) + held(9, '0', 3, start=(22, 25)))
+    assert events == [{'type': 'pass', 'frame': 40, 'start_frame': 20, 'from_player_id': 7, 'to_player_id': 9,
+                       'team_id': '0', 'distance_m': 13.0}]
+
+def test_interception_after_a_loose_ball(detect):
+    events = detect(held(7, '0', 3) + loose(2) + held(4, '1', 3))
+    assert [(e['type'], e['from_player_id'], e['to_player_id'], e['team_id']) for e in events] == [('interception', 7, 4, '1')]
+
+def test_loss_when_the_other_team_takes_the_ball(detect):
+    events = detect(held(7, '0', 3) + held(4, '1', 3))
+    assert [(e['type'], e['team_id'], e['frame']) for e in events] == [('loss', '0', 40)]
+
+def test_dribble_reported_when_the_possession_ends(detect):
+    events = detect(held(7, '0', 5, start=(0, 0), step=(3, 4)))
+    assert events == [{'type': 'dribble', 'frame': 40, 'start_frame': 0, 'from_player_id': 7, 'to_player_id': 7,
+                       'team_id': '0', 'distance_m': 20.0}]
+
+def test_short_carry_is_not_a_dribble(detect):
+    assert detect(held(7, '0', 5, step=(0.5, 0))) == []
+
+def test_one_frame_owner_is_debounced(detect):
+    # A single-frame mis-assignment to an opponent creates neither a loss nor a pass back
+    assert detect(held(7, '0', 3) + held(4, '1', 1) + held(7, '0', 3)) == []
+
+def test_one_frame_loose_ball_is_not_an_interception(detect):
+    events = detect(held(7, '0', 3) + loose(1) + held(4, '1', 3))
+    assert [e['type'] for e in events] == ['loss']
+
+def test_min_frames_setting(detect):
+    sequence = held(7, '0', 3) + held(9, '0', 2)
+    assert [e['type'] for e in detect(sequence)] == ['pass']
+    assert detect(sequence, dict(CFG, event_min_frames=3)) == []
+
+def test_unknown_team_gives_no_transition(detect):
+    assert detect(held(7, '0', 3) + held(12, None, 3)) == []
+
+def test_online_and_offline_agree_on_random_sequences():
+    rng = np.random.default_rng(0)
+    teams = {1: '0', 2: '0', 3: '0', 4: '1', 5: '1', 6: '1', 7: None}
+    for _ in range(200):
+        sequence = []
+        while len(sequence) < 120:
+            owner = rng.choice([0, 1, 2, 3, 4, 5, 6, 7])
+            n = int(rng.integers(1, 6))
+            if owner == 0:
+                sequence += loose(n)
+            else:
+                start = tuple(rng.uniform(0, 100, 2))
+                sequence += held(int(owner), teams[owner], n, start=start, step=tuple(rng.normal(0, 2, 2)))
+        for min_frames in (1, 2, 3):
+            cfg = dict(CFG, event_min_frames=min_frames)
+            assert online(sequence, cfg) == offline(sequence, cfg)
+
+def test_redetect_events_from_saved_ownership(tmp_path):
+    from src.main import redetect_events
+    sequence = held(7, '0', 3, start=(10, 20)) + held(9, '0', 3, start=(22, 25)) + loose(2) + held(4, '1', 3)
+    frames = np.arange(len(sequence)) * FRAME_SKIP
+    pd.DataFrame({
+        'frame': frames,
+        'owner': [NO_OWNER if owner is None else owner for owner, _, _ in sequence],
+        'team': [NO_TEAM if team is None else int(team) for _, team, _ in sequence],
+        'x': [np.nan if pos is None else pos[0] for _, _, pos in sequence],
+        'y': [np.nan if pos is None else pos[1] for _, _, pos in sequence],
+    }).to_csv(tmp_path / 'ownership.csv', index=False)
+    pd.DataFrame({'team_id': [0, 1], 'possession_pct': [60.0, 40.0], 'passes': [5, 5], 'team_name': ['Team A', 'Team B']}) \
+        .to_csv(tmp_path / 'team_stats.csv', index=False)
+
+    events = redetect_events(str(tmp_path), CFG)
+    assert events == online(sequence)
+    assert pd.read_csv(tmp_path / 'events.csv')['type'].tolist() == ['pass', 'interception']
+    team_stats = pd.read_csv(tmp_path / 'team_stats.csv', index_col='team_id')
+    assert team_stats['passes'].tolist() == [1, 0] and team_stats['interceptions'].tolist() == [0, 1]
+    assert team_stats.columns[-1] == 'team_name'